@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+aho_corasick.py
+- 여러 패턴을 한 번의 선형 순회로 찾는 Aho-Corasick 오토마톤 (외부 의존성 없음)
+- 첫 검색 전에 추가한 패턴은 첫 검색 직전에 너비 우선으로 한 번에 연결
+- 그 뒤의 패턴 추가는 새 상태와 가장 긴 접미사가 새 상태로 바뀌는 기존 상태의 실패 링크만 다시 연결하고,
+  출력 링크는 그 상태들의 실패 트리 하위만 갱신 (전체 재구성 없음)
+- StreamScanner: 청크 단위 입력에서 상태와 오프셋을 이어받아 청크 경계에 걸친 패턴도 찾음
+- scan_distinct: 위치 없이 등장한 패턴 번호만 모음 (`pattern in text` 를 모든 패턴에 대해 한 번에 계산)
+"""
+
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# (시작 오프셋, 끝 오프셋(미포함), 패턴, 값)
+Match = Tuple[int, int, str, Any]
+
+
+class AhoCorasick:
+    """다중 패턴 검색 오토마톤 (검색은 스레드 안전, 추가와 검색이 겹치면 다음 검색에서 반영)"""
+
+    def __init__(self, patterns: Optional[Iterable[Tuple[str, Any]]] = None, ignore_case: bool = False):
+        """
+        Args:
+            patterns (Optional[Iterable[Tuple[str, Any]]]): (패턴, 값) 목록
+            ignore_case (bool): 대소문자 무시 (영문 등)
+        """
+        self.ignore_case = ignore_case
+        # 상태별 전이, 실패 링크, 상태가 끝인 패턴 번호, 출력 링크(가장 가까운 '끝 상태' 접미사)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._terminal: List[int] = [-1]
+        self._output: List[int] = [0]
+        self._depth: List[int] = [0]
+        # 실패 트리 역방향 (상태 → 그 상태를 실패 링크로 가리키는 상태들), 연결된 뒤에만 유지
+        self._fail_children: Dict[int, Set[int]] = {}
+        self._patterns: List[Tuple[str, Any]] = []
+        self._index: Dict[str, int] = {}
+        self._linked = False
+        self._lock = threading.Lock()
+        for pattern, value in patterns or ():
+            self.add(pattern, value)
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def __contains__(self, pattern: str) -> bool:
+        return self._fold(pattern) in self._index
+
+    def _fold(self, text: str) -> str:
+        return text.lower() if self.ignore_case else text
+
+    def add(self, pattern: str, value: Any = None) -> bool:
+        """
+        패턴 추가. 이미 있는 패턴이면 값만 바꿈
+
+        Returns:
+            bool: 새 패턴이면 True
+        """
+        if not pattern:
+            return False
+        key = self._fold(pattern)
+        with self._lock:
+            if key in self._index:
+                self._patterns[self._index[key]] = (pattern, value)
+                return False
+            state = 0
+            created: List[Tuple[int, str, int]] = []
+            for char in key:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._terminal.append(-1)
+                    self._output.append(0)
+                    self._depth.append(self._depth[state] + 1)
+                    self._goto[state][char] = next_state
+                    created.append((state, char, next_state))
+                state = next_state
+            self._index[key] = len(self._patterns)
+            self._terminal[state] = len(self._patterns)
+            self._patterns.append((pattern, value))
+            if self._linked:
+                self._relink(created, state)
+        return True
+
+    def get(self, pattern: str, default: Any = None) -> Any:
+        position = self._index.get(self._fold(pattern))
+        return default if position is None else self._patterns[position][1]
+
+    def _link(self):
+        """첫 검색 직전에 너비 우선으로 실패/출력 링크 연결 (이후 추가는 add 에서 증분 연결)"""
+        if self._linked:
+            return
+        with self._lock:
+            if self._linked:
+                return
+            goto, fail, terminal, output = self._goto, self._fail, self._terminal, self._output
+            queue = deque()
+            for child in goto[0].values():
+                fail[child] = 0
+                output[child] = 0
+                queue.append(child)
+            while queue:
+                state = queue.popleft()
+                for char, child in goto[state].items():
+                    link = fail[state]
+                    while link and char not in goto[link]:
+                        link = fail[link]
+                    target = goto[link].get(char, 0)
+                    fail[child] = target
+                    output[child] = fail[child] if terminal[fail[child]] >= 0 else output[fail[child]]
+                    queue.append(child)
+            self._fail_children = {}
+            for state in range(1, len(goto)):
+                self._fail_children.setdefault(fail[state], set()).add(state)
+            self._linked = True
+
+    def _set_fail(self, state: int, target: int):
+        children = self._fail_children.get(self._fail[state])
+        if children is not None:
+            children.discard(state)
+        self._fail[state] = target
+        self._fail_children.setdefault(target, set()).add(state)
+
+    def _relink(self, created: List[Tuple[int, str, int]], end: int):
+        """
+        패턴 하나를 추가한 뒤 바뀐 링크만 다시 연결 (잠금 안에서 호출).
+
+        Args:
+            created (List[Tuple[int, str, int]]): 새로 만든 (부모 상태, 문자, 상태) 목록 (경로 순)
+            end (int): 패턴이 끝나는 상태
+        """
+        goto, fail, terminal, output, depth = self._goto, self._fail, self._terminal, self._output, self._depth
+        new_states = {state for _, _, state in created}
+        roots = [end]
+        for parent, char, state in created:
+            link = fail[parent]
+            while link and char not in goto[link]:
+                link = fail[link]
+            self._set_fail(state, goto[link].get(char, 0) if parent else 0)
+            roots.append(state)
+            # 부모의 실패 트리 하위(부모 문자열로 끝나는 상태) 중 char 전이가 있는 상태의 자식은
+            # 새 상태 문자열로 끝나므로 새 상태가 가장 긴 접미사가 됨. 그 하위는 더 긴 접미사가 있어 그대로 둠
+            stack = list(self._fail_children.get(parent, ()))
+            while stack:
+                suffix_state = stack.pop()
+                child = goto[suffix_state].get(char)
+                if child is None:
+                    stack.extend(self._fail_children.get(suffix_state, ()))
+                elif child not in new_states and depth[fail[child]] < depth[state]:
+                    self._set_fail(child, state)
+                    roots.append(child)
+        # 실패 링크가 바뀐 상태와 새 끝 상태의 실패 트리 하위 출력 링크를 위에서부터 다시 계산
+        for root in sorted(set(roots), key=depth.__getitem__):
+            stack = [root]
+            while stack:
+                state = stack.pop()
+                link = fail[state]
+                output[state] = link if terminal[link] >= 0 else output[link]
+                stack.extend(self._fail_children.get(state, ()))
+
+    def _emit(self, state: int, end: int) -> Iterator[Match]:
+        terminal, output = self._terminal, self._output
+        if terminal[state] < 0:
+            state = output[state]
+        while state:
+            pattern, value = self._patterns[terminal[state]]
+            yield end - self._depth[state], end, pattern, value
+            state = output[state]
+
+    def scan(self, text: str, state: int = 0, offset: int = 0) -> Tuple[List[Match], int]:
+        """
+        text를 state에서 이어서 순회하여 (겹치는 것 포함) 모든 일치와 마지막 상태 반환.
+        offset은 text 첫 글자의 전체 스트림 기준 위치
+        """
+        self._link()
+        folded = self._fold(text)
+        if len(folded) != len(text):  # 대소문자 변환으로 길이가 바뀌는 문자 (드묾)
+            folded = ''.join(c if len(c.lower()) != 1 else c.lower() for c in text)
+        goto, fail, terminal, output = self._goto, self._fail, self._terminal, self._output
+        matches: List[Match] = []
+        position = offset
+        for char in folded:
+            position += 1
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if state and (terminal[state] >= 0 or output[state]):
+                matches.extend(self._emit(state, position))
+        return matches, state
+
+    def scan_distinct(self, text: str, state: int = 0,
+                      found: Optional[Set[int]] = None) -> Tuple[Set[int], int]:
+        """
+        text를 state에서 이어서 순회하여 등장한 패턴 번호(추가 순서) 집합과 마지막 상태 반환.
+        found를 넘기면 이어서 채움. 이미 거쳐 간 끝 상태는 출력 링크를 다시 따라가지 않음
+        """
+        self._link()
+        folded = self._fold(text)
+        if len(folded) != len(text):
+            folded = ''.join(c if len(c.lower()) != 1 else c.lower() for c in text)
+        goto, fail, terminal, output = self._goto, self._fail, self._terminal, self._output
+        found = set() if found is None else found
+        visited: Set[int] = set()
+        for char in folded:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if state and state not in visited and (terminal[state] >= 0 or output[state]):
+                emit = state
+                while emit and emit not in visited:
+                    visited.add(emit)
+                    if terminal[emit] >= 0:
+                        found.add(terminal[emit])
+                    emit = output[emit]
+        return found, state
+
+    def pattern(self, pattern_id: int) -> Tuple[str, Any]:
+        """패턴 번호의 (패턴, 값)"""
+        return self._patterns[pattern_id]
+
+    def iter(self, text: str) -> Iterator[Match]:
+        """겹치는 것을 포함한 모든 일치 (끝 위치 순)"""
+        return iter(self.scan(text)[0])
+
+    def find_longest(self, text: str) -> List[Match]:
+        """왼쪽부터 가장 긴 일치만 고른 겹치지 않는 일치 목록"""
+        matches = sorted(self.scan(text)[0], key=lambda m: (m[0], -(m[1] - m[0])))
+        selected: List[Match] = []
+        end = 0
+        for match in matches:
+            if match[0] >= end:
+                selected.append(match)
+                end = match[1]
+        return selected
+
+    @property
+    def state_count(self) -> int:
+        return len(self._goto)
+
+
+class StreamScanner:
+    """청크 스트림 스캐너. 청크 경계에 걸친 일치도 찾고 오프셋은 스트림 전체 기준"""
+
+    def __init__(self, automaton: AhoCorasick):
+        self.automaton = automaton
+        self.state = 0
+        self.offset = 0
+
+    def feed(self, chunk: str) -> List[Match]:
+        matches, self.state = self.automaton.scan(chunk, self.state, self.offset)
+        self.offset += len(chunk)
+        return matches
+
+    def reset(self):
+        self.state = 0
+        self.offset = 0
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+aho_corasick_test.py
+- Aho-Corasick 오토마톤(aho_corasick.py), 개체 사전(entity_gazetteer.py), 민감도 매처(sensitivity_scanner.py) 검증
+- `pattern in text` / 정규식 결과와 비교 (외부 서비스 없이 실행)
+
+사용법:
+    python aho_corasick_test.py
+"""
+
+import re
+import sys
+import random
+
+from aho_corasick import AhoCorasick, StreamScanner
+from entity_gazetteer import EntityGazetteer
+from sensitivity_scanner import SensitivityMatcher, naive_counts
+
+
+def brute_force(patterns, text):
+    """겹치는 것을 포함한 모든 (시작, 끝, 패턴)"""
+    return sorted((m.start(), m.start() + len(p), p) for p in patterns
+                  for m in re.finditer('(?=' + re.escape(p) + ')', text))
+
+
+def test_overlapping_matches():
+    patterns = ['he', 'she', 'his', 'hers', '기밀', '밀']
+    automaton = AhoCorasick((p, p) for p in patterns)
+    text = 'ushers 기밀 his 밀'
+    found = sorted((start, end, pattern) for start, end, pattern, _ in automaton.iter(text))
+    assert found == brute_force(patterns, text), found
+
+
+def test_random_against_brute_force():
+    rng = random.Random(3)
+    alphabet = 'ab가나'
+    for _ in range(50):
+        patterns = list({''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(8)})
+        text = ''.join(rng.choice(alphabet) for _ in range(60))
+        automaton = AhoCorasick((p, None) for p in patterns)
+        found = sorted((start, end, pattern) for start, end, pattern, _ in automaton.iter(text))
+        assert found == brute_force(patterns, text)
+        distinct = {automaton.pattern(i)[0] for i in automaton.scan_distinct(text)[0]}
+        assert distinct == {p for p in patterns if p in text}
+
+
+def test_add_after_search_relinks():
+    automaton = AhoCorasick([('abc', 1)])
+    assert [m[2] for m in automaton.iter('xabcd')] == ['abc']
+    assert automaton.add('bcd', 2) and not automaton.add('abc', 3)
+    assert automaton.get('abc') == 3
+    assert sorted(m[2] for m in automaton.iter('xabcd')) == ['abc', 'bcd']
+
+
+def links_by_string(automaton):
+    """상태 번호 대신 상태 문자열로 본 (실패 링크, 출력 링크)"""
+    strings = {0: ''}
+    stack = [0]
+    while stack:
+        state = stack.pop()
+        for char, child in automaton._goto[state].items():
+            strings[child] = strings[state] + char
+            stack.append(child)
+    return {strings[state]: (strings[automaton._fail[state]], strings[automaton._output[state]])
+            for state in range(1, automaton.state_count)}
+
+
+def test_incremental_add_matches_full_build():
+    rng = random.Random(5)
+    for _ in range(100):
+        patterns = list({''.join(rng.choice('ab가') for _ in range(rng.randint(1, 5))) for _ in range(20)})
+        split = rng.randint(0, len(patterns))
+        automaton = AhoCorasick((p, None) for p in patterns[:split])
+        text = ''.join(rng.choice('ab가') for _ in range(40))
+        automaton.scan(text)
+        for pattern in patterns[split:]:
+            automaton.add(pattern)
+            # 검색 뒤 추가는 바뀐 링크만 고치므로 전체 연결을 다시 하지 않음
+            assert automaton._linked
+        fresh = AhoCorasick((p, None) for p in patterns)
+        fresh.scan('')
+        assert links_by_string(automaton) == links_by_string(fresh), patterns
+        found = sorted((start, end, pattern) for start, end, pattern, _ in automaton.iter(text))
+        assert found == brute_force(patterns, text)
+
+
+def test_stream_scanner_finds_matches_across_chunks():
+    automaton = AhoCorasick([('기밀문서', None), ('문서', None)])
+    scanner = StreamScanner(automaton)
+    matches = []
+    for chunk in ['이 기', '밀문', '서는 문', '서다']:
+        matches += scanner.feed(chunk)
+    text = '이 기밀문서는 문서다'
+    assert sorted((s, e, p) for s, e, p, _ in matches) == brute_force(['기밀문서', '문서'], text)
+
+
+def test_find_longest_and_ignore_case():
+    automaton = AhoCorasick([('ai', 'AI'), ('ai 기술', 'AI 기술')], ignore_case=True)
+    assert [m[3] for m in automaton.find_longest('AI 기술과 ai')] == ['AI 기술', 'AI']
+
+
+def test_sensitivity_matcher_matches_naive_counts():
+    keywords = {"high": ["비밀", "기밀", "계약"], "medium": ["검토", "계약"], "low": ["공개", ""]}
+    matcher = SensitivityMatcher(keywords)
+    for text in ["기밀 계약 검토", "공개 자료", "", "비밀비밀 계약서"]:
+        assert matcher.count(text) == naive_counts(keywords, text), text
+    pages = ["기", "밀 문서의 계", "약 조건"]
+    counts, scan = matcher.count_pages(pages)
+    assert dict(zip(matcher.levels, counts)) == naive_counts(keywords, ''.join(pages))
+    # 페이지별로는 키워드가 끝나는 페이지에서 셈
+    assert [page[0] for page in matcher.page_counts(pages)] == [0, 1, 1]
+
+
+def test_gazetteer_aliases_and_boundaries():
+    gazetteer = EntityGazetteer([('조대표', '인물'), ('AI', '기술'), ('GIA_INFOSYS', '프로젝트')])
+    found = gazetteer.find('조 대표님과 GIA_INFOSYS 의 AI 도입, EMAIL 검토')
+    assert [(e['name'], e['matched']) for e in found] == [('조대표', '조 대표님'), ('GIA_INFOSYS', 'GIA_INFOSYS'),
+                                                           ('AI', 'AI')]
+    assert gazetteer.resolve('조대표님') == '조대표' and gazetteer.kind_of('조 대표') == '인물'
+
+
+TESTS = [
+    test_overlapping_matches,
+    test_random_against_brute_force,
+    test_add_after_search_relinks,
+    test_incremental_add_matches_full_build,
+    test_stream_scanner_finds_matches_across_chunks,
+    test_find_longest_and_ignore_case,
+    test_sensitivity_matcher_matches_naive_counts,
+    test_gazetteer_aliases_and_boundaries,
+]
+
+
+def main():
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+    print(f"=== {len(TESTS) - failed}/{len(TESTS)} 통과 ===")
+    return failed == 0
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
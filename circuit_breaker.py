@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+circuit_breaker.py
+- 백엔드/키 단위 서킷 브레이커: 최근 호출의 오류율이 임계치를 넘으면 차단(open)
+- 차단 시간이 지나면 시험 호출 1건(half-open)으로 복구 여부 확인
+- 관측된 지연 백분위수(p99)에 맞춰 타임아웃을 조정하는 적응형 타임아웃
+"""
+
+import os
+import math
+import time
+import threading
+import logging
+from collections import deque
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 있어 호출하지 않음"""
+
+    def __init__(self, message: str, retry_in: float = 0.0):
+        super().__init__(message)
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """오류율 기반 서킷 브레이커 (스레드 안전)"""
+
+    def __init__(self, name: str, error_rate_threshold: float = 0.5, window: int = 20,
+                 min_calls: int = 5, open_seconds: float = 30.0, clock=time.monotonic):
+        """
+        Args:
+            name (str): 브레이커 이름 (예: gemini/GEMINI_API_KEY_1)
+            error_rate_threshold (float): 차단 오류율 임계치
+            window (int): 오류율 계산에 쓰는 최근 호출 수
+            min_calls (int): 판단에 필요한 최소 호출 수
+            open_seconds (float): 차단 유지 시간
+        """
+        self.name = name
+        self.error_rate_threshold = error_rate_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._results = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_inflight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def retry_in(self) -> float:
+        """다음 시험 호출까지 남은 시간(초)"""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.open_seconds - (self._clock() - self._opened_at))
+
+    def available(self) -> bool:
+        """상태를 바꾸지 않고 호출 가능 여부만 확인"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        with self._lock:
+            return state == HALF_OPEN and not self._probe_inflight
+
+    def allow(self) -> bool:
+        """호출 허가. half-open 상태에서는 시험 호출 1건만 허가"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and self._clock() - self._opened_at < self.open_seconds:
+                return False
+            if self._probe_inflight:
+                return False
+            self._state = HALF_OPEN
+            self._probe_inflight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._results.append(True)
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._probe_inflight = False
+                self._results.clear()
+                logger.info(f"서킷 복구: {self.name}")
+
+    def release(self):
+        """결과 없이 중단된 호출 (성공/실패로 세지 않고, half-open 시험 호출이었으면 다음 시험 호출 허가)"""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probe_inflight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._results.append(False)
+            if self._state == HALF_OPEN:
+                self._trip()
+                return
+            failures = self._results.count(False)
+            if (self._state == CLOSED and len(self._results) >= self.min_calls
+                    and failures / len(self._results) >= self.error_rate_threshold):
+                self._trip()
+
+    def _trip(self):
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._probe_inflight = False
+        logger.warning(f"서킷 차단: {self.name} ({self.open_seconds:g}초)")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = len(self._results)
+            failures = self._results.count(False)
+        return {"state": self.state, "recent_calls": calls,
+                "error_rate": round(failures / calls, 3) if calls else 0.0}
+
+
+class BreakerRegistry:
+    """(백엔드, 키) 별 서킷 브레이커 모음"""
+
+    def __init__(self, **breaker_kwargs):
+        self.breaker_kwargs = breaker_kwargs
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'BreakerRegistry':
+        return cls(
+            error_rate_threshold=float(os.getenv('CIRCUIT_ERROR_RATE', 0.5)),
+            window=int(os.getenv('CIRCUIT_WINDOW', 20)),
+            min_calls=int(os.getenv('CIRCUIT_MIN_CALLS', 5)),
+            open_seconds=float(os.getenv('CIRCUIT_OPEN_SECONDS', 30)),
+        )
+
+    def get(self, backend: str, key_label: str = '*') -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get((backend, key_label))
+            if breaker is None:
+                breaker = CircuitBreaker(f"{backend}/{key_label}", **self.breaker_kwargs)
+                self._breakers[(backend, key_label)] = breaker
+            return breaker
+
+    def retry_in(self, backend: str) -> float:
+        """해당 백엔드에서 가장 먼저 시험 호출이 가능해지는 시간(초)"""
+        with self._lock:
+            breakers = [b for (name, _), b in self._breakers.items() if name == backend]
+        return min((b.retry_in() for b in breakers), default=0.0)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            items = list(self._breakers.values())
+        return {b.name: b.snapshot() for b in items}
+
+
+class AdaptiveTimeout:
+    """관측 지연의 백분위수 × 배수로 타임아웃 산정 (최소/최대 범위 내)"""
+
+    def __init__(self, initial: float, percentile: float = 99.0, multiplier: float = 1.5,
+                 floor: float = 2.0, ceiling: float = 60.0, window: int = 200, min_samples: int = 20):
+        self.initial = initial
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.floor = floor
+        self.ceiling = ceiling
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, initial: float) -> 'AdaptiveTimeout':
+        return cls(
+            initial,
+            percentile=float(os.getenv('GEMINI_TIMEOUT_PERCENTILE', 99)),
+            multiplier=float(os.getenv('GEMINI_TIMEOUT_MULTIPLIER', 1.5)),
+            floor=float(os.getenv('GEMINI_TIMEOUT_MIN', 2)),
+            ceiling=float(os.getenv('GEMINI_TIMEOUT_MAX', max(initial, 60))),
+        )
+
+    def observe(self, latency: float):
+        with self._lock:
+            self._latencies.append(latency)
+
+    def latency_percentile(self, q: float) -> Optional[float]:
+        """관측 지연의 q 백분위수 (표본 부족 시 None)"""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+        return ordered[rank - 1]
+
+    def current(self) -> float:
+        """현재 타임아웃(초)"""
+        observed = self.latency_percentile(self.percentile)
+        if observed is None:
+            return self.initial
+        return min(self.ceiling, max(self.floor, observed * self.multiplier))
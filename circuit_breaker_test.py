@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+circuit_breaker_test.py
+- 서킷 브레이커/적응형 타임아웃(circuit_breaker.py) 검증
+- 가짜 Gemini 서버(fake_gemini_server.py)로 차단 중에는 요청이 나가지 않는지 확인 (API 키/네트워크 불필요)
+
+사용법:
+    python circuit_breaker_test.py
+"""
+
+import sys
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, AdaptiveTimeout, BreakerRegistry, CircuitBreaker, CircuitOpenError
+from fake_gemini_server import FakeGeminiConfig, FakeGeminiServer
+from gemini_client import GeminiExtractionClient
+from gemini_key_pool import GeminiKeyPool
+from llm_telemetry import TelemetryLogger
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_trips_on_error_rate_after_min_calls():
+    breaker = CircuitBreaker('t', error_rate_threshold=0.5, window=10, min_calls=4, open_seconds=30,
+                             clock=FakeClock())
+    for _ in range(3):
+        breaker.record_failure()
+    # 최소 호출 수 전에는 차단하지 않음
+    assert breaker.state == CLOSED
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+
+def test_half_open_allows_single_probe_and_recovers():
+    clock = FakeClock()
+    breaker = CircuitBreaker('t', min_calls=2, open_seconds=30, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 29.0
+    assert not breaker.allow() and breaker.retry_in() == 1.0
+    clock.now = 30.0
+    assert breaker.state == HALF_OPEN and breaker.available()
+    assert breaker.allow()
+    # 시험 호출이 진행 중이면 다른 호출은 막음
+    assert not breaker.allow() and not breaker.available()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.snapshot()['recent_calls'] == 0
+
+
+def test_failed_probe_reopens():
+    clock = FakeClock()
+    breaker = CircuitBreaker('t', min_calls=2, open_seconds=30, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 31.0
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.retry_in() == 30.0
+
+
+def test_adaptive_timeout_follows_observed_latency():
+    timeout = AdaptiveTimeout(30.0, percentile=99, multiplier=1.5, floor=2, ceiling=60, min_samples=20)
+    assert timeout.current() == 30.0
+    for _ in range(19):
+        timeout.observe(1.0)
+    assert timeout.current() == 30.0
+    timeout.observe(4.0)
+    assert timeout.current() == 6.0
+    for _ in range(20):
+        timeout.observe(100.0)
+    assert timeout.current() == 60.0
+
+
+def test_open_circuit_stops_requests_to_failing_backend():
+    with FakeGeminiServer(FakeGeminiConfig(seed=4, error_rate=1.0)) as server:
+        client = GeminiExtractionClient(key_pool=GeminiKeyPool({"GEMINI_API_KEY_1": "fake-key-1"}),
+                                        base_url=server.base_url, telemetry=TelemetryLogger(enabled=False))
+        client.breakers = BreakerRegistry(min_calls=3, open_seconds=60)
+        errors = []
+        for _ in range(6):
+            try:
+                client.generate("안녕하세요")
+            except Exception as e:
+                errors.append(type(e))
+        client.close()
+        sent = server.stats.to_dict()['requests']
+    assert sent == 3, sent
+    assert errors[3:] == [CircuitOpenError] * 3, errors
+    assert client.breakers.get('gemini', 'GEMINI_API_KEY_1').state == OPEN
+
+
+TESTS = [
+    test_trips_on_error_rate_after_min_calls,
+    test_half_open_allows_single_probe_and_recovers,
+    test_failed_probe_reopens,
+    test_adaptive_timeout_follows_observed_latency,
+    test_open_circuit_stops_requests_to_failing_backend,
+]
+
+
+def main():
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+    print(f"=== {len(TESTS) - failed}/{len(TESTS)} 통과 ===")
+    return failed == 0
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+entity_gazetteer.py
+- Notion People_Network / Knowledge_Graph / Projects_Master 의 알려진 이름으로 만든 개체 사전
+- 직함/존칭 별칭 자동 생성 (조대표 → 조대표님, 조 대표, 조 대표님)
+- Aho-Corasick 오토마톤으로 본문을 한 번만 순회하여 알려진 개체를 모두 찾음
+- 이름이 추가되면 오토마톤에 해당 이름만 삽입 (링크는 다음 검색 때 한 번 재연결)
+- LLM이 찾은 개체와 병합 (별칭·표기 변형은 entity_resolver로 문서 단위 일괄 연결하여 대표 이름으로 통일)
+
+사용법:
+    python entity_gazetteer.py [텍스트]    # 사전 규모와 텍스트에서 찾은 개체 출력
+"""
+
+import os
+import re
+import sys
+import json
+import logging
+import threading
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from aho_corasick import AhoCorasick
+from entity_resolver import EntityResolver, normalize_name
+from local_extractor import PERSON, PROJECT, TITLES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GAZETTEER_PATH = 'entity_gazetteer.json'
+UNKNOWN = '미분류'
+
+# Notion DB 별 (환경 변수, 제목 속성, 유형 속성, 기본 유형)
+NOTION_SOURCES = (
+    ('PEOPLE_NETWORK_DB_ID', '인물명', None, PERSON),
+    ('KNOWLEDGE_GRAPH_DB_ID', '지식노드명', '지식유형', '개념'),
+    ('PROJECTS_MASTER_DB_ID', '프로젝트명', None, PROJECT),
+)
+
+# Notion 미연동 시 기본 사전 (현재 파이프라인에서 쓰는 이름)
+DEFAULT_ENTITIES = (
+    ('조대표', PERSON), ('나실장', PERSON), ('노팀장', PERSON), ('서대리', PERSON),
+    ('GIA_INFOSYS', PROJECT), ('개인정보시스템', PROJECT),
+    ('Notion', '기술'), ('Gemini', '기술'), ('AI 기술', '기술'),
+)
+
+TITLE_SUFFIX_PATTERN = re.compile(r'^([가-힣]{1,3}) ?(' + '|'.join(sorted(TITLES, key=len, reverse=True)) + r')(님)?$')
+ASCII_WORD_PATTERN = re.compile(r'[A-Za-z0-9_]')
+
+
+def person_aliases(name: str, title: Optional[str] = None) -> List[str]:
+    """
+    인물 이름의 표기 변형.
+    '조대표' → 조대표님, 조 대표, 조 대표님 / ('조민수', '대표') → 조민수 대표, 조민수대표, 조대표 등
+    """
+    aliases = []
+    match = TITLE_SUFFIX_PATTERN.match(name)
+    if match:
+        base, title_part = match.group(1), match.group(2)
+        forms = [(base, title_part)]
+    elif title:
+        base, title_part = name, title
+        forms = [(name, title)]
+        if 2 <= len(name) <= 4:
+            forms.append((name[0], title))  # 성 + 직함
+    else:
+        return [name + '님'] if re.fullmatch(r'[가-힣]{2,4}', name) else []
+    for base, title_part in forms:
+        for spacer in ('', ' '):
+            for honorific in ('', '님'):
+                aliases.append(f"{base}{spacer}{title_part}{honorific}")
+    return [alias for alias in dict.fromkeys(aliases) if alias != name]
+
+
+class EntityGazetteer:
+    """알려진 개체 사전 + Aho-Corasick 검색"""
+
+    def __init__(self, entities: Iterable[Tuple[str, str]] = ()):
+        """
+        Args:
+            entities (Iterable[Tuple[str, str]]): (이름, 유형) 목록
+        """
+        self.entities: Dict[str, Dict[str, Any]] = {}
+        self._automaton = AhoCorasick(ignore_case=True)
+        self._resolver: Optional[EntityResolver] = None
+        for name, kind in entities:
+            self.add(name, kind)
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    @property
+    def alias_count(self) -> int:
+        return len(self._automaton)
+
+    def add(self, name: str, kind: str = UNKNOWN, aliases: Iterable[str] = (), title: Optional[str] = None,
+            source: str = '') -> bool:
+        """
+        개체 추가 (이미 있으면 별칭만 보강). 인물은 직함/존칭 별칭을 자동 생성
+
+        Returns:
+            bool: 새 개체면 True
+        """
+        name = name.strip()
+        if not name:
+            return False
+        entity = self.entities.get(name)
+        is_new = entity is None
+        if is_new:
+            entity = {"name": name, "type": kind, "aliases": [], "source": source}
+            self.entities[name] = entity
+        generated = person_aliases(name, title) if kind == PERSON else []
+        for alias in [name, *aliases, *generated]:
+            alias = alias.strip()
+            # 다른 개체의 이름과 겹치는 별칭은 그 개체에 남겨 둠
+            owner = self._automaton.get(alias)
+            if owner is not None and owner != name:
+                continue
+            if self._automaton.add(alias, name) and alias != name:
+                entity["aliases"].append(alias)
+        return is_new
+
+    def resolve(self, name: str) -> Optional[str]:
+        """이름/별칭의 대표 이름 (모르는 이름이면 None)"""
+        return self._automaton.get(name.strip())
+
+    @property
+    def resolver(self) -> EntityResolver:
+        """표기 변형까지 연결하는 일괄 연결기 (최초 사용 시 생성, 사전이 바뀌면 색인 재구성)"""
+        if self._resolver is None:
+            self._resolver = EntityResolver.from_env(self)
+        return self._resolver
+
+    def kind_of(self, name: str, default: str = PERSON) -> str:
+        canonical = self.resolve(name)
+        return self.entities[canonical]["type"] if canonical else default
+
+    @staticmethod
+    def _on_boundary(text: str, start: int, end: int) -> bool:
+        """영숫자로 시작/끝나는 일치는 앞뒤가 영숫자가 아닐 때만 인정 (예: AI ⊄ EMAIL)"""
+        if ASCII_WORD_PATTERN.match(text[start]) and start > 0 and ASCII_WORD_PATTERN.match(text[start - 1]):
+            return False
+        if ASCII_WORD_PATTERN.match(text[end - 1]) and end < len(text) and ASCII_WORD_PATTERN.match(text[end]):
+            return False
+        return True
+
+    def find(self, text: str) -> List[Dict[str, Any]]:
+        """
+        본문에서 알려진 개체 검색 (겹치면 왼쪽·가장 긴 일치 우선)
+
+        Returns:
+            List[Dict[str, Any]]: 등장 순 개체 {name, type, confidence, offset, matched}, 대표 이름 기준 중복 제거
+        """
+        found: Dict[str, Dict[str, Any]] = {}
+        for start, end, alias, canonical in self._automaton.find_longest(text):
+            if canonical in found or not self._on_boundary(text, start, end):
+                continue
+            found[canonical] = {"name": canonical, "type": self.entities[canonical]["type"],
+                                "confidence": 0.95, "offset": start, "matched": text[start:end]}
+        return list(found.values())
+
+    def merge(self, text: str, llm_entities: Iterable[Any]) -> List[Dict[str, Any]]:
+        """
+        사전 검색 결과와 LLM 추출 개체 병합.
+        LLM 개체는 문서 단위로 한 번에 연결하여 별칭·표기 변형(조 대표님, Cho CEO)이면 대표 이름으로 바꾸고,
+        사전에 없으면 LLM이 준 유형(없으면 인물)으로 추가 (정규화 키가 같은 이름은 하나로 묶음)
+        """
+        merged = {entity["name"]: entity for entity in self.find(text)}
+        items = []
+        for item in llm_entities or []:
+            if isinstance(item, dict):
+                name, kind, confidence = item.get("name", ''), item.get("type"), item.get("confidence", 0.7)
+            else:
+                name, kind, confidence = str(item), None, 0.7
+            name = name.strip()
+            if name:
+                items.append((name, kind, confidence))
+        unresolved: Dict[str, str] = {}
+        for (name, kind, confidence), resolved in zip(items, self.resolver.resolve_batch([i[0] for i in items])):
+            canonical = resolved["name"]
+            if canonical:
+                confidence = round(confidence * resolved["score"], 4)
+                entity = merged.setdefault(canonical, {
+                    "name": canonical, "type": self.entities[canonical]["type"], "confidence": confidence})
+            else:
+                key = normalize_name(name) or name
+                entity = merged.setdefault(unresolved.setdefault(key, name), {
+                    "name": name, "type": kind or PERSON, "confidence": confidence})
+            entity["confidence"] = max(entity["confidence"], confidence)
+            entity["llm"] = True
+        return list(merged.values())
+
+    def merge_names(self, text: str, llm_entities: Iterable[Any]) -> List[str]:
+        """merge 결과의 이름 목록 (LLM 추출 결과의 entities 필드 형식)"""
+        return [entity["name"] for entity in self.merge(text, llm_entities)]
+
+    # ---------- 적재/저장 ----------
+
+    def load_notion(self, notion, database_ids: Dict[str, str]) -> int:
+        """
+        Notion DB에서 이름을 읽어 추가
+
+        Args:
+            notion: notion_client.Client
+            database_ids (Dict[str, str]): {환경 변수 이름: DB ID}
+
+        Returns:
+            int: 새로 추가된 개체 수
+        """
+        added = 0
+        for env_name, title_prop, kind_prop, default_kind in NOTION_SOURCES:
+            database_id = database_ids.get(env_name)
+            if not database_id:
+                continue
+            cursor = None
+            while True:
+                query = {"database_id": database_id, "page_size": 100}
+                if cursor:
+                    query["start_cursor"] = cursor
+                response = notion.databases.query(**query)
+                for page in response.get("results", []):
+                    props = page.get("properties", {})
+                    name = ''.join(t.get("plain_text", '') for t in props.get(title_prop, {}).get("title", []))
+                    kind = ((props.get(kind_prop, {}).get("select") or {}).get("name") if kind_prop else None)
+                    title = None
+                    if env_name == 'PEOPLE_NETWORK_DB_ID':
+                        # 직책회사 예: "대표 / GIA" → 첫 단어를 직함으로 사용
+                        position = ''.join(t.get("plain_text", '')
+                                           for t in props.get("직책회사", {}).get("rich_text", []))
+                        title = next((t for t in TITLES if position.startswith(t)), None)
+                    added += self.add(name, kind or default_kind, title=title, source=env_name)
+                if not response.get("has_more"):
+                    break
+                cursor = response.get("next_cursor")
+        logger.info(f"Notion에서 개체 사전 적재: 신규 {added}건 (전체 {len(self)}건, 별칭 포함 {self.alias_count}건)")
+        return added
+
+    def load_json(self, path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return sum(self.add(item["name"], item.get("type", UNKNOWN), item.get("aliases", ()),
+                            source=item.get("source", '')) for item in data)
+
+    def save_json(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(list(self.entities.values()), f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def from_env(cls) -> 'EntityGazetteer':
+        """
+        기본 사전 + ENTITY_GAZETTEER_PATH 스냅샷 + (NOTION_TOKEN 과 DB ID가 있으면) Notion DB.
+        Notion에서 읽은 결과는 스냅샷으로 저장하여 오프라인 실행에서도 사용
+        """
+        gazetteer = cls(DEFAULT_ENTITIES)
+        path = os.getenv('ENTITY_GAZETTEER_PATH', DEFAULT_GAZETTEER_PATH)
+        gazetteer.load_json(path)
+        token = os.getenv('NOTION_TOKEN')
+        database_ids = {env_name: os.getenv(env_name) for env_name, *_ in NOTION_SOURCES if os.getenv(env_name)}
+        if token and database_ids:
+            try:
+                from notion_client import Client
+                if gazetteer.load_notion(Client(auth=token), database_ids):
+                    gazetteer.save_json(path)
+            except Exception as e:
+                logger.warning(f"Notion 개체 사전 적재 실패, 로컬 사전 사용: {e}")
+        return gazetteer
+
+
+_DEFAULT_GAZETTEER: Optional[EntityGazetteer] = None
+_DEFAULT_GAZETTEER_LOCK = threading.Lock()
+
+
+def get_default_gazetteer() -> EntityGazetteer:
+    """
+    프로세스 공용 개체 사전 (최초 호출 시 from_env).
+    from_env 는 Notion 조회와 스냅샷 저장을 하므로 모듈 import 나 객체 생성 시점에 부르지 않는다
+    """
+    global _DEFAULT_GAZETTEER
+    if _DEFAULT_GAZETTEER is None:
+        with _DEFAULT_GAZETTEER_LOCK:
+            if _DEFAULT_GAZETTEER is None:
+                _DEFAULT_GAZETTEER = EntityGazetteer.from_env()
+    return _DEFAULT_GAZETTEER
+
+
+def main():
+    gazetteer = get_default_gazetteer()
+    text = ' '.join(sys.argv[1:]) or "조 대표님과 노팀장은 GIA_INFOSYS 일정과 Notion 연동을 검토했다. EMAIL 발송은 서대리 담당."
+    print(f"개체 사전: {len(gazetteer)}건 (별칭 포함 {gazetteer.alias_count}건)")
+    for entity in gazetteer.find(text):
+        print(f"  {entity['offset']:>4}  {entity['matched']:<12} → {entity['name']} ({entity['type']})")
+    return True
+
+
+if __name__ == '__main__':
+    main()
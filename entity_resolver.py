@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+entity_resolver.py
+- LLM이 추출한 개체 이름을 알려진 개체(개체 사전)의 대표 이름으로 일괄 연결
+- 정규화: 존칭(님/씨/Mr.) 제거, 띄어쓰기·구분자 제거, 영문 직함/로마자 성 한글화 (Cho CEO → 조대표)
+- 1단계: 정규화 키 완전 일치 (사전 조회)
+- 2단계: 문자 n-gram 역색인으로 후보를 좁히고 Dice 유사도로 점수 계산.
+  문서 하나의 미해결 이름을 한 번의 희소 행렬 곱으로 처리 (numpy/scipy 미설치 시 1단계만)
+- 개체 사전이 바뀌면 다음 조회 때 색인을 다시 만듦
+
+사용법:
+    python entity_resolver.py [이름 ...]    # 이름별 연결 결과와 대량 조회 처리량 출력
+"""
+
+import os
+import re
+import sys
+import time
+import threading
+import logging
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # numpy/scipy 미설치 시 정규화 키 완전 일치만 사용
+    np = None
+    sparse = None
+
+from local_extractor import TITLES
+
+logger = logging.getLogger(__name__)
+
+EXACT = 'exact'
+FUZZY = 'fuzzy'
+
+# 영문 직함 → 한글 직함 (긴 표현부터 치환)
+ENGLISH_TITLES = {
+    'chief executive officer': '대표', 'ceo': '대표', 'president': '대표', 'representative': '대표',
+    'executive director': '이사', 'director': '실장', 'chairman': '회장', 'chair': '회장',
+    'general manager': '부장', 'deputy general manager': '차장', 'assistant manager': '대리',
+    'team leader': '팀장', 'team lead': '팀장', 'team manager': '팀장', 'manager': '과장',
+    'professor': '교수', 'prof': '교수', 'dr': '박사',
+}
+
+# 로마자 성 → 한글 성 (뒤에 직함이 올 때만 치환)
+ROMAN_SURNAMES = {
+    'cho': '조', 'jo': '조', 'na': '나', 'ra': '나', 'la': '나', 'no': '노', 'noh': '노', 'roh': '노',
+    'seo': '서', 'suh': '서', 'kim': '김', 'gim': '김', 'lee': '이', 'yi': '이', 'rhee': '이', 'park': '박',
+    'pak': '박', 'bak': '박', 'choi': '최', 'choe': '최', 'jung': '정', 'jeong': '정', 'chung': '정',
+    'kang': '강', 'yoon': '윤', 'yun': '윤', 'jang': '장', 'chang': '장', 'lim': '임', 'im': '임',
+    'han': '한', 'shin': '신', 'sin': '신', 'oh': '오', 'song': '송', 'hwang': '황', 'ahn': '안', 'an': '안',
+    'jeon': '전', 'jun': '전', 'hong': '홍', 'yoo': '유', 'yu': '유', 'ko': '고', 'go': '고', 'moon': '문',
+    'mun': '문', 'son': '손', 'bae': '배', 'baek': '백', 'paik': '백', 'heo': '허', 'huh': '허', 'nam': '남',
+}
+
+HONORIFIC_PREFIX_PATTERN = re.compile(r'^(mr|mrs|ms|miss|mx)\.?\s+')
+HONORIFIC_SUFFIX_PATTERN = re.compile(r'(님|씨)$')
+ENGLISH_TITLE_PATTERN = re.compile(
+    r'\b(' + '|'.join(sorted(map(re.escape, ENGLISH_TITLES), key=len, reverse=True)) + r')\b\.?')
+SEPARATOR_PATTERN = re.compile(r'[\s_\-·.,()\[\]"\'“”‘’/]+')
+TITLE_SET = frozenset(TITLES)
+
+
+def normalize_name(name: str) -> str:
+    """
+    비교용 정규화 키. 예: '조 대표님' / 'Cho CEO' / 'Mr. Cho (CEO)' → '조대표', 'GIA-Infosys' → 'giainfosys'
+    """
+    text = HONORIFIC_PREFIX_PATTERN.sub('', name.strip().lower())
+    text = ENGLISH_TITLE_PATTERN.sub(lambda m: ' ' + ENGLISH_TITLES[m.group(1)] + ' ', text)
+    words = [w for w in SEPARATOR_PATTERN.split(text) if w]
+    for i, word in enumerate(words[:-1]):
+        # 로마자 성 + 직함 (Cho 대표 → 조 대표)
+        if word in ROMAN_SURNAMES and HONORIFIC_SUFFIX_PATTERN.sub('', words[i + 1]) in TITLE_SET:
+            words[i] = ROMAN_SURNAMES[word]
+    return HONORIFIC_SUFFIX_PATTERN.sub('', ''.join(words)) or ''.join(words)
+
+
+def char_ngrams(key: str, n: int = 2) -> List[str]:
+    """경계 표시(^, $)를 붙인 문자 n-gram (한 글자 이름도 n-gram을 가짐)"""
+    padded = f"^{key}$"
+    return list(dict.fromkeys(padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))))
+
+
+class EntityResolver:
+    """개체 사전 위의 정규화 + n-gram 역색인 + Dice 유사도 일괄 연결기 (스레드 안전)"""
+
+    def __init__(self, gazetteer=None, threshold: float = 0.75, ngram: int = 2):
+        """
+        Args:
+            gazetteer (Optional[EntityGazetteer]): 알려진 개체 사전 (기본: 공용 사전)
+            threshold (float): 유사도 연결 최소 Dice 점수
+            ngram (int): 문자 n-gram 길이
+        """
+        if gazetteer is None:
+            from entity_gazetteer import get_default_gazetteer
+            gazetteer = get_default_gazetteer()
+        self.gazetteer = gazetteer
+        self.threshold = threshold
+        self.ngram = ngram
+        self.stats = {'queries': 0, 'exact': 0, 'fuzzy': 0, 'unresolved': 0, 'index_builds': 0}
+        self._lock = threading.Lock()
+        self._signature = None
+        self._keys: Dict[str, str] = {}
+        self._canonicals: List[str] = []
+        self._vocabulary: Dict[str, int] = {}
+        self._postings = None
+        self._sizes = None
+
+    @classmethod
+    def from_env(cls, gazetteer=None) -> 'EntityResolver':
+        return cls(gazetteer, threshold=float(os.getenv('ENTITY_RESOLVER_THRESHOLD', 0.75)))
+
+    def _ensure_index(self):
+        """사전 규모(개체 수, 별칭 수)가 바뀌었으면 정규화 키와 n-gram 역색인을 다시 만듦"""
+        signature = (len(self.gazetteer), self.gazetteer.alias_count)
+        if signature == self._signature:
+            return
+        keys: Dict[str, str] = {}
+        for canonical, entity in self.gazetteer.entities.items():
+            for alias in [canonical, *entity.get("aliases", [])]:
+                keys.setdefault(normalize_name(alias), canonical)
+        keys.pop('', None)
+        canonicals = list(keys.values())
+        vocabulary: Dict[str, int] = {}
+        postings = sizes = None
+        if np is not None:
+            rows, cols = [], []
+            for row, key in enumerate(keys):
+                for gram in char_ngrams(key, self.ngram):
+                    rows.append(vocabulary.setdefault(gram, len(vocabulary)))
+                    cols.append(row)
+            # n-gram × 별칭 행렬 = n-gram별 별칭 목록(역색인)
+            postings = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)),
+                                         shape=(len(vocabulary), len(keys)))
+            sizes = np.asarray(postings.sum(axis=0)).ravel()
+        self._keys, self._canonicals = keys, canonicals
+        self._vocabulary, self._postings, self._sizes = vocabulary, postings, sizes
+        self._signature = signature
+        self.stats['index_builds'] += 1
+        logger.info(f"개체 연결 색인 구성: 정규화 키 {len(keys)}건, n-gram {len(vocabulary)}종")
+
+    def _result(self, query: str, canonical: Optional[str], score: float, method: Optional[str]) -> Dict[str, Any]:
+        entity = self.gazetteer.entities.get(canonical) if canonical else None
+        return {"query": query, "name": canonical, "type": entity["type"] if entity else None,
+                "score": round(score, 4), "method": method}
+
+    def resolve_batch(self, names: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        이름 목록을 한 번에 연결
+
+        Returns:
+            List[Dict[str, Any]]: 입력 순서의 {query, name(대표 이름, 못 찾으면 None), type, score, method}
+        """
+        with self._lock:
+            self._ensure_index()
+            keys = [normalize_name(name) for name in names]
+            results: List[Optional[Dict[str, Any]]] = [None] * len(names)
+            pending: List[int] = []
+            for i, (name, key) in enumerate(zip(names, keys)):
+                canonical = self._keys.get(key)
+                if canonical:
+                    results[i] = self._result(name, canonical, 1.0, EXACT)
+                elif key:
+                    pending.append(i)
+                else:
+                    results[i] = self._result(name, None, 0.0, None)
+            if pending and self._postings is not None and self._postings.shape[1]:
+                for i, (row, score) in zip(pending, self._best_matches([keys[i] for i in pending])):
+                    if row >= 0 and score >= self.threshold:
+                        results[i] = self._result(names[i], self._canonicals[row], score, FUZZY)
+            for i in pending:
+                if results[i] is None:
+                    results[i] = self._result(names[i], None, 0.0, None)
+            self.stats['queries'] += len(names)
+            for result in results:
+                self.stats[result["method"] or 'unresolved'] += 1
+        return results
+
+    def _best_matches(self, keys: List[str]) -> List[Tuple[int, float]]:
+        """미해결 키 전체를 질의 행렬 하나로 만들어 역색인과 곱한 뒤 키별 최고 Dice 점수의 별칭 행 반환"""
+        rows, cols = [], []
+        query_sizes = np.empty(len(keys), dtype=np.float32)
+        for row, key in enumerate(keys):
+            grams = char_ngrams(key, self.ngram)
+            query_sizes[row] = len(grams)
+            for gram in grams:
+                col = self._vocabulary.get(gram)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        queries = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)),
+                                    shape=(len(keys), len(self._vocabulary)))
+        # 공유 n-gram 수: 역색인에서 n-gram을 하나라도 공유하는 별칭만 0이 아님 (후보 차단)
+        overlap = (queries @ self._postings).tocsr()
+        if not overlap.nnz:
+            return [(-1, 0.0)] * len(keys)
+        query_rows = np.repeat(np.arange(len(keys)), np.diff(overlap.indptr))
+        overlap.data = 2 * overlap.data / (query_sizes[query_rows] + self._sizes[overlap.indices])
+        best_rows = np.asarray(overlap.argmax(axis=1)).ravel()
+        best_scores = overlap.max(axis=1).toarray().ravel()
+        return [(int(row) if score > 0 else -1, float(score)) for row, score in zip(best_rows, best_scores)]
+
+    def resolve(self, name: str) -> Dict[str, Any]:
+        return self.resolve_batch([name])[0]
+
+    def canonicalize(self, names: Iterable[str]) -> List[str]:
+        """
+        이름 목록을 대표 이름으로 바꾸고 중복 제거.
+        연결되지 않은 이름도 정규화 키가 같으면 처음 나온 표기 하나로 묶음 (김 과장 / 김과장님)
+        """
+        names = [name for name in names if name and name.strip()]
+        seen: Dict[str, str] = {}
+        for result in self.resolve_batch(names):
+            key = result["name"] or normalize_name(result["query"]) or result["query"]
+            seen.setdefault(key, result["name"] or result["query"].strip())
+        return list(seen.values())
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        queries = stats['queries'] or 1
+        return dict(stats, resolved_rate=round((stats['exact'] + stats['fuzzy']) / queries, 4))
+
+
+def main():
+    from entity_gazetteer import EntityGazetteer, DEFAULT_ENTITIES
+
+    resolver = EntityResolver.from_env()
+    names = sys.argv[1:] or ["조대표", "조 대표님", "Cho CEO", "Mr. Roh (Team Lead)", "GIA-Infosys",
+                             "개인정보 관리시스템", "Notion API", "김 과장", "박사장"]
+    for result in resolver.resolve_batch(names):
+        print(f"  {result['query']:<22} → {result['name'] or '-':<14} {result['method'] or '미해결':<6} "
+              f"{result['score']:.2f}")
+
+    # 대량 조회 처리량: 합성 사전 2만 건, 문서 1천 건 × 개체 20개
+    if np is not None:
+        surnames, given = '김이박최정강조윤장임', '민서준우현지수영호진'
+        gazetteer = EntityGazetteer(DEFAULT_ENTITIES)
+        for i in range(20000):
+            name = surnames[i % 10] + given[(i // 10) % 10] + given[(i // 100) % 10]
+            gazetteer.add(f"{name}{i // 1000}" if i >= 1000 else name, '인물', title=TITLES[i % len(TITLES)])
+        bench = EntityResolver(gazetteer)
+        bench.resolve('warmup')
+        documents = [[f"{surnames[(d + e) % 10]} {TITLES[e % 5]}님" if e % 2 else f"{surnames[e % 10]}{given[d % 10]}"
+                      for e in range(20)] for d in range(1000)]
+        started = time.perf_counter()
+        for entities in documents:
+            bench.resolve_batch(entities)
+        elapsed = time.perf_counter() - started
+        print(f"사전 {len(gazetteer)}건(별칭 {gazetteer.alias_count}건), 문서 {len(documents)}건 × 개체 20개: "
+              f"{elapsed:.2f}초 ({len(documents) / elapsed:.0f} 문서/초), {bench.report()}")
+    return True
+
+
+if __name__ == '__main__':
+    main()
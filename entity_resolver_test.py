@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+entity_resolver_test.py
+- 개체 연결기(entity_resolver.py)의 이름 정규화, 완전 일치/유사도 연결, 사전 변경 시 색인 재구성 검증
+- 개체 사전 병합(entity_gazetteer.py merge)이 LLM 표기 변형을 대표 이름으로 묶는지 확인 (외부 서비스 없이 실행)
+
+사용법:
+    python entity_resolver_test.py
+"""
+
+import sys
+
+from entity_gazetteer import EntityGazetteer
+from entity_resolver import EXACT, FUZZY, EntityResolver, normalize_name
+
+ENTITIES = [('조대표', '인물'), ('노팀장', '인물'), ('GIA_INFOSYS', '프로젝트'), ('개인정보관리시스템', '시스템')]
+
+
+def make_resolver(threshold: float = 0.75):
+    gazetteer = EntityGazetteer(ENTITIES)
+    return gazetteer, EntityResolver(gazetteer, threshold=threshold)
+
+
+def test_normalize_name():
+    for name in ['조대표', '조 대표님', 'Cho CEO', 'Mr. Cho (CEO)']:
+        assert normalize_name(name) == '조대표', name
+    assert normalize_name('Mr. Roh (Team Lead)') == '노팀장'
+    assert normalize_name('GIA-Infosys') == normalize_name('gia_infosys') == 'giainfosys'
+    assert normalize_name('김 과장') == normalize_name('김과장님') == '김과장'
+    # 직함이 뒤에 없으면 로마자 성을 바꾸지 않음
+    assert normalize_name('Cho') == 'cho'
+
+
+def test_aliases_and_spacing_variants_resolve_exactly():
+    _, resolver = make_resolver()
+    names = ['조 대표님', 'Cho CEO', 'GIA-Infosys', '개인정보 관리 시스템', 'Mr. Roh (Team Lead)']
+    results = resolver.resolve_batch(names)
+    assert [r['query'] for r in results] == names
+    assert [r['name'] for r in results] == ['조대표', '조대표', 'GIA_INFOSYS', '개인정보관리시스템', '노팀장']
+    assert all(r['method'] == EXACT and r['score'] == 1.0 for r in results)
+    assert results[2]['type'] == '프로젝트'
+
+
+def test_typo_resolves_by_similarity_above_threshold():
+    _, resolver = make_resolver()
+    result = resolver.resolve('개인정보관리시스탬')
+    assert (result['name'], result['method']) == ('개인정보관리시스템', FUZZY) and 0.75 <= result['score'] < 1.0
+    # 임계값보다 낮은 유사도는 연결하지 않음
+    _, strict = make_resolver(threshold=0.9)
+    assert strict.resolve('개인정보관리시스탬')['name'] is None
+
+
+def test_unknown_and_empty_names_stay_unresolved():
+    _, resolver = make_resolver()
+    for name in ['박사장', '', '   ']:
+        result = resolver.resolve(name)
+        assert result['name'] is None and result['method'] is None and result['score'] == 0.0, result
+    report = resolver.report()
+    assert report['unresolved'] == 3 and report['resolved_rate'] == 0.0
+
+
+def test_canonicalize_dedupes_resolved_and_unresolved_names():
+    _, resolver = make_resolver()
+    names = ['Cho CEO', '조대표', '김 과장', '김과장님', '', 'GIA-Infosys']
+    assert resolver.canonicalize(names) == ['조대표', '김 과장', 'GIA_INFOSYS']
+
+
+def test_index_rebuilds_when_gazetteer_changes():
+    gazetteer, resolver = make_resolver()
+    assert resolver.resolve('서 대리님')['name'] is None
+    assert resolver.resolve('조대표')['name'] == '조대표'
+    assert resolver.report()['index_builds'] == 1
+    gazetteer.add('서대리', '인물')
+    assert resolver.resolve('서 대리님')['name'] == '서대리'
+    assert resolver.report()['index_builds'] == 2
+
+
+def test_gazetteer_merge_folds_llm_variants():
+    gazetteer, _ = make_resolver()
+    merged = gazetteer.merge('조대표와 GIA_INFOSYS 회의',
+                             ['Cho CEO', {'name': '박 사장', 'type': '인물', 'confidence': 0.8}, '박사장님',
+                              'GIA-Infosys', '  '])
+    assert [entity['name'] for entity in merged] == ['조대표', 'GIA_INFOSYS', '박 사장']
+    by_name = {entity['name']: entity for entity in merged}
+    # 본문 사전 검색 결과에 LLM 표기 변형이 합쳐지고, 사전에 없는 이름은 정규화 키로 하나로 묶임
+    assert by_name['조대표']['llm'] and by_name['조대표']['confidence'] == 0.95
+    assert by_name['박 사장'] == {'name': '박 사장', 'type': '인물', 'confidence': 0.8, 'llm': True}
+    assert gazetteer.merge_names('', ['조 대표님', 'Cho CEO']) == ['조대표']
+
+
+TESTS = [
+    test_normalize_name,
+    test_aliases_and_spacing_variants_resolve_exactly,
+    test_typo_resolves_by_similarity_above_threshold,
+    test_unknown_and_empty_names_stay_unresolved,
+    test_canonicalize_dedupes_resolved_and_unresolved_names,
+    test_index_rebuilds_when_gazetteer_changes,
+    test_gazetteer_merge_folds_llm_variants,
+]
+
+
+def main():
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+    print(f"=== {len(TESTS) - failed}/{len(TESTS)} 통과 ===")
+    return failed == 0
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+fake_gemini_server.py
+- 오프라인 부하/지연 테스트용 로컬 Gemini 대체 서버
+- generateContent / streamGenerateContent(SSE) 요청·응답 형식 구현
+- 지연 분포(fixed/uniform/normal/lognormal), 오류·429 주입, 토큰 집계
+- 키별 요청 수는 키 값 대신 sha256 앞 12자리로 집계 (실제 .env 키로 접속해도 /stats 에 키가 남지 않음)
+- 고정(canned) 응답 파일 또는 프롬프트 기반 템플릿 JSON 응답
+
+사용법:
+    python fake_gemini_server.py --port 8765 --latency lognormal:0.8:0.4 --rate-429 0.05
+    GEMINI_API_BASE=http://127.0.0.1:8765/v1beta python notion_uploader_v2.py
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+import logging
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, List, Optional
+
+from token_budget import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+PATH_PATTERN = re.compile(r'^/[^/]+/models/([^/:]+):(generateContent|streamGenerateContent)')
+DOC_ID_PATTERN = re.compile(r'### 문서 id=(\S+)')
+WORD_PATTERN = re.compile(r'[가-힣A-Za-z][가-힣A-Za-z0-9_]+')
+
+
+class LatencyModel:
+    """지연 분포. 'fixed:0.5', 'uniform:0.2:1.0', 'normal:0.8:0.2', 'lognormal:-0.3:0.5' 형식"""
+
+    def __init__(self, spec: str = 'fixed:0', seed: Optional[int] = None):
+        self.spec = spec
+        parts = spec.split(':')
+        self.kind = parts[0]
+        self.params = [float(p) for p in parts[1:]]
+        if self.kind not in ('fixed', 'uniform', 'normal', 'lognormal'):
+            raise ValueError(f"지원하지 않는 지연 분포: {spec}")
+        self._rng = random.Random(seed)
+
+    def sample(self) -> float:
+        p = self.params
+        if self.kind == 'fixed':
+            value = p[0] if p else 0.0
+        elif self.kind == 'uniform':
+            value = self._rng.uniform(p[0], p[1])
+        elif self.kind == 'normal':
+            value = self._rng.gauss(p[0], p[1])
+        else:
+            value = self._rng.lognormvariate(p[0], p[1])
+        return max(0.0, value)
+
+
+class FakeGeminiConfig:
+    """가짜 서버 동작 설정"""
+
+    def __init__(self, latency: str = 'fixed:0', error_rate: float = 0.0, rate_429: float = 0.0,
+                 retry_after: float = 1.0, canned_path: Optional[str] = None,
+                 stream_chunk_chars: int = 24, seed: Optional[int] = None):
+        self.latency = LatencyModel(latency, seed)
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.stream_chunk_chars = stream_chunk_chars
+        self.canned: Optional[Any] = None
+        if canned_path:
+            with open(canned_path, 'r', encoding='utf-8') as f:
+                self.canned = json.load(f)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def roll(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+
+def key_fingerprint(key: Optional[str]) -> str:
+    """API 키 대신 집계에 쓰는 식별자 (키 값은 저장하지 않음)"""
+    if not key:
+        return 'anonymous'
+    return 'sha256:' + hashlib.sha256(key.encode('utf-8')).hexdigest()[:12]
+
+
+class FakeGeminiStats:
+    """요청/토큰 집계"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.responses_ok = 0
+        self.errors_injected = 0
+        self.throttled_injected = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.by_key: Dict[str, int] = {}
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def add_key(self, key: Optional[str]):
+        fingerprint = key_fingerprint(key)
+        with self._lock:
+            self.by_key[fingerprint] = self.by_key.get(fingerprint, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "responses_ok": self.responses_ok,
+                "errors_injected": self.errors_injected,
+                "throttled_injected": self.throttled_injected,
+                "prompt_tokens": self.prompt_tokens,
+                "output_tokens": self.output_tokens,
+                "requests_by_key": dict(self.by_key),
+            }
+
+
+def templated_response(prompt: str) -> str:
+    """프롬프트에서 문서를 읽어 keywords/summary/entities JSON을 생성 (배치 프롬프트는 배열)"""
+    def extract(text: str) -> Dict[str, Any]:
+        words = WORD_PATTERN.findall(text)
+        counts: Dict[str, int] = {}
+        for word in words:
+            counts[word] = counts.get(word, 0) + 1
+        keywords = sorted(counts, key=lambda w: (-counts[w], words.index(w)))[:8]
+        entities = sorted({w for w in words if re.search(r'(대표|실장|팀장|대리)(님)?$', w)})
+        sentences = [s.strip() for s in re.split(r'(?<=[.!?다])\s+', text) if s.strip()]
+        return {"keywords": keywords, "summary": ' '.join(sentences[:2])[:300], "entities": entities}
+
+    doc_ids = DOC_ID_PATTERN.findall(prompt)
+    if doc_ids:
+        chunks = DOC_ID_PATTERN.split(prompt)[1:]
+        items = []
+        for doc_id, body in zip(chunks[0::2], chunks[1::2]):
+            item = extract(body)
+            item["id"] = doc_id
+            items.append(item)
+        return json.dumps(items, ensure_ascii=False)
+    body = prompt.split('텍스트:\n', 1)[-1]
+    return json.dumps(extract(body), ensure_ascii=False)
+
+
+def make_handler(config: FakeGeminiConfig, stats: FakeGeminiStats):
+    class FakeGeminiHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, fmt, *args):
+            logger.debug(fmt % args)
+
+        def _send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+            payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path.rstrip('/') == '/stats':
+                self._send_json(200, stats.to_dict())
+            else:
+                self._send_json(404, {"error": {"code": 404, "message": "not found"}})
+
+        def do_POST(self):
+            match = PATH_PATTERN.match(self.path)
+            length = int(self.headers.get('Content-Length', 0))
+            raw = self.rfile.read(length) if length else b'{}'
+            if not match:
+                self._send_json(404, {"error": {"code": 404, "message": f"unknown path {self.path}"}})
+                return
+            model, method = match.groups()
+            stats.add(requests=1)
+            stats.add_key(self.headers.get('x-goog-api-key'))
+
+            roll = config.roll()
+            if roll < config.rate_429:
+                stats.add(throttled_injected=1)
+                self._send_json(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED",
+                                                "message": "Quota exceeded (fake)"}},
+                                headers={'Retry-After': str(config.retry_after)})
+                return
+            if roll < config.rate_429 + config.error_rate:
+                stats.add(errors_injected=1)
+                time.sleep(config.latency.sample())
+                self._send_json(500, {"error": {"code": 500, "status": "INTERNAL", "message": "injected error"}})
+                return
+
+            try:
+                request = json.loads(raw.decode('utf-8'))
+                prompt = ''.join(part.get('text', '') for content in request.get('contents', [])
+                                 for part in content.get('parts', []))
+            except Exception as e:
+                self._send_json(400, {"error": {"code": 400, "message": f"bad request: {e}"}})
+                return
+
+            if config.canned is not None:
+                text = config.canned if isinstance(config.canned, str) else json.dumps(config.canned, ensure_ascii=False)
+            else:
+                text = templated_response(prompt)
+            usage = {
+                "promptTokenCount": estimate_tokens(prompt),
+                "candidatesTokenCount": estimate_tokens(text),
+            }
+            usage["totalTokenCount"] = usage["promptTokenCount"] + usage["candidatesTokenCount"]
+
+            if method == 'streamGenerateContent':
+                self._stream(text, usage)
+            else:
+                time.sleep(config.latency.sample())
+                self._send_json(200, {
+                    "candidates": [{"content": {"role": "model", "parts": [{"text": text}]},
+                                    "finishReason": "STOP", "index": 0}],
+                    "usageMetadata": usage,
+                    "modelVersion": model,
+                })
+                stats.add(responses_ok=1, prompt_tokens=usage["promptTokenCount"],
+                          output_tokens=usage["candidatesTokenCount"])
+
+        def _stream(self, text: str, usage: Dict[str, int]):
+            step = max(1, config.stream_chunk_chars)
+            chunks: List[str] = [text[i:i + step] for i in range(0, len(text), step)] or ['']
+            # 전체 지연을 청크에 나누어 토큰이 점진적으로 도착하도록 함
+            delay = config.latency.sample() / len(chunks)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            sent_chars = 0
+            try:
+                for index, chunk in enumerate(chunks):
+                    time.sleep(delay)
+                    event: Dict[str, Any] = {"candidates": [{"content": {"role": "model", "parts": [{"text": chunk}]},
+                                                             "index": 0}]}
+                    if index == len(chunks) - 1:
+                        event["candidates"][0]["finishReason"] = "STOP"
+                        event["usageMetadata"] = usage
+                    self.wfile.write(f"data: {json.dumps(event, ensure_ascii=False)}\r\n\r\n".encode('utf-8'))
+                    self.wfile.flush()
+                    sent_chars += len(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                logger.debug("클라이언트가 스트림을 조기 종료")
+            self.close_connection = True
+            stats.add(responses_ok=1, prompt_tokens=usage["promptTokenCount"],
+                      output_tokens=estimate_tokens(text[:sent_chars]) if sent_chars else 0)
+
+    return FakeGeminiHandler
+
+
+class FakeGeminiServer:
+    """백그라운드 스레드에서 동작하는 가짜 Gemini 서버"""
+
+    def __init__(self, config: Optional[FakeGeminiConfig] = None, host: str = '127.0.0.1', port: int = 0):
+        self.config = config or FakeGeminiConfig()
+        self.stats = FakeGeminiStats()
+        self.httpd = ThreadingHTTPServer((host, port), make_handler(self.config, self.stats))
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1beta"
+
+    def start(self) -> 'FakeGeminiServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"가짜 Gemini 서버 시작: {self.base_url}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="로컬 가짜 Gemini 서버")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', default='fixed:0', help="fixed:S | uniform:A:B | normal:MU:SIGMA | lognormal:MU:SIGMA")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="500 오류 주입 비율")
+    parser.add_argument('--rate-429', type=float, default=0.0, help="429 주입 비율")
+    parser.add_argument('--retry-after', type=float, default=1.0)
+    parser.add_argument('--canned', help="고정 응답 JSON 파일 (미지정 시 프롬프트 기반 템플릿 응답)")
+    parser.add_argument('--stream-chunk-chars', type=int, default=24)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    config = FakeGeminiConfig(latency=args.latency, error_rate=args.error_rate, rate_429=args.rate_429,
+                              retry_after=args.retry_after, canned_path=args.canned,
+                              stream_chunk_chars=args.stream_chunk_chars, seed=args.seed)
+    server = FakeGeminiServer(config, args.host, args.port)
+    print(f"=== 가짜 Gemini 서버: {server.base_url} (통계: GET /stats) ===")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.stats.to_dict(), ensure_ascii=False, indent=2))
+        server.httpd.server_close()
+    return True
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,1026 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+gemini_client.py
+- 장기 실행용 Gemini 의미 추출 클라이언트
+- 키별로 한 번만 구성한 모델 핸들과 HTTP 세션(커넥션 풀)을 재사용
+- genai.configure()는 프로세스 전역 설정이라 여러 키를 동시에 쓸 수 없으므로
+  generateContent REST 엔드포인트를 키별 requests.Session으로 직접 호출
+- 키별 서킷 브레이커로 오류가 잦은 키를 일시 차단하고, 관측 p99 지연에 맞춰 타임아웃 조정
+- (선택) 헤지 요청: p90 지연 안에 끝나지 않은 요청을 다른 키로 한 번 더 보내 먼저 온 응답 사용.
+  헤지 대상 요청은 스트리밍으로 받아 진 쪽 연결을 끊고 키를 반납
+- (선택) 모델 단계화: 저렴한 모델로 먼저 추출하고 완성도가 낮을 때만 상위 모델로 재추출
+- 동시에 들어온 같은 문서(같은 캐시 키)의 추출은 진행 중인 호출 하나를 공유 (single-flight)
+- (선택) 트래픽 기록/재생: GEMINI_TRAFFIC_MODE=record|replay (llm_replay.py)
+- 보내기 전에 프롬프트 토큰을 추정하여 모델 입력 한도와 실행 토큰 예산 확인 (token_budget.py).
+  한도를 넘는 문서는 청크로 나눠 추출 후 병합하고, 예산을 넘는 요청은 보내지 않고 TokenBudgetExceeded
+- 스레드/asyncio 태스크 간 공유 가능
+"""
+
+import os
+import copy
+import json
+import time
+import hashlib
+import asyncio
+import threading
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+
+from circuit_breaker import AdaptiveTimeout, BreakerRegistry, CircuitOpenError
+from gemini_key_pool import GeminiKeyPool, KeyState
+from llm_replay import REPLAY, TrafficStore
+from llm_telemetry import TelemetryLogger, estimate_cost, get_default_telemetry
+from prompt_templates import BATCH_DOCUMENT, BATCH_EXTRACTION, EXTRACTION
+from token_budget import (
+    CHUNK, ERROR, TRIM, PromptTooLargeError, RunTokenBudget, TokenBudgetExceeded, TokenEstimator,
+    estimate_tokens, merge_extractions, split_to_fit, trim_to_fit,
+)
+from llm_json_parser import (
+    EXTRACTION_FIELDS, IncrementalJSONParser, LLMResponseParseError,
+    completeness_score, normalize_field, parse_llm_json, validate_extraction,
+)
+
+logger = logging.getLogger(__name__)
+
+GEMINI_API_BASE = 'https://generativelanguage.googleapis.com/v1beta'
+
+
+def pack_batches(documents: Dict[str, str], token_budget: int) -> List[List[Tuple[str, str]]]:
+    """
+    문서를 입력 순서대로 토큰 예산 안에서 묶음
+
+    Args:
+        documents (Dict[str, str]): 문서 id → 텍스트
+        token_budget (int): 배치 하나의 프롬프트 토큰 예산
+
+    Returns:
+        List[List[Tuple[str, str]]]: (문서 id, 텍스트) 배치 목록. 예산을 넘는 문서는 단독 배치
+    """
+    overhead = BATCH_EXTRACTION.static_tokens
+    batches: List[List[Tuple[str, str]]] = []
+    current: List[Tuple[str, str]] = []
+    used = overhead
+    for doc_id, text in documents.items():
+        cost = BATCH_DOCUMENT.estimate_tokens(doc_id=doc_id, text=text)
+        if current and used + cost > token_budget:
+            batches.append(current)
+            current, used = [], overhead
+        current.append((doc_id, text))
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+class GeminiAPIError(Exception):
+    """Gemini API 호출 오류"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class GenerationResult:
+    """generateContent 호출 결과"""
+
+    def __init__(self, text: str, model: str, key_label: str, latency: float,
+                 input_tokens: int = 0, output_tokens: int = 0):
+        self.text = text
+        self.model = model
+        self.key_label = key_label
+        self.latency = latency
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+
+class _HedgeCancelled(Exception):
+    """먼저 도착한 응답이 있어 재시도하지 않거나 진행 중인 스트림을 끊음 (끊기 전까지 쓴 토큰 포함)"""
+
+    def __init__(self, model: Optional[str] = None, input_tokens: int = 0, output_tokens: int = 0):
+        super().__init__("헤지 요청 취소")
+        self.model = model
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+
+class _InFlightCall:
+    """진행 중인 추출 호출 하나. 같은 키로 들어온 호출은 완료를 기다렸다가 결과를 나눠 받음"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class _ModelChannel:
+    """키 하나에 대해 한 번만 구성되는 모델 핸들 (엔드포인트 + 커넥션 풀)"""
+
+    def __init__(self, key: KeyState, model: str, base_url: str, pool_size: int):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.key = key
+        self.model = model
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Content-Type': 'application/json',
+            'x-goog-api-key': key.api_key,
+        })
+        self.generate_url = f"{base_url.rstrip('/')}/models/{model}:generateContent"
+        self.stream_url = f"{base_url.rstrip('/')}/models/{model}:streamGenerateContent?alt=sse"
+
+    def close(self):
+        self.session.close()
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def _response_text(data: Dict[str, Any]) -> str:
+    candidates = data.get('candidates') or []
+    if not candidates:
+        raise GeminiAPIError(f"Gemini 응답에 후보 없음: {str(data)[:200]}")
+    parts = candidates[0].get('content', {}).get('parts', [])
+    return ''.join(part.get('text', '') for part in parts)
+
+
+class GeminiExtractionClient:
+    """키 풀 위에서 동작하는 장기 실행 Gemini 추출 클라이언트"""
+
+    def __init__(self, key_pool: Optional[GeminiKeyPool] = None, model: Optional[str] = None,
+                 base_url: Optional[str] = None, timeout: Optional[float] = None, pool_size: int = 8,
+                 telemetry: Optional[TelemetryLogger] = None, traffic: Optional[TrafficStore] = None,
+                 estimator: Optional[TokenEstimator] = None, run_budget: Optional[RunTokenBudget] = None):
+        """
+        Args:
+            key_pool (Optional[GeminiKeyPool]): 사용할 키 풀 (None이면 환경 변수에서 생성.
+                재생 모드에서 키가 없으면 기록된 키 라벨로 가짜 키 풀을 만들어 키 없이 재생)
+            model (Optional[str]): 모델명 (기본: GEMINI_MODEL 또는 gemini-pro)
+            base_url (Optional[str]): API 기본 URL (기본: GEMINI_API_BASE 환경 변수, 로컬 가짜 서버 지정용)
+            timeout (Optional[float]): 초기 요청 타임아웃(초). 표본이 쌓이면 관측 지연 기준으로 조정
+            pool_size (int): 키별 HTTP 커넥션 풀 크기
+            telemetry (Optional[TelemetryLogger]): 호출 지표 기록기 (기본: 전역 기록기)
+            traffic (Optional[TrafficStore]): 트래픽 기록/재생 저장소 (기본: GEMINI_TRAFFIC_MODE 설정 시 생성)
+            estimator (Optional[TokenEstimator]): 모델별 보정 토큰 추정기 (기본: 환경 변수에서 생성)
+            run_budget (Optional[RunTokenBudget]): 실행 토큰 예산 (기본: GEMINI_RUN_TOKEN_BUDGET, 0이면 무제한)
+        """
+        self.traffic = traffic if traffic is not None else TrafficStore.from_env()
+        if self.traffic is not None:
+            logger.info(f"Gemini 트래픽 {self.traffic.mode} 모드: {self.traffic.path}")
+        self.key_pool = key_pool if key_pool is not None else GeminiKeyPool.from_env()
+        if not self.key_pool and self.traffic is not None and self.traffic.mode == REPLAY:
+            self.key_pool = GeminiKeyPool.from_env(keys={label: REPLAY for label in self.traffic.key_labels()})
+            logger.info(f"재생 모드: API 키 없이 기록된 키 라벨 {self.key_pool.labels} 로 재생")
+        self.model = model or os.getenv('GEMINI_MODEL', 'gemini-pro')
+        self.base_url = base_url or os.getenv('GEMINI_API_BASE') or GEMINI_API_BASE
+        self.timeout = timeout if timeout is not None else float(os.getenv('REQUEST_TIMEOUT', 30))
+        self.pool_size = pool_size
+        self.telemetry = telemetry or get_default_telemetry()
+        self._channels: Dict[tuple, _ModelChannel] = {}
+        self._lock = threading.Lock()
+        self.batch_stats = {'batches': 0, 'documents': 0, 'retried_documents': 0}
+        # 응답 파싱 통계: clean(그대로 파싱), recovered(복구 성공), failed(복구 불가), rerequested(재요청)
+        self.parse_stats = {'clean': 0, 'recovered': 0, 'failed': 0, 'rerequested': 0}
+        self.max_parse_retries = int(os.getenv('GEMINI_PARSE_RETRIES', 1))
+        # 스트리밍 통계: 필수 필드 수신 후 조기 종료 횟수, 첫 필드까지 걸린 시간 합계
+        self.stream_stats = {'streams': 0, 'early_stops': 0, 'first_field_seconds': 0.0}
+        self.breakers = BreakerRegistry.from_env()
+        self._timeouts: Dict[str, AdaptiveTimeout] = {}
+        # 헤지 요청: 전체 요청 대비 허용 비율(%, 0이면 비활성), 대기 기준 백분위수
+        self.hedge_budget_percent = float(os.getenv('GEMINI_HEDGE_BUDGET_PERCENT', 0))
+        self.hedge_percentile = float(os.getenv('GEMINI_HEDGE_PERCENTILE', 90))
+        self.hedge_stats = {'requests': 0, 'hedged': 0, 'hedge_wins': 0, 'saved_seconds': 0.0,
+                            'aborted': 0, 'tokens': 0, 'extra_tokens': 0, 'cost_usd': 0.0, 'extra_cost_usd': 0.0}
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        # 모델 단계화: 저렴한 모델부터 순서대로 (비어 있으면 self.model 하나만 사용)
+        self.tier_models = [m.strip() for m in os.getenv('GEMINI_TIER_MODELS', '').split(',') if m.strip()]
+        self.tier_min_score = float(os.getenv('GEMINI_TIER_MIN_SCORE', 0.75))
+        self.tier_min_summary_chars = int(os.getenv('GEMINI_TIER_MIN_SUMMARY_CHARS', 30))
+        self.tier_stats = {model: {'documents': 0, 'accepted': 0, 'escalated': 0, 'errors': 0,
+                                   'latency': 0.0, 'cost_usd': 0.0, 'score': 0.0}
+                           for model in self.tier_models}
+        # 동일 요청 병합: 같은 캐시 키의 동시 추출은 호출 하나만 보냄 (calls: 실제 호출, coalesced: 병합된 호출)
+        self.coalesce = os.getenv('GEMINI_COALESCE', 'True').lower() == 'true'
+        self.coalesce_stats = {'calls': 0, 'coalesced': 0}
+        self._inflight: Dict[str, _InFlightCall] = {}
+        # 전송 전 토큰 확인: 한도 초과 처리(chunk/trim/error), 출력 토큰 예약량
+        self.estimator = estimator or TokenEstimator.from_env()
+        self.run_budget = run_budget or RunTokenBudget.from_env()
+        self.oversize_policy = os.getenv('GEMINI_OVERSIZE_POLICY', CHUNK).lower()
+        self.output_token_reserve = int(os.getenv('GEMINI_OUTPUT_TOKEN_RESERVE', 512))
+        self.oversize_stats = {'chunked': 0, 'chunks': 0, 'trimmed': 0, 'rejected': 0}
+
+    @property
+    def available(self) -> bool:
+        return bool(self.key_pool)
+
+    def _channel(self, key: KeyState, model: str) -> _ModelChannel:
+        """키/모델별 채널을 최초 1회만 생성하여 재사용"""
+        channel_key = (key.label, model)
+        channel = self._channels.get(channel_key)
+        if channel is None:
+            with self._lock:
+                channel = self._channels.get(channel_key)
+                if channel is None:
+                    channel = _ModelChannel(key, model, self.base_url, self.pool_size)
+                    self._channels[channel_key] = channel
+                    logger.info(f"Gemini 모델 채널 구성: {key.label} / {model}")
+        return channel
+
+    def _timeout(self, model: str) -> AdaptiveTimeout:
+        """모델별 적응형 타임아웃"""
+        timeout = self._timeouts.get(model)
+        if timeout is None:
+            with self._lock:
+                timeout = self._timeouts.setdefault(model, AdaptiveTimeout.from_env(self.timeout))
+        return timeout
+
+    def cache_namespace(self, template=EXTRACTION) -> str:
+        """캐시 키 접두어: 템플릿 버전/지문 + 모델 (프롬프트나 모델이 바뀐 캐시만 무효화)"""
+        return f"{template.cache_key}/{'>'.join(self.tier_models) or self.model}"
+
+    def current_timeout(self, model: Optional[str] = None) -> float:
+        return self._timeout(model or self.model).current()
+
+    def _http_post(self, channel: _ModelChannel, kind: str, payload: Dict[str, Any], stream: bool = False):
+        """HTTP 요청 (트래픽 기록/재생 모드면 저장소를 거침)"""
+        url = channel.stream_url if stream else channel.generate_url
+        timeout = self.current_timeout(channel.model)
+        if self.traffic is not None:
+            return self.traffic.post(channel.session, url, kind, channel.model, payload, timeout, stream=stream,
+                                     key_label=channel.key.label)
+        return channel.session.post(url, json=payload, timeout=timeout, stream=stream)
+
+    def _post(self, channel: _ModelChannel, payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = self._http_post(channel, 'generate', payload)
+        if response.status_code != 200:
+            raise GeminiAPIError(
+                f"Gemini API 오류 {response.status_code}: {response.text[:200]}",
+                status_code=response.status_code,
+                retry_after=_parse_retry_after(response.headers.get('Retry-After')),
+            )
+        return response.json()
+
+    def _post_cancellable(self, channel: _ModelChannel, payload: Dict[str, Any],
+                          cancel: threading.Event) -> Dict[str, Any]:
+        """
+        헤지 대상 요청. 스트리밍 엔드포인트로 받아 조각마다 cancel을 확인하고, 다른 요청이 먼저 끝났으면
+        연결을 끊어 남은 생성을 취소한다 (첫 조각이 오기 전에는 끊을 수 없음).
+
+        Returns:
+            Dict[str, Any]: generateContent 응답과 같은 형식 (candidates, usageMetadata)
+
+        Raises:
+            _HedgeCancelled: 취소로 끊음 (끊기 전까지 받은 토큰 포함)
+        """
+        response = self._open_stream(channel, payload)
+        text = ''
+        usage: Dict[str, Any] = {}
+        try:
+            for chunk, chunk_usage in self._iter_sse_text(response):
+                if cancel.is_set():
+                    prompt = ''.join(part.get('text', '') for content in payload.get('contents', [])
+                                     for part in content.get('parts', []))
+                    raise _HedgeCancelled(
+                        channel.model,
+                        usage.get('promptTokenCount') or self.estimator.count(prompt, channel.model),
+                        usage.get('candidatesTokenCount') or estimate_tokens(text + chunk))
+                text += chunk
+                usage = chunk_usage or usage
+        finally:
+            response.close()
+        return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}], "usageMetadata": usage}
+
+    def _record_failure(self, model: str, key: KeyState, started: float, error: Exception):
+        status = getattr(error, 'status_code', None)
+        self.telemetry.record('gemini', model, time.perf_counter() - started, key_label=key.label,
+                              ok=False, error=f"{status or type(error).__name__}: {error}")
+        # 타임아웃/연결 오류/5xx만 키 장애로 집계 (429는 키 풀 쿨다운, 4xx는 요청 문제)
+        breaker = self.breakers.get('gemini', key.label)
+        if status is None or status >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+    def _next_key(self, tried: List[str]) -> KeyState:
+        """
+        아직 시도하지 않은 가용 키 선택
+
+        Raises:
+            CircuitOpenError: 남은 키의 서킷이 모두 열려 있음
+            GeminiAPIError: 모든 키가 쿨다운 또는 한도 초과 (429)
+        """
+        while True:
+            blocked = [label for label in self.key_pool.labels
+                       if label not in tried and not self.breakers.get('gemini', label).available()]
+            key = self.key_pool.acquire(exclude=tried + blocked)
+            if key is None:
+                if blocked:
+                    raise CircuitOpenError(f"Gemini 서킷 차단 중: {', '.join(blocked)}",
+                                           retry_in=self.breakers.retry_in('gemini'))
+                raise GeminiAPIError("사용 가능한 Gemini 키 없음 (모두 쿨다운 또는 한도 초과)", status_code=429,
+                                     retry_after=self.key_pool.next_available_in())
+            if self.breakers.get('gemini', key.label).allow():
+                tried.append(key.label)
+                return key
+            # 다른 스레드가 half-open 시험 호출을 먼저 가져감
+            self.key_pool.release(key)
+
+    def _record_success(self, model: str, key: KeyState, latency: float, tokens: int):
+        self.key_pool.record_success(key, tokens)
+        self.breakers.get('gemini', key.label).record_success()
+        self._timeout(model).observe(latency)
+
+    @staticmethod
+    def _build_payload(prompt: str, generation_config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+        if generation_config:
+            payload["generationConfig"] = generation_config
+        return payload
+
+    def generate(self, prompt: str, model: Optional[str] = None,
+                 generation_config: Optional[Dict[str, Any]] = None,
+                 tags: Optional[Dict[str, Any]] = None) -> GenerationResult:
+        """
+        프롬프트 한 건 생성. 429를 받은 키는 쿨다운시키고 다음 키로 재시도
+
+        Args:
+            prompt (str): 프롬프트
+            model (Optional[str]): 이번 호출에만 사용할 모델명
+            generation_config (Optional[Dict[str, Any]]): generationConfig
+            tags (Optional[Dict[str, Any]]): 호출 지표에 함께 기록할 필드 (예: tier)
+
+        Returns:
+            GenerationResult: 생성 결과
+        """
+        model = model or self.model
+        reserved = self._admit(prompt, model, generation_config)
+        payload = self._build_payload(prompt, generation_config)
+        try:
+            if self.hedge_budget_percent > 0 and len(self.key_pool) > 1:
+                result = self._generate_hedged(payload, model, tags or {})
+            else:
+                result = self._generate_once(payload, model, [], tags=tags or {})
+                self._count_request(result)
+        except BaseException:
+            self.run_budget.settle(reserved, 0)
+            raise
+        self.run_budget.settle(reserved, result.total_tokens)
+        self.estimator.observe(model, prompt, result.input_tokens)
+        return result
+
+    def _admit(self, prompt: str, model: str, generation_config: Optional[Dict[str, Any]] = None) -> int:
+        """
+        보내기 전에 모델 입력 한도와 실행 예산을 확인하고 예상 토큰(입력 + 출력 예약)을 예약
+
+        Raises:
+            PromptTooLargeError: 추정 입력 토큰이 모델 한도를 넘음
+            TokenBudgetExceeded: 실행 토큰 예산을 넘음
+        """
+        tokens = self.estimator.count(prompt, model)
+        limit = self.estimator.input_limit(model)
+        if tokens > limit:
+            with self._lock:
+                self.oversize_stats['rejected'] += 1
+            raise PromptTooLargeError(f"프롬프트가 {model} 입력 한도를 넘음: 추정 {tokens} > {limit}토큰",
+                                      tokens, limit)
+        output = (generation_config or {}).get('maxOutputTokens') or self.output_token_reserve
+        return self.run_budget.reserve(tokens + min(output, self.estimator.output_limit(model)))
+
+    def _generate_once(self, payload: Dict[str, Any], model: str, tried: List[str],
+                       cancel: Optional[threading.Event] = None,
+                       tags: Optional[Dict[str, Any]] = None) -> GenerationResult:
+        """
+        키를 바꿔 가며 한 요청을 끝까지 수행.
+        cancel을 넘기면(헤지) 스트리밍으로 받다가 cancel이 설정되는 즉시 연결을 끊고, 다음 재시도도 하지 않음
+        """
+        while True:
+            if cancel is not None and cancel.is_set():
+                raise _HedgeCancelled(model)
+            key = self._next_key(tried)
+            channel = self._channel(key, model)
+            started = time.perf_counter()
+            try:
+                data = self._post(channel, payload) if cancel is None else self._post_cancellable(
+                    channel, payload, cancel)
+            except _HedgeCancelled as e:
+                # 진 쪽 요청: 끊기 전까지 쓴 토큰만 키 한도에 반영하고 키/시험 호출 슬롯 반납
+                self.key_pool.record_success(key, e.total_tokens)
+                self.breakers.get('gemini', key.label).release()
+                e.model = model
+                raise
+            except GeminiAPIError as e:
+                self._record_failure(model, key, started, e)
+                if e.status_code == 429:
+                    self.key_pool.record_throttled(key, e.retry_after)
+                    continue
+                self.key_pool.record_error(key)
+                raise
+            except Exception as e:
+                self._record_failure(model, key, started, e)
+                self.key_pool.record_error(key)
+                raise GeminiAPIError(f"Gemini 요청 실패: {e}") from e
+
+            latency = time.perf_counter() - started
+            usage = data.get('usageMetadata', {})
+            input_tokens = usage.get('promptTokenCount', 0)
+            output_tokens = usage.get('candidatesTokenCount', 0)
+            self._record_success(model, key, latency, input_tokens + output_tokens)
+            self.telemetry.record('gemini', model, latency, input_tokens, output_tokens,
+                                  key_label=key.label, **(tags or {}))
+            return GenerationResult(
+                text=_response_text(data),
+                model=model,
+                key_label=key.label,
+                latency=latency,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+            )
+
+    def _cost(self, result: GenerationResult) -> float:
+        return estimate_cost(result.model, result.input_tokens, result.output_tokens, self.telemetry.cost_table)
+
+    def _count_request(self, result: GenerationResult):
+        with self._lock:
+            self.hedge_stats['requests'] += 1
+            self.hedge_stats['tokens'] += result.total_tokens
+            self.hedge_stats['cost_usd'] += self._cost(result)
+
+    def _hedge_allowed(self) -> bool:
+        """헤지 요청 수가 전체 요청 대비 예산 비율 이내인지 확인하고 예약"""
+        with self._lock:
+            budget = self.hedge_budget_percent / 100.0 * (self.hedge_stats['requests'] + 1)
+            if self.hedge_stats['hedged'] + 1 > budget:
+                return False
+            self.hedge_stats['hedged'] += 1
+            return True
+
+    def _generate_hedged(self, payload: Dict[str, Any], model: str, tags: Dict[str, Any]) -> GenerationResult:
+        """
+        p90 지연 안에 끝나지 않으면 다른 키로 같은 요청을 한 번 더 보내고 먼저 성공한 응답 사용.
+        두 요청 모두 스트리밍으로 받으므로 진 쪽은 다음 조각에서 연결을 끊어 생성을 취소하고 키를 반납한다.
+        진 쪽이 끊기 전까지 쓴 토큰(끊기 전에 끝났으면 전체)은 추가 비용으로 집계한다.
+        """
+        hedge_delay = self._timeout(model).latency_percentile(self.hedge_percentile)
+        if self._hedge_executor is None:
+            with self._lock:
+                if self._hedge_executor is None:
+                    workers = max(4, self.pool_size * len(self.key_pool) * 2)
+                    self._hedge_executor = ThreadPoolExecutor(max_workers=workers,
+                                                              thread_name_prefix='gemini-hedge')
+        tried: List[str] = []  # 두 요청이 공유하여 서로 다른 키를 쓰도록 함
+        cancel = threading.Event()
+        started = time.perf_counter()
+        primary = self._hedge_executor.submit(self._generate_once, payload, model, tried, cancel, tags)
+        done, _ = wait([primary], timeout=hedge_delay)
+        if done or hedge_delay is None or not self._hedge_allowed():
+            result = primary.result()
+            self._count_request(result)
+            return result
+
+        logger.debug(f"헤지 요청 전송: {hedge_delay:.2f}초 내 응답 없음")
+        hedge = self._hedge_executor.submit(self._generate_once, payload, model, tried, cancel,
+                                            dict(tags, hedge=True))
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                cancel.set()
+                winner = future.result()
+                won_at = time.perf_counter() - started
+                self._count_request(winner)
+                with self._lock:
+                    self.hedge_stats['hedge_wins'] += int(future is hedge)
+                for loser in pending:
+                    loser.add_done_callback(
+                        lambda f, hedge_won=(future is hedge): self._settle_hedge(f, started, won_at, hedge_won))
+                return winner
+        raise error
+
+    def _settle_hedge(self, loser, started: float, won_at: float, hedge_won: bool):
+        """
+        진 쪽 요청 종료 시 추가 토큰/비용과 (헤지가 이긴 경우) 절약한 지연 시간 집계.
+        연결을 끊어 중단된 요청은 끊기 전까지 쓴 토큰을 청구
+        """
+        if loser.cancelled():
+            return
+        error = loser.exception()
+        if isinstance(error, _HedgeCancelled):
+            spent: Any = error
+        elif error is None:
+            spent = loser.result()
+        else:
+            return
+        self.run_budget.settle(0, spent.total_tokens)
+        cost = estimate_cost(spent.model or self.model, spent.input_tokens, spent.output_tokens,
+                             self.telemetry.cost_table)
+        with self._lock:
+            self.hedge_stats['aborted'] += int(error is not None)
+            self.hedge_stats['extra_tokens'] += spent.total_tokens
+            self.hedge_stats['extra_cost_usd'] += cost
+            if hedge_won:
+                self.hedge_stats['saved_seconds'] += max(0.0, time.perf_counter() - started - won_at)
+
+    def hedge_report(self) -> Dict[str, Any]:
+        """헤지 요청 효과: 헤지 비율, 헤지 승리 횟수, 절약한 지연 시간 대비 추가 토큰/비용"""
+        with self._lock:
+            stats = dict(self.hedge_stats)
+        requests_count = stats['requests'] or 1
+        return {
+            "requests": stats['requests'],
+            "hedged": stats['hedged'],
+            "hedge_rate": round(stats['hedged'] / requests_count, 4),
+            "hedge_wins": stats['hedge_wins'],
+            "losers_aborted": stats['aborted'],
+            "saved_seconds": round(stats['saved_seconds'], 3),
+            "saved_seconds_per_win": round(stats['saved_seconds'] / stats['hedge_wins'], 3) if stats['hedge_wins'] else None,
+            "extra_tokens": stats['extra_tokens'],
+            "extra_token_ratio": round(stats['extra_tokens'] / stats['tokens'], 4) if stats['tokens'] else 0.0,
+            "extra_cost_usd": round(stats['extra_cost_usd'], 6),
+        }
+
+    def _parse(self, text: str, expect: str) -> Any:
+        """관대한 파서로 응답 복구 후 통계 기록"""
+        try:
+            parsed = parse_llm_json(text, expect=expect)
+        except LLMResponseParseError:
+            with self._lock:
+                self.parse_stats['failed'] += 1
+            raise
+        with self._lock:
+            self.parse_stats[parsed.status] += 1
+        if parsed.recovered:
+            logger.info(f"LLM 응답 복구: {', '.join(parsed.repairs)}")
+        return parsed.value
+
+    def extract(self, text: str) -> Dict[str, Any]:
+        """키워드/요약/인물 추출. 응답을 복구할 수 없을 때만 재요청 (단계화 모드면 저렴한 모델부터)"""
+        if not self.coalesce:
+            return self._extract_uncoalesced(text)
+        return self._single_flight(self.coalesce_key(text), lambda: self._extract_uncoalesced(text))
+
+    def _extract_uncoalesced(self, text: str) -> Dict[str, Any]:
+        chunks = self._fit_extraction(text)
+        if len(chunks) > 1:
+            return merge_extractions([self._extract_text(chunk) for chunk in chunks])
+        return self._extract_text(chunks[0])
+
+    def _extract_text(self, text: str) -> Dict[str, Any]:
+        if self.tier_models:
+            return self._extract_tiered(text)
+        return self._extract_once(text, self.model, self.max_parse_retries)
+
+    def _fit_extraction(self, text: str) -> List[str]:
+        """
+        추출 프롬프트가 (단계화 모드면 가장 작은) 모델 입력 한도에 들어가도록 문서를 나누거나 자름
+
+        Raises:
+            PromptTooLargeError: 한도를 넘고 GEMINI_OVERSIZE_POLICY=error
+        """
+        model = min(self.tier_models or [self.model], key=self.estimator.input_limit)
+        available = self.estimator.input_limit(model) - self.estimator.count(EXTRACTION.render(text=''), model)
+        tokens = self.estimator.count(text, model)
+        if tokens <= available:
+            return [text]
+        if self.oversize_policy == ERROR:
+            with self._lock:
+                self.oversize_stats['rejected'] += 1
+            raise PromptTooLargeError(f"문서가 {model} 입력 한도를 넘음: 추정 {tokens} > {available}토큰",
+                                      tokens, available)
+        if self.oversize_policy == TRIM:
+            with self._lock:
+                self.oversize_stats['trimmed'] += 1
+            logger.info(f"긴 문서 앞부분만 추출: 추정 {tokens}토큰 → {available}토큰 이하")
+            return [trim_to_fit(text, available, self.estimator, model)]
+        chunks = split_to_fit(text, available, self.estimator, model)
+        with self._lock:
+            self.oversize_stats['chunked'] += 1
+            self.oversize_stats['chunks'] += len(chunks)
+        logger.info(f"긴 문서 청크 추출: 추정 {tokens}토큰 → {len(chunks)}개 청크")
+        return chunks
+
+    def coalesce_key(self, text: str, template=EXTRACTION) -> str:
+        """동일 요청 판정 키: 캐시 네임스페이스 + 원문 해시"""
+        return f"{self.cache_namespace(template)}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    def _single_flight(self, key: str, call: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        같은 키로 진행 중인 호출이 있으면 그 결과를 기다려 받고, 없으면 직접 호출.
+        결과는 호출자마다 복사본을 주고, 예외도 기다리던 호출자 모두에게 그대로 전달
+        """
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _InFlightCall()
+                self.coalesce_stats['calls'] += 1
+            else:
+                flight.waiters += 1
+                self.coalesce_stats['coalesced'] += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result)
+
+        try:
+            result = call()
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+            raise
+        with self._lock:
+            self._inflight.pop(key, None)
+            shared = flight.waiters > 0
+        flight.result = result
+        flight.done.set()
+        return copy.deepcopy(result) if shared else result
+
+    def _extract_once(self, text: str, model: str, max_retries: int, tier: Optional[int] = None) -> Dict[str, Any]:
+        tags = {'tier': tier} if tier is not None else None
+        for attempt in range(max_retries + 1):
+            result = self.generate(EXTRACTION.render(text=text), model=model, tags=tags)
+            if tier is not None:
+                self._record_tier_call(model, result)
+            try:
+                return validate_extraction(self._parse(result.text, expect='object'))
+            except LLMResponseParseError as e:
+                if attempt >= max_retries:
+                    raise
+                with self._lock:
+                    self.parse_stats['rerequested'] += 1
+                logger.warning(f"LLM 응답 복구 불가, 재요청: {e}")
+
+    def _record_tier_call(self, model: str, result: GenerationResult):
+        with self._lock:
+            self.tier_stats[model]['latency'] += result.latency
+            self.tier_stats[model]['cost_usd'] += self._cost(result)
+
+    def _accept_tier(self, tier: int, value: Dict[str, Any]) -> bool:
+        """완성도 점수가 기준 이상이거나 마지막 단계면 채택, 아니면 승급 기록"""
+        model = self.tier_models[tier]
+        score, reasons = completeness_score(value, self.tier_min_summary_chars)
+        accepted = score >= self.tier_min_score or tier == len(self.tier_models) - 1
+        with self._lock:
+            stats = self.tier_stats[model]
+            stats['documents'] += 1
+            stats['score'] += score
+            stats['accepted' if accepted else 'escalated'] += 1
+        if not accepted:
+            logger.info(f"모델 승급: {model} 완성도 {score:.2f} ({', '.join(reasons)})")
+        return accepted
+
+    def _extract_tiered(self, text: str, start: int = 0) -> Dict[str, Any]:
+        """start 단계 모델부터 추출하여 완성도 기준을 넘는 첫 결과 반환 (마지막 단계는 무조건 채택)"""
+        last = len(self.tier_models) - 1
+        for tier in range(start, last + 1):
+            model = self.tier_models[tier]
+            try:
+                # 하위 단계는 재요청 대신 바로 승급
+                value = self._extract_once(text, model, self.max_parse_retries if tier == last else 0, tier)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                with self._lock:
+                    self.tier_stats[model]['errors'] += 1
+                if tier == last:
+                    raise
+                logger.info(f"모델 승급: {model} 실패 ({e})")
+                continue
+            if self._accept_tier(tier, value):
+                return value
+
+    def tier_report(self) -> Dict[str, Dict[str, Any]]:
+        """단계별 문서 수, 채택/승급 비율, 평균 완성도, 누적 지연/비용"""
+        with self._lock:
+            stats = {model: dict(s) for model, s in self.tier_stats.items()}
+        report = {}
+        for tier, (model, s) in enumerate(stats.items()):
+            documents = s['documents'] or 1
+            report[model] = {
+                "tier": tier,
+                "documents": s['documents'],
+                "accepted": s['accepted'],
+                "escalated": s['escalated'],
+                "errors": s['errors'],
+                "escalation_rate": round(s['escalated'] / documents, 3),
+                "avg_score": round(s['score'] / documents, 3),
+                "latency_seconds": round(s['latency'], 3),
+                "cost_usd": round(s['cost_usd'], 6),
+            }
+        return report
+
+    def _extract_batch_once(self, batch: List[Tuple[str, str]],
+                            namespaces: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """
+        배치 하나를 한 번 호출하여 응답에 포함된 문서 결과만 반환.
+        단계화 모드면 첫 단계 모델로 배치 추출하고 완성도가 낮은 문서만 상위 단계로 개별 재추출.
+        namespaces 에는 문서별로 결과를 만든 템플릿의 캐시 네임스페이스를 기록
+        """
+        prompt = BATCH_EXTRACTION.render(documents=''.join(
+            BATCH_DOCUMENT.render(doc_id=doc_id, text=text) for doc_id, text in batch
+        ))
+        model = self.tier_models[0] if self.tier_models else None
+        result = self.generate(prompt, model=model, tags={'tier': 0} if model else None)
+        if model:
+            self._record_tier_call(model, result)
+        items = self._parse(result.text, expect='array')
+        if not isinstance(items, list):
+            raise LLMResponseParseError(f"배치 응답이 JSON 배열이 아님: {type(items).__name__}")
+
+        wanted = {doc_id for doc_id, _ in batch}
+        found: Dict[str, Dict[str, Any]] = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            doc_id = str(item.get('id', ''))
+            if doc_id not in wanted:
+                continue
+            try:
+                found[doc_id] = validate_extraction(item)
+            except LLMResponseParseError:
+                continue
+            namespaces[doc_id] = self.cache_namespace(BATCH_EXTRACTION)
+        if model and len(self.tier_models) > 1:
+            texts = dict(batch)
+            for doc_id, value in list(found.items()):
+                if self._accept_tier(0, value):
+                    continue
+                try:
+                    found[doc_id] = self._extract_tiered(texts[doc_id], start=1)
+                    namespaces[doc_id] = self.cache_namespace(EXTRACTION)
+                except CircuitOpenError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"상위 모델 재추출 실패, 첫 단계 결과 사용({doc_id}): {e}")
+        return found
+
+    def extract_batch(self, documents: Dict[str, str], token_budget: int = 6000, max_attempts: int = 3,
+                      namespaces: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        짧은 문서 여러 개를 토큰 예산 단위로 묶어 한 번에 추출
+
+        응답이 일부만 오거나 깨진 경우 누락된 문서만 다시 묶어 재시도한다.
+
+        Args:
+            documents (Dict[str, str]): 문서 id → 텍스트
+            token_budget (int): 배치 하나의 프롬프트 토큰 예산
+            max_attempts (int): 누락 문서 재시도 횟수
+            namespaces (Optional[Dict[str, str]]): 넘기면 문서 id → 결과를 만든 템플릿의 캐시 네임스페이스를 채움
+                (배치 응답은 BATCH_EXTRACTION, 단독/재추출 문서는 EXTRACTION)
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 문서 id → 추출 결과 (끝까지 실패했거나 서킷 차단으로 미처리된 문서는 포함되지 않음)
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        namespaces = namespaces if namespaces is not None else {}
+        pending = dict(documents)
+        halted = False
+        for attempt in range(1, max_attempts + 1):
+            for batch in pack_batches(pending, token_budget):
+                with self._lock:
+                    self.batch_stats['batches'] += 1
+                try:
+                    if len(batch) == 1:
+                        doc_id, text = batch[0]
+                        results[doc_id] = self.extract(text)
+                        namespaces[doc_id] = self.cache_namespace(EXTRACTION)
+                    else:
+                        results.update(self._extract_batch_once(batch, namespaces))
+                except (CircuitOpenError, TokenBudgetExceeded) as e:
+                    # 서킷이 열리거나 실행 예산이 소진되면 남은 배치를 보내지 않고 부분 결과만 반환
+                    logger.warning(f"배치 추출 중단: {e}")
+                    halted = True
+                    break
+                except Exception as e:
+                    logger.warning(f"배치 추출 실패({len(batch)}건, 시도 {attempt}): {e}")
+            pending = {doc_id: text for doc_id, text in pending.items() if doc_id not in results}
+            if not pending or halted:
+                break
+            with self._lock:
+                self.batch_stats['retried_documents'] += len(pending)
+            logger.info(f"배치 응답 누락 {len(pending)}건 재시도 예정")
+        with self._lock:
+            self.batch_stats['documents'] += len(documents)
+        return results
+
+    def _open_stream(self, channel: _ModelChannel, payload: Dict[str, Any]):
+        response = self._http_post(channel, 'stream', payload, stream=True)
+        if response.status_code != 200:
+            body = response.text[:200]
+            response.close()
+            raise GeminiAPIError(
+                f"Gemini API 오류 {response.status_code}: {body}",
+                status_code=response.status_code,
+                retry_after=_parse_retry_after(response.headers.get('Retry-After')),
+            )
+        return response
+
+    @staticmethod
+    def _iter_sse_text(response) -> Iterable[Tuple[str, Dict[str, Any]]]:
+        """SSE 이벤트에서 (텍스트 조각, usageMetadata) 순회"""
+        # 바이트 단위로 줄을 나눈 뒤 UTF-8로 디코딩 (charset 미지정 시 latin-1로 잘못 디코딩되는 것 방지)
+        for raw_line in response.iter_lines():
+            line = raw_line.decode('utf-8') if raw_line else ''
+            if not line.startswith('data:'):
+                continue
+            event = json.loads(line[5:].strip())
+            candidates = event.get('candidates') or []
+            parts = candidates[0].get('content', {}).get('parts', []) if candidates else []
+            yield ''.join(part.get('text', '') for part in parts), event.get('usageMetadata') or {}
+
+    def stream_extract(self, text: str, on_field: Optional[Callable[[str, Any], None]] = None,
+                       required_fields: Iterable[str] = EXTRACTION_FIELDS) -> Dict[str, Any]:
+        """
+        스트리밍 모드로 추출. 필드가 완성되는 즉시 on_field로 전달하고,
+        필수 필드를 모두 받으면 연결을 끊어 생성을 중단한다.
+
+        Args:
+            text (str): 문서 텍스트
+            on_field (Optional[Callable[[str, Any], None]]): (필드명, 정규화된 값) 콜백
+            required_fields (Iterable[str]): 모두 수신하면 생성을 중단할 필드
+
+        Returns:
+            Dict[str, Any]: 추출 결과
+        """
+        chunks = self._fit_extraction(text)
+        if len(chunks) > 1:
+            # 한도를 넘는 문서는 스트리밍 대신 청크별 추출 후 병합한 결과를 한 번에 전달
+            result = self.extract(text)
+            if on_field:
+                for field, value in result.items():
+                    on_field(field, value)
+            return result
+        prompt = EXTRACTION.render(text=chunks[0])
+        reserved = self._admit(prompt, self.model)
+        spent = {'tokens': 0}
+        try:
+            return self._stream_extract(prompt, on_field, set(required_fields), spent)
+        finally:
+            self.run_budget.settle(reserved, spent['tokens'])
+
+    def _stream_extract(self, prompt: str, on_field: Optional[Callable[[str, Any], None]],
+                        required: set, spent: Dict[str, int]) -> Dict[str, Any]:
+        """스트리밍 요청 한 건 (spent['tokens']에 사용 토큰을 남겨 실행 예산 정산)"""
+        payload = self._build_payload(prompt, None)
+        tried: List[str] = []
+        while True:
+            key = self._next_key(tried)
+            channel = self._channel(key, self.model)
+            started = time.perf_counter()
+            try:
+                response = self._open_stream(channel, payload)
+            except GeminiAPIError as e:
+                self._record_failure(self.model, key, started, e)
+                if e.status_code == 429:
+                    self.key_pool.record_throttled(key, e.retry_after)
+                    continue
+                self.key_pool.record_error(key)
+                raise
+            except Exception as e:
+                self._record_failure(self.model, key, started, e)
+                self.key_pool.record_error(key)
+                raise GeminiAPIError(f"Gemini 스트리밍 요청 실패: {e}") from e
+            break
+
+        parser = IncrementalJSONParser()
+        fields: Dict[str, Any] = {}
+        raw_text = ''
+        usage: Dict[str, Any] = {}
+        early_stop = False
+        first_field_at = None
+        callback_error: Optional[BaseException] = None
+        try:
+            for chunk, chunk_usage in self._iter_sse_text(response):
+                raw_text += chunk
+                usage = chunk_usage or usage
+                for name, value in parser.feed(chunk):
+                    normalized = normalize_field(name, value)
+                    if normalized is None:
+                        continue
+                    field, field_value = normalized
+                    fields[field] = field_value
+                    if first_field_at is None:
+                        first_field_at = time.perf_counter() - started
+                    if on_field:
+                        # 호출자 콜백 오류는 키 실패로 세지 않음 (차단기·키 쿨다운에 영향 없음)
+                        try:
+                            on_field(field, field_value)
+                        except Exception as e:
+                            callback_error = e
+                            break
+                    if required <= set(fields):
+                        break
+                if callback_error is not None:
+                    break
+                if required <= set(fields):
+                    early_stop = not parser.done
+                    break
+        except Exception as e:
+            self._record_failure(self.model, key, started, e)
+            self.key_pool.record_error(key)
+            raise GeminiAPIError(f"Gemini 스트리밍 수신 실패: {e}") from e
+        finally:
+            # 필수 필드를 모두 받았으면 연결을 끊어 남은 생성을 취소
+            response.close()
+
+        input_tokens = usage.get('promptTokenCount') or estimate_tokens(prompt)
+        output_tokens = usage.get('candidatesTokenCount') or estimate_tokens(raw_text)
+        spent['tokens'] = input_tokens + output_tokens
+        if usage.get('promptTokenCount'):
+            self.estimator.observe(self.model, prompt, input_tokens)
+        # 조기 종료한 스트림의 전체 시간은 완결 응답 지연보다 짧으므로 타임아웃 표본에서 제외
+        self.key_pool.record_success(key, input_tokens + output_tokens)
+        self.breakers.get('gemini', key.label).record_success()
+        if not early_stop:
+            self._timeout(self.model).observe(time.perf_counter() - started)
+        self.telemetry.record('gemini', self.model, time.perf_counter() - started, input_tokens, output_tokens,
+                              key_label=key.label, streamed=True, early_stop=early_stop,
+                              first_field_latency=round(first_field_at, 4) if first_field_at else None)
+        with self._lock:
+            self.stream_stats['streams'] += 1
+            self.stream_stats['early_stops'] += int(early_stop)
+            self.stream_stats['first_field_seconds'] += first_field_at or 0.0
+        if callback_error is not None:
+            raise callback_error
+
+        if not required <= set(fields):
+            # 증분 파싱으로 못 받은 필드는 전체 응답을 관대하게 파싱하여 보충
+            recovered = validate_extraction(self._parse(raw_text, expect='object'))
+            recovered.update(fields)
+            return recovered
+        with self._lock:
+            self.parse_stats['clean'] += 1
+        return {field: fields.get(field, [] if field != 'summary' else '') for field in EXTRACTION_FIELDS}
+
+    def coalesce_report(self) -> Dict[str, Any]:
+        """동일 요청 병합 효과: 실제 호출 수, 병합된 호출 수와 비율"""
+        with self._lock:
+            stats = dict(self.coalesce_stats)
+        total = stats['calls'] + stats['coalesced']
+        return dict(stats, coalesced_rate=round(stats['coalesced'] / total, 4) if total else 0.0)
+
+    def token_report(self) -> Dict[str, Any]:
+        """실행 토큰 예산 사용량, 모델별 추정 보정 계수, 한도 초과 문서 처리 건수"""
+        with self._lock:
+            oversize = dict(self.oversize_stats)
+        return {"budget": self.run_budget.report(), "calibration": self.estimator.report(), "oversize": oversize}
+
+    async def aextract(self, text: str) -> Dict[str, Any]:
+        """asyncio 태스크용 추출 (블로킹 호출을 스레드로 위임)"""
+        return await asyncio.to_thread(self.extract, text)
+
+    def close(self):
+        """모든 채널의 HTTP 세션 종료"""
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=True)
+            self._hedge_executor = None
+        with self._lock:
+            for channel in self._channels.values():
+                channel.close()
+            self._channels.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+_default_client: Optional[GeminiExtractionClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> GeminiExtractionClient:
+    """프로세스 전역에서 공유하는 기본 클라이언트"""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = GeminiExtractionClient()
+    return _default_client
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+gemini_client_test.py
+- 가짜 Gemini 서버(fake_gemini_server.py)로 GeminiExtractionClient 동작 검증
+- 실제 API 키/네트워크 없이 실행
+
+사용법:
+    python gemini_client_test.py
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+
+from fake_gemini_server import FakeGeminiConfig, FakeGeminiServer, key_fingerprint
+from gemini_client import GeminiExtractionClient
+from gemini_key_pool import GeminiKeyPool
+from llm_telemetry import TelemetryLogger
+from prompt_templates import BATCH_EXTRACTION, EXTRACTION
+from token_budget import RunTokenBudget
+
+SAMPLE_TEXT = ("GIA_INFOSYS 프로젝트는 문서에서 핵심 키워드와 요약을 추출하여 Notion에 저장한다. "
+               "나실장은 기획을, 서대리는 개발을 담당한다.")
+
+
+def make_client(server: FakeGeminiServer, keys: int = 1, **kwargs) -> GeminiExtractionClient:
+    pool = GeminiKeyPool({f"GEMINI_API_KEY_{i + 1}": f"fake-key-{i + 1}" for i in range(keys)})
+    return GeminiExtractionClient(key_pool=pool, base_url=server.base_url,
+                                  telemetry=TelemetryLogger(enabled=False), **kwargs)
+
+
+def canned_config(value, **kwargs) -> FakeGeminiConfig:
+    """고정 응답 설정 (설정 생성 시 파일을 읽으므로 바로 삭제)"""
+    f = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8')
+    json.dump(value, f, ensure_ascii=False)
+    f.close()
+    try:
+        return FakeGeminiConfig(canned_path=f.name, **kwargs)
+    finally:
+        os.unlink(f.name)
+
+
+def test_stream_stops_when_required_fields_arrive():
+    # 마지막 필수 필드(entities)가 닫는 괄호에서 끝나고 뒤에 설명 문장이 이어지는 응답:
+    # 객체가 닫히기(}) 전에, entities 가 닫히는 청크에서 바로 연결을 끊어야 함
+    step = 16
+    head = '{"keywords": ["A", "B"], "summary": "요약", "entities": ["서대리"'
+    # entities 의 ']' 가 청크 끝에 오도록 공백을 채워 '}' 는 다음 청크로 보냄
+    head += ' ' * (-(len(head) + 1) % step) + ']'
+    canned = head + '}\n\n' + '위 결과는 문서 내용을 바탕으로 작성했습니다. ' * 40
+    with FakeGeminiServer(canned_config(canned, stream_chunk_chars=step, latency='fixed:0.5')) as server:
+        client = make_client(server)
+        fields = []
+        result = client.stream_extract(SAMPLE_TEXT, on_field=lambda name, value: fields.append(name))
+        client.close()
+        sent = server.stats.to_dict()['output_tokens']
+    assert result == {"keywords": ["A", "B"], "summary": "요약", "entities": ["서대리"]}
+    assert fields == ['keywords', 'summary', 'entities']
+    assert client.stream_stats['early_stops'] == 1, client.stream_stats
+    full = client.estimator.count(canned, client.model)
+    assert sent < full / 2, (sent, full)
+
+
+def test_stream_callback_error_does_not_penalize_key():
+    with FakeGeminiServer(FakeGeminiConfig(seed=1)) as server:
+        client = make_client(server)
+
+        def broken_callback(name, value):
+            raise KeyError(name)
+
+        for _ in range(6):
+            try:
+                client.stream_extract(SAMPLE_TEXT, on_field=broken_callback)
+            except KeyError:
+                pass
+            else:
+                raise AssertionError("콜백 오류가 호출자에게 전달되지 않음")
+        key = client.key_pool.acquire()
+        client.key_pool.release(key)
+        client.close()
+    assert key is not None and key.errors == 0
+    assert client.breakers.get('gemini', key.label).state == 'closed'
+
+
+def short_documents(count: int):
+    return {f"doc{i}": f"{i}번 회의록: 서대리는 파서 개발을, 나실장은 일정 {i}건을 검토했다." for i in range(count)}
+
+
+def test_batch_results_keyed_by_producing_template():
+    with FakeGeminiServer(FakeGeminiConfig(seed=2)) as server:
+        client = make_client(server)
+        namespaces = {}
+        results = client.extract_batch(short_documents(4), token_budget=4000, namespaces=namespaces)
+        single = {}
+        client.extract_batch(short_documents(1), namespaces=single)
+        client.close()
+    assert sorted(results) == ['doc0', 'doc1', 'doc2', 'doc3']
+    assert set(namespaces.values()) == {client.cache_namespace(BATCH_EXTRACTION)}
+    assert single == {'doc0': client.cache_namespace(EXTRACTION)}
+    assert client.cache_namespace(BATCH_EXTRACTION) != client.cache_namespace(EXTRACTION)
+
+
+def test_batch_stops_when_run_budget_is_exhausted():
+    with FakeGeminiServer(FakeGeminiConfig(seed=3)) as server:
+        client = make_client(server, run_budget=RunTokenBudget(1200))
+        # 배치 하나(문서 2건)만 예산에 들어가도록 작은 배치 예산 사용
+        results = client.extract_batch(short_documents(8), token_budget=120)
+        requests_sent = server.stats.to_dict()['requests']
+        client.close()
+    assert 0 < len(results) < 8, len(results)
+    assert client.run_budget.exhausted
+    assert requests_sent == client.batch_stats['batches'] - 1, (requests_sent, client.batch_stats)
+
+
+def test_hedge_respects_budget_and_charges_extra_tokens():
+    with FakeGeminiServer(FakeGeminiConfig(seed=5, latency='fixed:0.3')) as server:
+        client = make_client(server, keys=2, run_budget=RunTokenBudget(10 ** 6))
+        client.hedge_budget_percent = 25
+        # 관측 p90 을 0.05초로 채워 모든 요청이 헤지 대상이 되게 함
+        for _ in range(100):
+            client._timeout(client.model).observe(0.05)
+        for i in range(8):
+            client.generate(f"{i}번 요청입니다")
+        time.sleep(0.5)  # 진 쪽 요청이 끝나 정산될 때까지 대기
+        sent = server.stats.to_dict()['requests']
+        client.close()
+    report = client.hedge_report()
+    assert report['requests'] == 8
+    assert 1 <= report['hedged'] <= 2, report
+    assert sent == 8 + report['hedged'], (sent, report)
+    assert report['extra_tokens'] > 0
+    # 진 쪽 요청의 토큰도 실행 예산에 정산됨
+    assert client.run_budget.used == client.hedge_stats['tokens'] + report['extra_tokens']
+    assert client.run_budget.reserved == 0
+
+
+def test_losing_hedge_request_is_aborted():
+    # 첫 요청(주 요청)은 약 1.96초, 두 번째(헤지)는 약 0.2초 걸리도록 지연 표본을 고정
+    with FakeGeminiServer(FakeGeminiConfig(seed=52, latency='uniform:0.1:2.0', stream_chunk_chars=4)) as server:
+        client = make_client(server, keys=2, run_budget=RunTokenBudget(10 ** 6))
+        client.hedge_budget_percent = 100
+        for _ in range(100):
+            client._timeout(client.model).observe(0.05)
+        started = time.perf_counter()
+        result = client.generate(SAMPLE_TEXT)
+        assert time.perf_counter() - started < 1.0
+        # 진 쪽 주 요청은 응답이 끝나기 전에 연결을 끊고 키를 반납
+        time.sleep(0.3)
+        assert all(entry['inflight'] == 0 for entry in client.key_pool.utilization().values()), \
+            client.key_pool.utilization()
+        stats = server.stats.to_dict()
+        client.close()
+    report = client.hedge_report()
+    assert report['hedge_wins'] == 1 and report['losers_aborted'] == 1, report
+    # 진 쪽 비용: 입력 토큰 + 끊기 전까지 받은 출력 토큰 (전체 응답보다 적음)
+    assert result.input_tokens < report['extra_tokens'] < result.total_tokens, (report, result.total_tokens)
+    assert stats['output_tokens'] < 2 * result.output_tokens, stats
+    assert client.run_budget.used == result.total_tokens + report['extra_tokens']
+    assert client.run_budget.reserved == 0
+
+
+def test_concurrent_identical_extractions_are_coalesced():
+    with FakeGeminiServer(FakeGeminiConfig(seed=6, latency='fixed:0.3')) as server:
+        client = make_client(server, keys=2)
+        results = []
+        barrier = threading.Barrier(6)
+
+        def worker(text):
+            barrier.wait()
+            results.append(client.extract(text))
+
+        threads = [threading.Thread(target=worker, args=(SAMPLE_TEXT,)) for _ in range(5)]
+        threads.append(threading.Thread(target=worker, args=(SAMPLE_TEXT + " 추가 문장.",)))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        sent = server.stats.to_dict()['requests']
+        client.close()
+    assert sent == 2, sent
+    assert client.coalesce_stats == {'calls': 2, 'coalesced': 4}, client.coalesce_stats
+    same = [result for result in results if result == results[0]]
+    assert len(results) == 6 and len(same) >= 5
+
+
+def test_coalesced_error_reaches_every_waiter():
+    with FakeGeminiServer(FakeGeminiConfig(seed=7, latency='fixed:0.3', error_rate=1.0)) as server:
+        client = make_client(server)
+        errors = []
+        barrier = threading.Barrier(4)
+
+        def worker():
+            barrier.wait()
+            try:
+                client.extract(SAMPLE_TEXT)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        client.close()
+    assert len(errors) == 4 and client.coalesce_stats['calls'] == 1, (errors, client.coalesce_stats)
+
+
+def test_fake_server_stats_do_not_contain_api_keys():
+    with FakeGeminiServer(FakeGeminiConfig(seed=12)) as server:
+        client = make_client(server, keys=2)
+        for _ in range(4):
+            client.generate("안녕하세요")
+        client.close()
+        stats = json.dumps(server.stats.to_dict())
+    assert 'fake-key' not in stats, stats
+    by_key = server.stats.to_dict()['requests_by_key']
+    assert set(by_key) <= {key_fingerprint('fake-key-1'), key_fingerprint('fake-key-2')}
+    assert sum(by_key.values()) == 4
+
+
+TESTS = [
+    test_stream_stops_when_required_fields_arrive,
+    test_stream_callback_error_does_not_penalize_key,
+    test_batch_results_keyed_by_producing_template,
+    test_batch_stops_when_run_budget_is_exhausted,
+    test_hedge_respects_budget_and_charges_extra_tokens,
+    test_losing_hedge_request_is_aborted,
+    test_concurrent_identical_extractions_are_coalesced,
+    test_coalesced_error_reaches_every_waiter,
+    test_fake_server_stats_do_not_contain_api_keys,
+]
+
+
+def main():
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+    print(f"=== {len(TESTS) - failed}/{len(TESTS)} 통과 ===")
+    return failed == 0
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
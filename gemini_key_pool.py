@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+gemini_key_pool.py
+- GEMINI_API_KEY_1, GEMINI_API_KEY_2, ... 에 설정된 모든 키를 하나의 풀로 관리
+- 키별 분당 요청/토큰 사용량과 429(쿼터 초과) 쿨다운을 추적하여 여유 있는 키로 분산
+- 키별 사용률을 집계하여 풀 크기 산정에 활용
+"""
+
+import os
+import re
+import time
+import threading
+import logging
+from collections import deque
+from typing import Dict, Any, List, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+KEY_ENV_PATTERN = re.compile(r'^GEMINI_API_KEY_(\d+)$')
+
+
+def is_quota_error(exc: Exception) -> bool:
+    """429 / ResourceExhausted 계열 오류인지 판별"""
+    status = getattr(exc, 'status_code', None) or getattr(exc, 'code', None)
+    if status == 429:
+        return True
+    if type(exc).__name__ in ('ResourceExhausted', 'TooManyRequests'):
+        return True
+    message = str(exc)
+    return '429' in message or 'quota' in message.lower() or 'RESOURCE_EXHAUSTED' in message
+
+
+class KeyState:
+    """키 하나의 사용량/쿨다운 상태"""
+
+    def __init__(self, label: str, api_key: str):
+        self.label = label
+        self.api_key = api_key
+        self.total_requests = 0
+        self.total_tokens = 0
+        self.errors = 0
+        self.throttled = 0
+        self.inflight = 0
+        self.cooldown_until = 0.0
+        # 최근 60초 윈도우: 요청 시각, (시각, 토큰 수)
+        self.request_window = deque()
+        self.token_window = deque()
+
+    def prune(self, now: float):
+        while self.request_window and now - self.request_window[0] >= 60.0:
+            self.request_window.popleft()
+        while self.token_window and now - self.token_window[0][0] >= 60.0:
+            self.token_window.popleft()
+
+    def window_requests(self) -> int:
+        return len(self.request_window)
+
+    def window_tokens(self) -> int:
+        return sum(tokens for _, tokens in self.token_window)
+
+    def __repr__(self) -> str:
+        return f"KeyState({self.label})"
+
+
+class GeminiKeyPool:
+    """여러 Gemini API 키에 요청을 분산하는 키 풀 (스레드 안전)"""
+
+    def __init__(self, keys: Dict[str, str], rpm_limit: int = 60, tpm_limit: Optional[int] = None,
+                 cooldown_seconds: float = 60.0, clock=time.monotonic):
+        """
+        Args:
+            keys (Dict[str, str]): 라벨 → API 키 (예: {"GEMINI_API_KEY_1": "..."})
+            rpm_limit (int): 키별 분당 요청 한도
+            tpm_limit (Optional[int]): 키별 분당 토큰 한도 (None이면 추적만)
+            cooldown_seconds (float): 429 수신 시 기본 쿨다운 시간
+        """
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._states: Dict[str, KeyState] = {}
+        seen = set()
+        for label, api_key in keys.items():
+            if not api_key or api_key in seen:
+                continue
+            seen.add(api_key)
+            self._states[label] = KeyState(label, api_key)
+
+    @classmethod
+    def from_env(cls, keys: Optional[Dict[str, str]] = None) -> 'GeminiKeyPool':
+        """
+        환경 변수의 GEMINI_API_KEY_<n> 을 모두 읽어 풀 생성.
+        keys를 주면 그 키로 만들고 한도/쿨다운만 환경 변수에서 읽음 (트래픽 재생용 가짜 키 풀)
+        """
+        if keys is None:
+            found = []
+            for name, value in os.environ.items():
+                match = KEY_ENV_PATTERN.match(name)
+                if match and value:
+                    found.append((int(match.group(1)), name, value))
+            keys = {name: value for _, name, value in sorted(found)}
+        tpm = os.getenv('GEMINI_TPM_PER_KEY')
+        return cls(
+            keys,
+            rpm_limit=int(os.getenv('GEMINI_RPM_PER_KEY', 60)),
+            tpm_limit=int(tpm) if tpm else None,
+            cooldown_seconds=float(os.getenv('GEMINI_KEY_COOLDOWN_SECONDS', 60)),
+        )
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __bool__(self) -> bool:
+        return bool(self._states)
+
+    @property
+    def labels(self) -> List[str]:
+        return list(self._states)
+
+    def _is_available(self, state: KeyState, now: float) -> bool:
+        if state.cooldown_until > now:
+            return False
+        state.prune(now)
+        if state.window_requests() >= self.rpm_limit:
+            return False
+        if self.tpm_limit is not None and state.window_tokens() >= self.tpm_limit:
+            return False
+        return True
+
+    def acquire(self, exclude: Iterable[str] = ()) -> Optional[KeyState]:
+        """
+        사용률이 가장 낮은 가용 키를 선택
+
+        Args:
+            exclude (Iterable[str]): 이번 요청에서 제외할 키 라벨
+
+        Returns:
+            Optional[KeyState]: 선택된 키 (모든 키가 쿨다운/한도 초과면 None)
+        """
+        excluded = set(exclude)
+        with self._lock:
+            now = self._clock()
+            candidates = [s for label, s in self._states.items()
+                          if label not in excluded and self._is_available(s, now)]
+            if not candidates:
+                return None
+            state = min(candidates, key=lambda s: (s.inflight, s.window_requests(), s.total_requests))
+            state.inflight += 1
+            state.request_window.append(now)
+            state.total_requests += 1
+            return state
+
+    def record_success(self, state: KeyState, tokens: int = 0):
+        """요청 성공 및 사용 토큰 기록"""
+        with self._lock:
+            state.inflight = max(0, state.inflight - 1)
+            state.total_tokens += tokens
+            if tokens:
+                state.token_window.append((self._clock(), tokens))
+
+    def record_throttled(self, state: KeyState, retry_after: Optional[float] = None):
+        """429 수신: 해당 키를 쿨다운 상태로 전환"""
+        with self._lock:
+            state.inflight = max(0, state.inflight - 1)
+            state.throttled += 1
+            delay = retry_after if retry_after is not None else self.cooldown_seconds
+            state.cooldown_until = max(state.cooldown_until, self._clock() + delay)
+        logger.warning(f"Gemini 키 쿼터 초과: {state.label} → {delay:.0f}초 쿨다운")
+
+    def record_error(self, state: KeyState):
+        """429 이외의 오류 기록"""
+        with self._lock:
+            state.inflight = max(0, state.inflight - 1)
+            state.errors += 1
+
+    def release(self, state: KeyState):
+        """호출하지 않고 반납 (성공/오류로 집계하지 않음)"""
+        with self._lock:
+            state.inflight = max(0, state.inflight - 1)
+
+    def next_available_in(self) -> float:
+        """가장 빨리 쿨다운이 풀리는 키까지 남은 시간(초)"""
+        with self._lock:
+            now = self._clock()
+            waits = [max(0.0, s.cooldown_until - now) for s in self._states.values()]
+        return min(waits) if waits else 0.0
+
+    def utilization(self) -> Dict[str, Dict[str, Any]]:
+        """키별 사용률 통계"""
+        with self._lock:
+            now = self._clock()
+            report = {}
+            for label, s in self._states.items():
+                s.prune(now)
+                window_requests = s.window_requests()
+                report[label] = {
+                    "total_requests": s.total_requests,
+                    "total_tokens": s.total_tokens,
+                    "errors": s.errors,
+                    "throttled": s.throttled,
+                    "inflight": s.inflight,
+                    "window_requests": window_requests,
+                    "window_tokens": s.window_tokens(),
+                    "rpm_utilization": round(window_requests / self.rpm_limit, 3) if self.rpm_limit else None,
+                    "cooling_down": s.cooldown_until > now,
+                }
+            return report
+
+    def log_utilization(self):
+        """키별 사용률을 로그로 출력"""
+        for label, stats in self.utilization().items():
+            logger.info(
+                f"[키 풀] {label}: 요청 {stats['total_requests']}건, 토큰 {stats['total_tokens']}, "
+                f"429 {stats['throttled']}회, 분당 사용률 {stats['rpm_utilization']}"
+            )
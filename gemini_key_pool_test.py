@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+gemini_key_pool_test.py
+- Gemini 키 풀(gemini_key_pool.py)의 분산, 분당 한도, 429 쿨다운 검증
+- 외부 서비스 없이 실행 (가짜 시계 사용)
+
+사용법:
+    python gemini_key_pool_test.py
+"""
+
+import sys
+
+from gemini_key_pool import GeminiKeyPool, is_quota_error
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def make_pool(keys: int = 2, **kwargs):
+    clock = FakeClock()
+    pool = GeminiKeyPool({f"GEMINI_API_KEY_{i + 1}": f"key-{i + 1}" for i in range(keys)}, clock=clock, **kwargs)
+    return pool, clock
+
+
+def test_spreads_inflight_requests_across_keys():
+    pool, _ = make_pool(keys=3)
+    labels = [pool.acquire().label for _ in range(3)]
+    assert sorted(labels) == ['GEMINI_API_KEY_1', 'GEMINI_API_KEY_2', 'GEMINI_API_KEY_3']
+
+
+def test_throttled_key_cools_down():
+    pool, clock = make_pool(keys=2, cooldown_seconds=30)
+    first = pool.acquire()
+    pool.record_throttled(first, retry_after=10)
+    # 쿨다운 중에는 다른 키만 사용
+    for _ in range(3):
+        key = pool.acquire()
+        assert key.label != first.label
+        pool.record_success(key)
+    assert pool.utilization()[first.label]['cooling_down']
+    clock.advance(10.5)
+    assert first.label in {pool.acquire().label for _ in range(2)}
+    assert pool.utilization()[first.label]['throttled'] == 1
+
+
+def test_all_keys_cooling_down_returns_none():
+    pool, clock = make_pool(keys=2, cooldown_seconds=30)
+    for _ in range(2):
+        pool.record_throttled(pool.acquire())
+    assert pool.acquire() is None
+    assert round(pool.next_available_in(), 3) == 30.0
+    clock.advance(31)
+    assert pool.acquire() is not None
+
+
+def test_rpm_limit_window_slides():
+    pool, clock = make_pool(keys=1, rpm_limit=3)
+    for _ in range(3):
+        pool.record_success(pool.acquire())
+    assert pool.acquire() is None
+    clock.advance(60)
+    assert pool.acquire() is not None
+
+
+def test_tpm_limit_and_exclude():
+    pool, _ = make_pool(keys=2, tpm_limit=100)
+    key = pool.acquire()
+    pool.record_success(key, tokens=150)
+    other = pool.acquire()
+    assert other.label != key.label
+    pool.release(other)
+    assert pool.acquire(exclude=[other.label]) is None
+
+
+def test_is_quota_error():
+    class ResourceExhausted(Exception):
+        pass
+
+    assert is_quota_error(ResourceExhausted("limit"))
+    assert is_quota_error(RuntimeError("HTTP 429 Too Many Requests"))
+    assert not is_quota_error(RuntimeError("HTTP 500"))
+
+
+TESTS = [
+    test_spreads_inflight_requests_across_keys,
+    test_throttled_key_cools_down,
+    test_all_keys_cooling_down_returns_none,
+    test_rpm_limit_window_slides,
+    test_tpm_limit_and_exclude,
+    test_is_quota_error,
+]
+
+
+def main():
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+    print(f"=== {len(TESTS) - failed}/{len(TESTS)} 통과 ===")
+    return failed == 0
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
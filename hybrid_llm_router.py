@@ -3,51 +3,138 @@
 """
 하이브리드 LLM 라우터
 노트북LM과 Gemini Pro를 결합하여 문서의 민감도에 따라 최적의 LLM 선택
+민감도 키워드는 Aho-Corasick 매처로 컴파일하여 본문을 한 번만 순회 (사전이 바뀔 때만 재컴파일)
+analyze_sensitivity_batch: 대량 문서의 점수/레벨/키워드 수를 NumPy 배열과 백엔드 용량 히스토그램으로 반환
+하이브리드 처리는 두 백엔드를 동시에 실행하고, 마감 시간 안에 한쪽만 끝나면 그 결과를 degraded로 표시하여 반환
+(마감을 넘긴 백엔드는 취소 플래그를 보고 다음 단계에서 멈추며, 결과를 기다리지 않고 바로 반환)
+청크 라우팅(기본 끔): 고민감도 문서를 청크로 나눠 고민감도 청크와 그 이웃만 로컬, 나머지는 클라우드로 보내고
+결과를 병합 (분할 비율 보고). 청크 경계에 걸친 키워드도 찾고, 보내기 전 클라우드 본문을 다시 검사
+analyze_sensitivity 는 페이지 이터레이터도 받으며, 점수가 최댓값(10점)에 도달하면 나머지를 읽지 않고 결정 위치를 기록
 """
 
 import os
 import json
 import re
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, List, Optional, Union
 from dotenv import load_dotenv
 
+try:
+    import numpy as np
+except ImportError:  # numpy 미설치 시 문서별 analyze_sensitivity 만 사용
+    np = None
+
+from gemini_key_pool import GeminiKeyPool
+from local_extractor import get_default_extractor
+from llm_telemetry import get_default_telemetry
+from sensitivity_scanner import SensitivityMatcher, SensitivityMatcherCache
+from token_budget import (ASCII_CHARS_PER_TOKEN, OTHER_CHARS_PER_TOKEN, count_ascii, estimate_tokens,
+                          merge_extractions, split_to_fit)
+
 # 환경 변수 로드
 try:
     load_dotenv()
 except UnicodeDecodeError:
     load_dotenv(encoding='utf-8')
 
+logger = logging.getLogger(__name__)
+
+# 민감도 레벨(점수 오름차순)과 레벨별 권장 LLM
+SENSITIVITY_LEVELS = ("low", "medium", "high")
+RECOMMENDED_LLM = {"low": "gemini_pro", "medium": "hybrid", "high": "notebooklm"}
+MAX_SENSITIVITY_SCORE = 10
+
+
+class BackendCancelled(Exception):
+    """하이브리드 마감 시간 초과로 취소된 백엔드 처리"""
+
+
+def _check_cancel(cancel: Optional[threading.Event], backend: str):
+    """취소 플래그가 켜졌으면 다음 단계로 넘어가지 않고 중단"""
+    if cancel is not None and cancel.is_set():
+        raise BackendCancelled(f"{backend} 처리 취소 (마감 시간 초과)")
+
 class HybridLLMRouter:
     def __init__(self):
         self.gemini_api_key_1 = os.getenv('GEMINI_API_KEY_1')
         self.gemini_api_key_2 = os.getenv('GEMINI_API_KEY_2')
+        # 설정된 모든 Gemini 키를 풀로 묶어 요청 분산
+        self.key_pool = GeminiKeyPool.from_env()
+        # 호출별 실측 지연/토큰/폴백 여부 기록
+        self.telemetry = get_default_telemetry()
         self.sensitivity_keywords = {
             "high": ["비밀", "기밀", "내부", "전략", "재무", "인사", "계약", "특허"],
             "medium": ["분석", "보고서", "검토", "평가", "제안", "계획"],
             "low": ["뉴스", "공개", "일반", "참고", "정보"]
         }
+        # 키워드 사전을 컴파일한 매처 (사전 내용이 바뀌면 다음 분석 때 다시 컴파일)
+        self._sensitivity_matchers = SensitivityMatcherCache()
+        # 하이브리드 처리: 백엔드별 마감 시간(초), 동시 실행 스레드 풀 (최초 사용 시 생성)
+        self.hybrid_deadline = float(os.getenv('HYBRID_BACKEND_DEADLINE', 30))
+        self.hybrid_workers = int(os.getenv('HYBRID_MAX_WORKERS', 8))
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        # 청크 라우팅: 고민감도 문서만 청크(토큰 수 기준) 단위로 나눠 로컬/클라우드에 분배.
+        # 고민감도 문서 일부가 외부로 나가므로 명시적으로 켤 때만 사용
+        self.chunk_routing = os.getenv('HYBRID_CHUNK_ROUTING', 'False').lower() == 'true'
+        self.chunk_tokens = int(os.getenv('HYBRID_CHUNK_TOKENS', 300))
+        self.chunk_routing_stats = {'documents': 0, 'chunks': 0, 'local_chunks': 0, 'cloud_chunks': 0,
+                                    'local_chars': 0, 'cloud_chars': 0, 'local_seconds': 0.0, 'cloud_seconds': 0.0}
+
+    @property
+    def local_extractor(self):
+        """고민감도 문서를 외부로 보내지 않고 처리하는 로컬 경량 추출기 (처음 쓸 때 개체 사전 적재)"""
+        return get_default_extractor()
+
+    def sensitivity_matcher(self) -> SensitivityMatcher:
+        """현재 sensitivity_keywords 로 컴파일된 매처"""
+        return self._sensitivity_matchers.get(self.sensitivity_keywords)
         
-    def analyze_sensitivity(self, text: str) -> Dict[str, Any]:
-        """문서의 민감도를 분석"""
-        print("🔍 문서 민감도 분석 중...")
-        
-        # 키워드 기반 민감도 분석
-        high_count = sum(1 for keyword in self.sensitivity_keywords["high"] if keyword in text)
-        medium_count = sum(1 for keyword in self.sensitivity_keywords["medium"] if keyword in text)
-        low_count = sum(1 for keyword in self.sensitivity_keywords["low"] if keyword in text)
-        
-        # 민감도 점수 계산 (1-10점)
-        sensitivity_score = 0
-        
+    @staticmethod
+    def sensitivity_score(high_count: int, medium_count: int, low_count: int) -> int:
+        """레벨별 키워드 수 → 민감도 점수 (1-10점)"""
         if high_count > 0:
-            sensitivity_score = 8 + min(high_count, 2)  # 8-10점
+            return 8 + min(high_count, 2)  # 8-10점
         elif medium_count > 0:
-            sensitivity_score = 4 + min(medium_count, 3)  # 4-7점
+            return 4 + min(medium_count, 3)  # 4-7점
         elif low_count > 0:
-            sensitivity_score = 1 + min(low_count, 2)  # 1-3점
-        else:
-            sensitivity_score = 5  # 기본값
+            return 1 + min(low_count, 2)  # 1-3점
+        return 5  # 기본값
+    
+    def analyze_sensitivity(self, text: Union[str, Iterable[str]]) -> Dict[str, Any]:
+        """
+        문서의 민감도를 분석
+        
+        Args:
+            text (Union[str, Iterable[str]]): 문서 본문 또는 페이지/청크 이터레이터.
+                점수가 최댓값(10점)에 도달하면 나머지 페이지는 읽지 않음
+                (이때 keyword_counts 는 읽은 부분까지의 수)
+        """
+        logger.info("🔍 문서 민감도 분석 중...")
+        
+        # 키워드 기반 민감도 분석 (레벨별로 등장한 서로 다른 키워드 수를 한 번의 순회로 계산)
+        matcher = self.sensitivity_matcher()
+        index = {level: i for i, level in enumerate(matcher.levels)}
+        
+        def level_count(counts: List[int], level: str) -> int:
+            return counts[index[level]] if level in index else 0
+        
+        def saturated(counts: List[int]) -> bool:
+            return self.sensitivity_score(level_count(counts, "high"), level_count(counts, "medium"),
+                                          level_count(counts, "low")) >= MAX_SENSITIVITY_SCORE
+        
+        pages = (text,) if isinstance(text, str) else text
+        counts, scan = matcher.count_pages(pages, stop=saturated)
+        high_count = level_count(counts, "high")
+        medium_count = level_count(counts, "medium")
+        low_count = level_count(counts, "low")
+        
+        # 민감도 점수 계산 (1-10점)
+        sensitivity_score = self.sensitivity_score(high_count, medium_count, low_count)
         
         # 민감도 레벨 결정
         if sensitivity_score >= 8:
@@ -69,52 +156,147 @@ class HybridLLMRouter:
                 "medium": medium_count,
                 "low": low_count
             },
+            "decision_offset": scan["decision_offset"],
+            "pages_read": scan["pages_read"],
+            "early_exit": scan["early_exit"],
             "analysis_timestamp": datetime.now().isoformat()
         }
         
-        print(f"✅ 민감도 분석 완료: {sensitivity_score}점 ({level})")
-        print(f"🎯 권장 LLM: {recommended_llm}")
+        logger.info(f"✅ 민감도 분석 완료: {sensitivity_score}점 ({level})")
+        if scan["early_exit"]:
+            logger.info(f"⏩ {scan['decision_offset']:,}자({scan['pages_read']}페이지)에서 최고 점수 도달, 나머지 생략")
+        logger.info(f"🎯 권장 LLM: {recommended_llm}")
         
         return analysis_result
     
+    def analyze_sensitivity_batch(self, texts: Iterable[str]) -> Dict[str, Any]:
+        """
+        여러 문서의 민감도를 한 번에 분석 (analyze_sensitivity 와 같은 점수 규칙, 문서별 출력 없음)
+
+        Args:
+            texts (Iterable[str]): 문서 본문 목록
+
+        Returns:
+            Dict[str, Any]: 문서 순서의 배열과 요약
+                - scores (np.ndarray[int8]): 민감도 점수 1-10
+                - levels (np.ndarray[str]): high / medium / low
+                - level_codes (np.ndarray[int8]): SENSITIVITY_LEVELS 의 인덱스 (0=low, 1=medium, 2=high)
+                - counts (np.ndarray[int32]): (문서 수, 레벨 수) 레벨별 키워드 수, 열 순서는 count_levels
+                - count_levels (tuple): counts 의 열 순서 (sensitivity_keywords 의 레벨 순서)
+                - chars / estimated_tokens (np.ndarray[int64]): 문서 길이와 근사 토큰 수
+                - histograms: 점수별·레벨별 문서 수, 권장 LLM 별 문서 수/글자 수/근사 토큰 수
+        """
+        if np is None:
+            raise ImportError("analyze_sensitivity_batch 에는 numpy 가 필요합니다")
+        texts = list(texts)
+        matcher = self.sensitivity_matcher()
+        counts = matcher.count_matrix(texts)
+        n_docs = len(texts)
+
+        def column(level: str):
+            if level in matcher.levels:
+                return counts[:, matcher.levels.index(level)]
+            return np.zeros(n_docs, dtype=np.int32)
+
+        high, medium, low = column("high"), column("medium"), column("low")
+        # 높은 레벨 키워드가 하나라도 있으면 그 레벨 규칙으로 점수 (없으면 기본 5점)
+        scores = np.select(
+            [high > 0, medium > 0, low > 0],
+            [8 + np.minimum(high, 2), 4 + np.minimum(medium, 3), 1 + np.minimum(low, 2)],
+            default=5,
+        ).astype(np.int8)
+        level_codes = np.digitize(scores, [4, 8]).astype(np.int8)
+        levels = np.asarray(SENSITIVITY_LEVELS)[level_codes]
+
+        # 근사 토큰 수: token_budget.estimate_tokens 와 같은 문자 종류별 가중치를 배열로 계산
+        # (예산이 청구하는 추정치와 문서별로 같은 값)
+        chars = np.fromiter((len(text) for text in texts), dtype=np.int64, count=n_docs)
+        ascii_chars = np.fromiter((count_ascii(text) for text in texts), dtype=np.int64, count=n_docs)
+        estimated_tokens = (ascii_chars / ASCII_CHARS_PER_TOKEN
+                            + (chars - ascii_chars) / OTHER_CHARS_PER_TOKEN).astype(np.int64) + 1
+
+        level_docs = np.bincount(level_codes, minlength=len(SENSITIVITY_LEVELS))
+        level_chars = np.bincount(level_codes, weights=chars, minlength=len(SENSITIVITY_LEVELS))
+        level_tokens = np.bincount(level_codes, weights=estimated_tokens, minlength=len(SENSITIVITY_LEVELS))
+        return {
+            "scores": scores,
+            "levels": levels,
+            "level_codes": level_codes,
+            "counts": counts,
+            "count_levels": matcher.levels,
+            "chars": chars,
+            "estimated_tokens": estimated_tokens,
+            "histograms": {
+                "score": {score: int(n) for score, n in enumerate(np.bincount(scores, minlength=11)) if score},
+                "level": {level: int(level_docs[i]) for i, level in enumerate(SENSITIVITY_LEVELS)},
+                "backend": {
+                    RECOMMENDED_LLM[level]: {"documents": int(level_docs[i]), "chars": int(level_chars[i]),
+                                             "estimated_tokens": int(level_tokens[i])}
+                    for i, level in enumerate(SENSITIVITY_LEVELS)
+                },
+            },
+        }
+
+    def _record_call(self, backend: str, text: str, result: Dict[str, Any], started: float,
+                     key_label: str = None, fallback: bool = True, **extra) -> Dict[str, Any]:
+        """실측 처리 시간을 결과에 기록하고 지표 로그에 남김 (시뮬레이션 백엔드는 폴백으로 표시)"""
+        elapsed = time.perf_counter() - started
+        extracted = result.get("extracted_data") or result.get("combined_insights") or {}
+        result["processing_time"] = f"{elapsed:.3f}초"
+        result["processing_seconds"] = elapsed
+        self.telemetry.record(backend, backend, elapsed,
+                              input_tokens=estimate_tokens(text),
+                              output_tokens=estimate_tokens(json.dumps(extracted, ensure_ascii=False)),
+                              key_label=key_label, fallback=fallback, **extra)
+        return result
+    
     def route_to_llm(self, text: str, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
         """분석 결과에 따라 적절한 LLM으로 라우팅"""
-        print("🔄 LLM 라우팅 중...")
+        logger.info("🔄 LLM 라우팅 중...")
         
         recommended_llm = analysis_result["recommended_llm"]
         
         if recommended_llm == "notebooklm":
+            if self.chunk_routing and np is not None:
+                return self.process_with_chunk_routing(text, analysis_result)
             return self.process_with_notebooklm(text, analysis_result)
         elif recommended_llm == "gemini_pro":
             return self.process_with_gemini_pro(text, analysis_result)
         else:  # hybrid
             return self.process_with_hybrid(text, analysis_result)
     
-    def process_with_notebooklm(self, text: str, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
-        """노트북LM으로 처리 (고민감도 문서)"""
-        print("📱 노트북LM으로 처리 중...")
+    def process_with_notebooklm(self, text: str, analysis_result: Dict[str, Any],
+                                cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """노트북LM으로 처리 (고민감도 문서). cancel이 켜지면 결과를 기록하지 않고 BackendCancelled"""
+        _check_cancel(cancel, "notebooklm")
+        logger.info("📱 노트북LM으로 처리 중...")
+        started = time.perf_counter()
         
-        # 시뮬레이션: 노트북LM 처리
+        # 로컬 경량 추출 (문서가 외부로 나가지 않음)
+        extracted = self.local_extractor.extract(text)
+        _check_cancel(cancel, "notebooklm")
+        extracted["insights"] = "개인 경험 기반 분석으로 창의적 인사이트 생성"
         result = {
             "llm_used": "notebooklm",
             "processing_type": "local_secure",
-            "extracted_data": {
-                "keywords": ["내부전략", "기밀정보", "비즈니스모델"],
-                "summary": "고민감도 문서로 인식되어 노트북LM에서 로컬 처리됨",
-                "entities": ["내부인물1", "내부인물2"],
-                "insights": "개인 경험 기반 분석으로 창의적 인사이트 생성"
-            },
+            "extracted_data": extracted,
             "security_level": "maximum",
-            "processing_time": "2.3초",
             "analysis_result": analysis_result
         }
+        self._record_call("notebooklm", text, result, started, fallback=False)
         
-        print("✅ 노트북LM 처리 완료")
+        logger.info("✅ 노트북LM 처리 완료")
         return result
     
-    def process_with_gemini_pro(self, text: str, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
-        """Gemini Pro로 처리 (저민감도 문서)"""
-        print("☁️ Gemini Pro로 처리 중...")
+    def process_with_gemini_pro(self, text: str, analysis_result: Dict[str, Any],
+                                cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Gemini Pro로 처리 (저민감도 문서). cancel이 켜지면 키를 반납하고 BackendCancelled"""
+        _check_cancel(cancel, "gemini_pro")
+        logger.info("☁️ Gemini Pro로 처리 중...")
+        started = time.perf_counter()
+        
+        # 키 풀에서 사용률이 가장 낮은 키 선택
+        key = self.key_pool.acquire()
         
         # 시뮬레이션: Gemini Pro 처리
         result = {
@@ -127,43 +309,201 @@ class HybridLLMRouter:
                 "insights": "외부 정보 기반 객관적 분석으로 시장 인사이트 생성"
             },
             "security_level": "standard",
-            "processing_time": "1.8초",
+            "api_key_label": key.label if key else None,
             "analysis_result": analysis_result
         }
         
-        print("✅ Gemini Pro 처리 완료")
+        if cancel is not None and cancel.is_set():
+            if key:
+                self.key_pool.release(key)
+            _check_cancel(cancel, "gemini_pro")
+        if key:
+            self.key_pool.record_success(key)
+        self._record_call("gemini_pro", text, result, started, key.label if key else None)
+        
+        logger.info("✅ Gemini Pro 처리 완료")
         return result
     
+    def _backend_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.hybrid_workers,
+                                                        thread_name_prefix='hybrid-backend')
+        return self._executor
+
+    def close(self):
+        """백엔드 스레드 풀 종료 (대기 중인 작업은 취소하고, 실행 중인 작업을 기다리지 않음)"""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
     def process_with_hybrid(self, text: str, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
-        """하이브리드 처리 (중민감도 문서)"""
-        print("🔄 하이브리드 처리 중...")
+        """
+        하이브리드 처리 (중민감도 문서). 두 백엔드를 동시에 실행하여 지연은 둘 중 긴 쪽만큼만 든다.
+        hybrid_deadline 안에 한쪽만 끝나거나 한쪽이 실패하면 남은 결과를 degraded로 표시하여 반환.
+        마감을 넘긴 백엔드는 기다리지 않는다: 대기 중이면 취소하고, 실행 중이면 취소 플래그를 켜서
+        다음 단계에서 결과를 기록하지 않고 멈추게 한다 (future.cancel()은 실행 중인 작업을 멈추지 못함)
+        """
+        logger.info("🔄 하이브리드 처리 중...")
+        started = time.perf_counter()
         
-        # 시뮬레이션: 하이브리드 처리
-        notebooklm_result = self.process_with_notebooklm(text, analysis_result)
-        gemini_result = self.process_with_gemini_pro(text, analysis_result)
+        executor = self._backend_executor()
+        cancel = threading.Event()
+        futures = {
+            "notebooklm": executor.submit(self.process_with_notebooklm, text, analysis_result, cancel),
+            "gemini_pro": executor.submit(self.process_with_gemini_pro, text, analysis_result, cancel),
+        }
+        done, pending = wait(futures.values(), timeout=self.hybrid_deadline)
+        if pending:
+            cancel.set()
+        completed: Dict[str, Dict[str, Any]] = {}
+        failures: Dict[str, str] = {}
+        for backend, future in futures.items():
+            if future not in done:
+                future.cancel()
+                failures[backend] = f"마감 시간 {self.hybrid_deadline:.1f}초 초과"
+            elif future.exception() is not None:
+                failures[backend] = f"{type(future.exception()).__name__}: {future.exception()}"
+            else:
+                completed[backend] = future.result()
+        if not completed:
+            raise RuntimeError(f"하이브리드 처리 실패: {failures}")
         
-        # 결과 융합
+        # 결과 융합 (끝난 백엔드 결과만)
+        extracted = [completed[backend]["extracted_data"] for backend in futures if backend in completed]
+        degraded = bool(failures)
         result = {
             "llm_used": "hybrid",
             "processing_type": "combined_analysis",
-            "notebooklm_analysis": notebooklm_result["extracted_data"],
-            "gemini_analysis": gemini_result["extracted_data"],
+            "notebooklm_analysis": completed.get("notebooklm", {}).get("extracted_data"),
+            "gemini_analysis": completed.get("gemini_pro", {}).get("extracted_data"),
             "combined_insights": {
-                "keywords": list(set(notebooklm_result["extracted_data"]["keywords"] + 
-                                   gemini_result["extracted_data"]["keywords"])),
-                "summary": f"하이브리드 분석: {notebooklm_result['extracted_data']['summary']} + {gemini_result['extracted_data']['summary']}",
-                "entities": list(set(notebooklm_result["extracted_data"]["entities"] + 
-                                   gemini_result["extracted_data"]["entities"])),
-                "insights": "개인 경험과 외부 정보를 결합한 종합적 인사이트"
+                "keywords": list(set(k for data in extracted for k in data["keywords"])),
+                "summary": "하이브리드 분석: " + " + ".join(data["summary"] for data in extracted),
+                "entities": list(set(e for data in extracted for e in data["entities"])),
+                "insights": ("개인 경험과 외부 정보를 결합한 종합적 인사이트" if not degraded
+                             else extracted[0]["insights"])
             },
             "security_level": "enhanced",
-            "processing_time": "4.1초",
+            "degraded": degraded,
+            "failed_backends": failures,
             "analysis_result": analysis_result
         }
+        self._record_call("hybrid", text, result, started, degraded=degraded)
         
-        print("✅ 하이브리드 처리 완료")
+        if degraded:
+            logger.warning(f"⚠️ 하이브리드 처리 일부 실패, {', '.join(completed)} 결과만 사용: {failures}")
+        else:
+            logger.info("✅ 하이브리드 처리 완료")
         return result
     
+    def process_with_chunk_routing(self, text: str, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        청크 단위 라우팅 (고민감도 문서, HYBRID_CHUNK_ROUTING=True 일 때만). 고민감도 청크와 그 이웃만
+        로컬(노트북LM)에서, 나머지 청크는 클라우드(Gemini Pro)에서 동시에 처리한 뒤 하나의 추출 결과로 병합.
+        클라우드로 보낼 본문에 고민감도 키워드가 남아 있으면 문서 전체를 로컬에서 처리
+        """
+        logger.info("🧩 청크 단위 라우팅 중...")
+        started = time.perf_counter()
+        
+        chunks = split_to_fit(text, self.chunk_tokens)
+        local_mask = self.local_chunk_mask(chunks)
+        local_text = ''.join(chunk for chunk, local in zip(chunks, local_mask) if local)
+        cloud_text = ''.join(chunk for chunk, local in zip(chunks, local_mask) if not local)
+        if cloud_text and self._has_high_keyword([cloud_text]):
+            # 떨어진 청크를 이어 붙이며 새로 생긴 키워드까지 포함해, 보내기 직전 본문을 다시 검사
+            logger.warning("클라우드로 보낼 본문에서 고민감도 키워드 발견, 문서 전체를 로컬에서 처리")
+            local_mask[:] = True
+            local_text, cloud_text = text, ''
+        
+        executor = self._backend_executor()
+        local_future = executor.submit(self._timed, self.process_with_notebooklm, local_text, analysis_result)
+        cloud_future = (executor.submit(self._timed, self.process_with_gemini_pro, cloud_text, analysis_result)
+                        if cloud_text else None)
+        local_result, local_seconds = local_future.result()
+        cloud_result, cloud_seconds = cloud_future.result() if cloud_future else (None, 0.0)
+        
+        # 문서에서 먼저 나온 쪽의 결과를 앞에 두고 병합
+        parts = [local_result["extracted_data"]]
+        if cloud_result:
+            parts.insert(0 if not local_mask[0] else 1, cloud_result["extracted_data"])
+        extracted = merge_extractions(parts)
+        extracted["insights"] = local_result["extracted_data"]["insights"]
+        split = {
+            "chunks": len(chunks),
+            "local_chunks": int(local_mask.sum()),
+            "cloud_chunks": int((~local_mask).sum()),
+            "local_chars": len(local_text),
+            "cloud_chars": len(cloud_text),
+            "local_char_ratio": round(len(local_text) / len(text), 4) if text else 1.0,
+            "local_seconds": round(local_seconds, 4),
+            "cloud_seconds": round(cloud_seconds, 4),
+        }
+        with self._executor_lock:
+            stats = self.chunk_routing_stats
+            stats['documents'] += 1
+            for field in ('chunks', 'local_chunks', 'cloud_chunks', 'local_chars', 'cloud_chars',
+                          'local_seconds', 'cloud_seconds'):
+                stats[field] += split[field]
+        result = {
+            "llm_used": "chunk_routed",
+            "processing_type": "local_secure+cloud_public" if cloud_result else "local_secure",
+            "extracted_data": extracted,
+            "security_level": "maximum",
+            "chunk_routing": split,
+            "api_key_label": cloud_result.get("api_key_label") if cloud_result else None,
+            "analysis_result": analysis_result
+        }
+        self._record_call("chunk_routed", text, result, started, fallback=False,
+                          local_char_ratio=split["local_char_ratio"])
+        
+        logger.info(f"✅ 청크 라우팅 완료: 로컬 {split['local_chunks']}/{split['chunks']}개 청크 "
+              f"(글자 {split['local_char_ratio']:.0%})")
+        return result
+    
+    def _has_high_keyword(self, pages: List[str]) -> bool:
+        matcher = self.sensitivity_matcher()
+        if "high" not in matcher.levels:
+            return False
+        return matcher.count_pages(pages)[0][matcher.levels.index("high")] > 0
+
+    def local_chunk_mask(self, chunks: List[str]):
+        """
+        로컬에서 처리할 청크 (np.ndarray[bool]). 고민감도 키워드가 있는 청크와 그 앞뒤 청크를 로컬로 둔다.
+        오토마톤 상태를 이어 가며 세므로 청크 경계에 걸친 키워드도 끝나는 청크에서 찾고,
+        이웃까지 로컬로 두어 경계 양쪽 조각이 모두 외부로 나가지 않게 한다.
+        고민감도 청크가 없거나(문서 점수가 다른 근거로 높음) 모든 청크가 로컬이면 문서 전체를 로컬에서 처리
+        """
+        matcher = self.sensitivity_matcher()
+        n_chunks = len(chunks)
+        if "high" in matcher.levels:
+            high_id = matcher.levels.index("high")
+            high = np.fromiter((counts[high_id] > 0 for counts in matcher.page_counts(chunks)),
+                               dtype=bool, count=n_chunks)
+        else:
+            high = np.zeros(n_chunks, dtype=bool)
+        local_mask = high.copy()
+        local_mask[1:] |= high[:-1]
+        local_mask[:-1] |= high[1:]
+        if not local_mask.any() or local_mask.all():
+            local_mask[:] = True
+        return local_mask
+
+    @staticmethod
+    def _timed(fn, *args):
+        started = time.perf_counter()
+        return fn(*args), time.perf_counter() - started
+    
+    def chunk_routing_report(self) -> Dict[str, Any]:
+        """청크 라우팅 누적 분할: 로컬/클라우드 청크·글자 수, 로컬 처리 비율, 백엔드별 처리 시간"""
+        with self._executor_lock:
+            stats = dict(self.chunk_routing_stats)
+        chars = stats['local_chars'] + stats['cloud_chars']
+        return dict(stats, local_char_ratio=round(stats['local_chars'] / chars, 4) if chars else None,
+                    local_seconds=round(stats['local_seconds'], 4), cloud_seconds=round(stats['cloud_seconds'], 4))
+    
     def test_hybrid_system(self) -> Dict[str, Any]:
         """하이브리드 시스템 테스트"""
         print("🧪 하이브리드 시스템 테스트 시작...")
@@ -206,6 +546,8 @@ class HybridLLMRouter:
             "test_timestamp": datetime.now().isoformat(),
             "total_documents": len(test_documents),
             "test_results": test_results,
+            "key_pool_utilization": self.key_pool.utilization(),
+            "chunk_routing": self.chunk_routing_report(),
             "system_status": "operational"
         }
         
@@ -214,6 +556,7 @@ class HybridLLMRouter:
 
 def main():
     """메인 실행 함수"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     print("🎯 하이브리드 LLM 라우터 시작")
     
     # 하이브리드 라우터 초기화
@@ -221,6 +564,7 @@ def main():
     
     # 하이브리드 시스템 테스트 실행
     test_result = router.test_hybrid_system()
+    router.close()
     
     # 결과 저장
     with open('hybrid_system_test_results.json', 'w', encoding='utf-8') as f:
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+hybrid_llm_router_test.py
+- 하이브리드 라우터(hybrid_llm_router.py)의 민감도 일괄 분석, 하이브리드 마감 시간, 청크 라우팅 검증
+- 외부 서비스 없이 실행
+
+사용법:
+    python hybrid_llm_router_test.py
+"""
+
+import os
+import sys
+import time
+
+import hybrid_llm_router
+from hybrid_llm_router import HybridLLMRouter
+from llm_telemetry import TelemetryLogger
+from token_budget import estimate_tokens
+
+MIXED_TEXTS = [
+    "Café résumé naïve — 2바이트 라틴 문자와 한글이 섞인 기밀 문서",
+    "이모지 😀🚀 가 들어간 내부 보고서 검토",
+    "plain ascii news article",
+    "",
+    "한글만 있는 공개 참고 정보 " * 50,
+]
+
+
+def test_batch_token_estimates_match_budget():
+    # 히스토그램의 근사 토큰 수가 예산이 청구하는 estimate_tokens 와 문서별로 같아야 함
+    router = HybridLLMRouter()
+    batch = router.analyze_sensitivity_batch(MIXED_TEXTS)
+    assert batch["estimated_tokens"].tolist() == [estimate_tokens(text) for text in MIXED_TEXTS]
+    backend_tokens = sum(entry["estimated_tokens"] for entry in batch["histograms"]["backend"].values())
+    assert backend_tokens == sum(estimate_tokens(text) for text in MIXED_TEXTS)
+
+
+def test_batch_scores_match_single_analysis():
+    router = HybridLLMRouter()
+    batch = router.analyze_sensitivity_batch(MIXED_TEXTS)
+    for text, score, level in zip(MIXED_TEXTS, batch["scores"], batch["levels"]):
+        single = router.analyze_sensitivity(text)
+        assert (single["sensitivity_score"], single["sensitivity_level"]) == (int(score), str(level)), text
+
+
+class SlowExtractor:
+    """로컬 추출이 오래 걸리는 상황 (추출이 끝난 시각 기록)"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.finished_at = None
+
+    def extract(self, text):
+        time.sleep(self.seconds)
+        self.finished_at = time.perf_counter()
+        return {"keywords": ["느린"], "summary": "느린 로컬 추출", "entities": []}
+
+
+class RecordingTelemetry(TelemetryLogger):
+    def __init__(self):
+        super().__init__(enabled=False)
+        self.backends = []
+
+    def record(self, backend, *args, **kwargs):
+        self.backends.append(backend)
+
+
+def make_router(slow_seconds: float, deadline: float) -> HybridLLMRouter:
+    extractor = SlowExtractor(slow_seconds)
+
+    class SlowLocalRouter(HybridLLMRouter):
+        local_extractor = extractor
+
+    router = SlowLocalRouter()
+    router.hybrid_deadline = deadline
+    router.telemetry = RecordingTelemetry()
+    return router
+
+
+def test_hybrid_returns_at_deadline_and_cancels_slow_backend():
+    router = make_router(slow_seconds=1.0, deadline=0.2)
+    analysis = router.analyze_sensitivity("시장 분석 보고서 검토")
+    started = time.perf_counter()
+    result = router.process_with_hybrid("시장 분석 보고서 검토", analysis)
+    elapsed = time.perf_counter() - started
+    # 느린 백엔드를 기다리지 않고 마감 시간에 반환
+    assert elapsed < 0.6, elapsed
+    assert result["degraded"] and list(result["failed_backends"]) == ["notebooklm"]
+    assert result["gemini_analysis"] is not None and result["notebooklm_analysis"] is None
+    # 마감 뒤 끝난 로컬 추출은 취소 플래그를 보고 결과를 기록하지 않음
+    time.sleep(1.0)
+    assert router.local_extractor.finished_at is not None
+    assert "notebooklm" not in router.telemetry.backends, router.telemetry.backends
+    router.close()
+
+
+def test_close_does_not_wait_for_running_backend():
+    router = make_router(slow_seconds=1.0, deadline=0.1)
+    router.process_with_hybrid("시장 분석 보고서 검토", router.analyze_sensitivity("시장 분석 보고서 검토"))
+    started = time.perf_counter()
+    router.close()
+    assert time.perf_counter() - started < 0.2
+
+
+FILLER = "일반 공개 뉴스 참고 자료입니다. "
+
+
+class CloudRecordingRouter(HybridLLMRouter):
+    """클라우드 백엔드로 보낸 본문을 기록"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunk_routing = True
+        self.cloud_inputs = []
+
+    def process_with_gemini_pro(self, text, analysis_result, cancel=None):
+        self.cloud_inputs.append(text)
+        return super().process_with_gemini_pro(text, analysis_result, cancel)
+
+
+def route_chunks(chunks):
+    """split_to_fit 결과를 고정하여 청크 라우팅 실행 (청크 경계를 테스트가 정함)"""
+    router = CloudRecordingRouter()
+    original = hybrid_llm_router.split_to_fit
+    hybrid_llm_router.split_to_fit = lambda text, max_tokens: list(chunks)
+    try:
+        text = ''.join(chunks)
+        result = router.process_with_chunk_routing(text, router.analyze_sensitivity(text))
+    finally:
+        hybrid_llm_router.split_to_fit = original
+        router.close()
+    return router, result
+
+
+def test_chunk_routing_is_off_by_default():
+    saved = os.environ.pop('HYBRID_CHUNK_ROUTING', None)
+    try:
+        assert HybridLLMRouter().chunk_routing is False
+    finally:
+        if saved is not None:
+            os.environ['HYBRID_CHUNK_ROUTING'] = saved
+
+
+def test_keyword_split_across_chunks_never_reaches_cloud():
+    # '기밀' 이 두 청크에 나뉘어 있어 청크를 따로 검사하면 찾지 못함
+    chunks = [FILLER, FILLER + "이 문서는 회사 기", "밀 사항을 담고 있다. " + FILLER, FILLER, FILLER,
+              "계약 조건 초안. " + FILLER, FILLER, FILLER]
+    router, result = route_chunks(chunks)
+    sent = ''.join(router.cloud_inputs)
+    assert router.cloud_inputs, "클라우드로 보낸 청크가 없음"
+    assert "기" not in sent and "밀" not in sent and "계약" not in sent, sent
+    # 키워드가 끝나는 청크와 그 앞뒤 청크(1-3, 4-6)는 로컬
+    assert result["chunk_routing"]["cloud_chunks"] == 2, result["chunk_routing"]
+
+
+def test_keyword_formed_by_joining_cloud_chunks_keeps_document_local():
+    # 로컬 청크를 빼고 이어 붙이면 '기' + '밀' 이 맞닿아 새 키워드가 됨
+    chunks = [FILLER, FILLER + "회사 기", FILLER, "계약 조건 초안. ", FILLER, "밀 보고. " + FILLER, FILLER]
+    router, result = route_chunks(chunks)
+    assert router.cloud_inputs == [], router.cloud_inputs
+    assert result["chunk_routing"]["cloud_chunks"] == 0 and result["processing_type"] == "local_secure"
+
+
+TESTS = [
+    test_batch_token_estimates_match_budget,
+    test_batch_scores_match_single_analysis,
+    test_hybrid_returns_at_deadline_and_cancels_slow_backend,
+    test_close_does_not_wait_for_running_backend,
+    test_chunk_routing_is_off_by_default,
+    test_keyword_split_across_chunks_never_reaches_cloud,
+    test_keyword_formed_by_joining_cloud_chunks_keeps_document_local,
+]
+
+
+def main():
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+    print(f"=== {len(TESTS) - failed}/{len(TESTS)} 통과 ===")
+    return failed == 0
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -15,6 +15,8 @@ import json
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
+from entity_gazetteer import get_default_gazetteer
+
 # 환경 변수
 from dotenv import load_dotenv
 
@@ -73,6 +75,11 @@ class KnowledgeGraphSimulator:
         self.entity_types = ["인물", "기업", "기술", "정책", "이벤트", "위험", "프로젝트"]
         
         logger.info("지식 그래프 시뮬레이터 초기화 완료")
+
+    @property
+    def gazetteer(self):
+        """People_Network / Knowledge_Graph / Projects_Master 이름으로 만든 개체 사전 (처음 쓸 때 적재)"""
+        return get_default_gazetteer()
     
     def create_entity_database(self) -> Dict[str, Any]:
         """
@@ -103,27 +110,22 @@ class KnowledgeGraphSimulator:
         
         return db_structure
     
-    def extract_entities_from_text(self, text: str, doc_id: str) -> List[Dict[str, Any]]:
+    def extract_entities_from_text(self, text: str, doc_id: str,
+                                   llm_entities: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
         """
-        텍스트에서 개체를 추출하는 함수 (시뮬레이션)
+        텍스트에서 개체를 추출하는 함수 (개체 사전 Aho-Corasick 검색 + LLM 추출 개체 병합)
         
         Args:
             text (str): 분석할 텍스트
             doc_id (str): 문서 ID
+            llm_entities (Optional[List[Any]]): LLM이 찾은 개체 (이름 또는 {name, type})
             
         Returns:
             List[Dict[str, Any]]: 추출된 개체 목록
         """
         logger.info(f"텍스트에서 개체 추출 시작: 문서 {doc_id}")
         
-        # 시뮬레이션된 개체 추출
-        extracted_entities = [
-            {"name": "조대표", "type": "인물", "confidence": 0.95},
-            {"name": "GIA_INFOSYS", "type": "프로젝트", "confidence": 0.90},
-            {"name": "Notion", "type": "기술", "confidence": 0.85},
-            {"name": "AI 기술", "type": "기술", "confidence": 0.80},
-            {"name": "개인정보시스템", "type": "프로젝트", "confidence": 0.75}
-        ]
+        extracted_entities = self.gazetteer.merge(text, llm_entities or [])
         
         logger.info(f"개체 추출 완료: {len(extracted_entities)}개 개체 발견")
         return extracted_entities
@@ -3,7 +3,7 @@
 """
 llm_extractor_test.py
 - Gemini Pro API를 사용해 핵심 키워드, 요약, 관련 인물 추출 테스트
-- google.generativeai 미설치/키 미설정 시 시뮬레이션 모드로 동작
+- google.generativeai 미설치/키 미설정 시 로컬 경량 추출기로 동작
 """
 
 import os
@@ -25,34 +25,22 @@ try:
 except Exception as e:  # dotenv 자체가 없을 때
     logger.warning(f"python-dotenv 미설치: {e}")
 
-GEMINI_KEY = os.getenv('GEMINI_API_KEY_1') or os.getenv('GEMINI_API_KEY_2')
-MODEL = os.getenv('GEMINI_MODEL', 'gemini-pro')
+from gemini_client import get_default_client
+from local_extractor import get_default_extractor
 
+CLIENT = get_default_client()
 
-def simulate_extract(text: str) -> Dict[str, Any]:
-    return {
-        'keywords': ['GIA_INFOSYS', '문서 파싱', 'Notion 연동'],
-        'summary': '문서에서 핵심 내용을 추출하고 노션에 저장하는 파이프라인 테스트.',
-        'entities': ['조대표', '나실장', '서대리']
-    }
+
+def local_extract(text: str) -> Dict[str, Any]:
+    return get_default_extractor().extract(text)
 
 
 def real_extract(text: str) -> Dict[str, Any]:
     try:
-        import google.generativeai as genai
-        genai.configure(api_key=GEMINI_KEY)
-        prompt = (
-            "다음 텍스트의 핵심 키워드(최대 8개), 2문장 요약, 관련 인물(있으면) 리스트를 JSON으로만 출력하세요.\n"
-            "필드: keywords(list), summary(str), entities(list). 텍스트:\n" + text
-        )
-        model = genai.GenerativeModel(MODEL)
-        resp = model.generate_content(prompt)
-        content = resp.text.strip()
-        import json
-        return json.loads(content)
+        return CLIENT.extract(text)
     except Exception as e:
-        logger.warning(f"Gemini 호출 실패, 시뮬레이션으로 대체: {e}")
-        return simulate_extract(text)
+        logger.warning(f"Gemini 호출 실패, 로컬 추출로 대체: {e}")
+        return local_extract(text)
 
 
 def main():
@@ -61,9 +49,9 @@ def main():
         "Notion 데이터베이스에 저장하는 시스템이다. 나실장은 기획, 노팀장은 기술자문, 서대리는 개발을 담당한다."
     )
 
-    if not GEMINI_KEY:
-        logger.info("GEMINI_API_KEY 미설정: 시뮬레이션 모드로 실행")
-        result = simulate_extract(sample_text)
+    if not CLIENT.available:
+        logger.info("GEMINI_API_KEY 미설정: 로컬 추출 모드로 실행")
+        result = local_extract(sample_text)
     else:
         result = real_extract(sample_text)
 
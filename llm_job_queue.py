@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+llm_job_queue.py
+- LLM 추출 요청을 로컬 SQLite에 기록하는 내구성 작업 큐
+- 상태: queued → inflight(임대) → done / failed
+- 워커는 임대(lease) 방식으로 작업을 가져가고, 임대가 만료된 작업은 다시 가져갈 수 있음
+- 처리 중에는 LeaseHeartbeat 가 임대를 주기적으로 연장 (재시도·헤지·쿨다운으로 길어진 호출을 다른 워커가 중복 처리하지 않도록)
+- 중단 후 재실행 시 완료된 작업은 저장된 결과를 그대로 사용하여 LLM 호출을 반복하지 않음
+
+사용법:
+    python llm_job_queue.py [llm_jobs.sqlite3]    # 상태별 작업 수 출력
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+import logging
+from typing import Dict, Any, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_PATH = 'llm_jobs.sqlite3'
+
+QUEUED = 'queued'
+INFLIGHT = 'inflight'
+DONE = 'done'
+FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    text_hash TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    not_before REAL NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    upload_ref TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, not_before);
+"""
+
+
+class Job:
+    """작업 한 건"""
+
+    def __init__(self, row: sqlite3.Row):
+        self.job_id = row['job_id']
+        self.payload = json.loads(row['payload'])
+        self.state = row['state']
+        self.attempts = row['attempts']
+        self.result = json.loads(row['result']) if row['result'] else None
+        self.error = row['error']
+        self.upload_ref = row['upload_ref']
+
+    def __repr__(self) -> str:
+        return f"Job({self.job_id}, {self.state}, attempts={self.attempts})"
+
+
+class LeaseHeartbeat:
+    """
+    작업 처리 중 임대를 주기적으로 연장하는 백그라운드 스레드 (with 문으로 사용)
+
+    사용 예:
+        with queue.heartbeat(worker_id, job_ids) as heartbeat:
+            ...  # 추출
+        heartbeat.lost  # 연장에 실패한(다른 워커에게 넘어간) 작업
+    """
+
+    def __init__(self, queue: 'LLMJobQueue', worker_id: str, job_ids: Iterable[str], interval: float):
+        self.queue = queue
+        self.worker_id = worker_id
+        self.job_ids = list(job_ids)
+        self.interval = interval
+        self.renewals = 0
+        self.lost: Set[str] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            for job_id in self.job_ids:
+                if job_id in self.lost:
+                    continue
+                if self.queue.renew(job_id, self.worker_id):
+                    self.renewals += 1
+                else:
+                    self.lost.add(job_id)
+                    logger.warning(f"작업 임대 연장 실패(이미 완료되었거나 다른 워커가 가져감): {job_id}")
+
+    def __enter__(self) -> 'LeaseHeartbeat':
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+
+
+class LLMJobQueue:
+    """SQLite 기반 LLM 작업 큐 (스레드 안전, 프로세스 간에는 SQLite 잠금으로 보호)"""
+
+    def __init__(self, path: Optional[str] = None, lease_seconds: float = 120.0, max_attempts: int = 3):
+        """
+        Args:
+            path (Optional[str]): DB 파일 경로 (기본: LLM_JOB_QUEUE_PATH 또는 llm_jobs.sqlite3)
+            lease_seconds (float): 임대 유지 시간. 만료되면 다른 워커가 가져갈 수 있음
+            max_attempts (int): 실패 허용 횟수. 넘으면 failed
+        """
+        self.path = path or os.getenv('LLM_JOB_QUEUE_PATH', DEFAULT_QUEUE_PATH)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_env(cls) -> 'LLMJobQueue':
+        return cls(
+            lease_seconds=float(os.getenv('LLM_JOB_LEASE_SECONDS', 120)),
+            max_attempts=int(os.getenv('LLM_JOB_MAX_ATTEMPTS', 3)),
+        )
+
+    def _write(self, sql: str, params: tuple = ()) -> int:
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+
+    def enqueue(self, job_id: str, text: str, **payload) -> str:
+        """
+        작업 등록. 같은 id·같은 텍스트로 이미 등록된 작업은 상태를 유지하고,
+        텍스트가 바뀐 작업은 결과를 버리고 다시 queued로 돌림
+
+        Returns:
+            str: 등록 후 작업 상태
+        """
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        body = json.dumps(dict(payload, text=text), ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT text_hash, state FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+            if row is None:
+                self._conn.execute(
+                    'INSERT INTO jobs (job_id, text_hash, payload, state, created_at, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)', (job_id, digest, body, QUEUED, now, now))
+                return QUEUED
+            if row['text_hash'] != digest:
+                self._conn.execute(
+                    'UPDATE jobs SET text_hash = ?, payload = ?, state = ?, attempts = 0, result = NULL, '
+                    'error = NULL, upload_ref = NULL, lease_owner = NULL, not_before = 0, updated_at = ? '
+                    'WHERE job_id = ?', (digest, body, QUEUED, now, job_id))
+                return QUEUED
+            return row['state']
+
+    def requeue_orphans(self) -> int:
+        """
+        임대가 만료된 inflight 작업(중단된 이전 실행 등)을 queued로 되돌림.
+        임대가 살아 있는 작업은 다른 프로세스가 처리 중일 수 있으므로 건드리지 않음
+        """
+        now = time.time()
+        count = self._write(
+            'UPDATE jobs SET state = ?, lease_owner = NULL, updated_at = ? '
+            'WHERE state = ? AND (lease_expires IS NULL OR lease_expires < ?)',
+            (QUEUED, now, INFLIGHT, now))
+        if count:
+            logger.info(f"임대가 만료된 작업 {count}건 재등록")
+        return count
+
+    def claim(self, worker_id: str, limit: int = 1) -> List[Job]:
+        """queued 이거나 임대가 만료된 작업을 최대 limit건 임대"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                rows = self._conn.execute(
+                    'SELECT job_id FROM jobs WHERE not_before <= ? AND '
+                    '(state = ? OR (state = ? AND lease_expires < ?)) ORDER BY created_at LIMIT ?',
+                    (now, QUEUED, INFLIGHT, now, limit)).fetchall()
+                ids = [row['job_id'] for row in rows]
+                for job_id in ids:
+                    self._conn.execute(
+                        'UPDATE jobs SET state = ?, lease_owner = ?, lease_expires = ?, attempts = attempts + 1, '
+                        'updated_at = ? WHERE job_id = ?',
+                        (INFLIGHT, worker_id, now + self.lease_seconds, now, job_id))
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            if not ids:
+                return []
+            placeholders = ','.join('?' * len(ids))
+            rows = self._conn.execute(f'SELECT * FROM jobs WHERE job_id IN ({placeholders})', ids).fetchall()
+        return [Job(row) for row in rows]
+
+    def renew(self, job_id: str, worker_id: str) -> bool:
+        """임대 연장. 이미 다른 워커에게 넘어갔으면 False"""
+        return self._write(
+            'UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE job_id = ? AND lease_owner = ? AND state = ?',
+            (time.time() + self.lease_seconds, time.time(), job_id, worker_id, INFLIGHT)) == 1
+
+    def heartbeat(self, worker_id: str, job_ids: Iterable[str],
+                  interval: Optional[float] = None) -> LeaseHeartbeat:
+        """job_ids 의 임대를 interval초(기본: 임대 시간의 1/3)마다 연장하는 LeaseHeartbeat"""
+        return LeaseHeartbeat(self, worker_id, job_ids, interval or self.lease_seconds / 3)
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        return self._write(
+            'UPDATE jobs SET state = ?, result = ?, error = NULL, lease_owner = NULL, updated_at = ? '
+            'WHERE job_id = ? AND lease_owner = ?',
+            (DONE, json.dumps(result, ensure_ascii=False), time.time(), job_id, worker_id)) == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> str:
+        """실패 기록. 허용 횟수 이내면 다시 queued, 넘으면 failed"""
+        with self._lock:
+            row = self._conn.execute('SELECT attempts FROM jobs WHERE job_id = ? AND lease_owner = ?',
+                                     (job_id, worker_id)).fetchone()
+            if row is None:
+                return INFLIGHT
+            state = FAILED if row['attempts'] >= self.max_attempts else QUEUED
+            self._conn.execute(
+                'UPDATE jobs SET state = ?, error = ?, lease_owner = NULL, updated_at = ? WHERE job_id = ?',
+                (state, error[:500], time.time(), job_id))
+        return state
+
+    def release(self, job_id: str, worker_id: str, delay: float = 0.0) -> bool:
+        """처리하지 않고 반납 (시도 횟수에 넣지 않음). delay초 동안은 다시 임대되지 않음"""
+        now = time.time()
+        return self._write(
+            'UPDATE jobs SET state = ?, attempts = attempts - 1, lease_owner = NULL, not_before = ?, updated_at = ? '
+            'WHERE job_id = ? AND lease_owner = ?',
+            (QUEUED, now + delay, now, job_id, worker_id)) == 1
+
+    def set_upload_ref(self, job_id: str, upload_ref: str):
+        """업로드 결과(페이지 ID) 기록. 재실행 시 중복 업로드 방지"""
+        self._write('UPDATE jobs SET upload_ref = ?, updated_at = ? WHERE job_id = ?',
+                    (upload_ref, time.time(), job_id))
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        return Job(row) if row else None
+
+    def pending(self) -> int:
+        """아직 끝나지 않은(queued/inflight) 작업 수"""
+        with self._lock:
+            row = self._conn.execute('SELECT COUNT(*) AS n FROM jobs WHERE state IN (?, ?)',
+                                     (QUEUED, INFLIGHT)).fetchone()
+        return row['n']
+
+    def next_ready_in(self) -> float:
+        """가장 빨리 임대 가능해지는 queued 작업까지 남은 시간(초)"""
+        with self._lock:
+            row = self._conn.execute('SELECT MIN(not_before) AS t FROM jobs WHERE state = ?', (QUEUED,)).fetchone()
+        return max(0.0, (row['t'] or 0.0) - time.time())
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute('SELECT state, COUNT(*) AS n FROM jobs GROUP BY state').fetchall()
+        counts = {QUEUED: 0, INFLIGHT: 0, DONE: 0, FAILED: 0}
+        counts.update({row['state']: row['n'] for row in rows})
+        return counts
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else os.getenv('LLM_JOB_QUEUE_PATH', DEFAULT_QUEUE_PATH)
+    if not os.path.exists(path):
+        print(f"작업 큐 없음: {path}")
+        return False
+    queue = LLMJobQueue(path)
+    print(f"LLM 작업 큐: {path}")
+    for state, count in queue.counts().items():
+        print(f"  {state:<10}{count:>8}")
+    queue.close()
+    return True
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+llm_job_queue_test.py
+- SQLite 작업 큐(llm_job_queue.py)의 임대/연장/재개 동작 검증
+- 외부 서비스 없이 실행 (임시 디렉터리에 DB 생성, 큐 객체 두 개로 두 프로세스를 흉내 냄)
+
+사용법:
+    python llm_job_queue_test.py
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+from llm_job_queue import DONE, FAILED, INFLIGHT, QUEUED, LLMJobQueue
+
+
+def open_pair(directory: str, lease_seconds: float):
+    path = os.path.join(directory, 'jobs.sqlite3')
+    return LLMJobQueue(path, lease_seconds=lease_seconds), LLMJobQueue(path, lease_seconds=lease_seconds)
+
+
+def test_heartbeat_prevents_duplicate_claim():
+    with tempfile.TemporaryDirectory() as directory:
+        first, second = open_pair(directory, lease_seconds=0.3)
+        first.enqueue('doc1', '본문')
+        jobs = first.claim('run-a-w0')
+        assert [job.job_id for job in jobs] == ['doc1']
+        stolen = []
+        # 임대 시간의 4배 동안 처리하는 느린 추출
+        with first.heartbeat('run-a-w0', ['doc1']) as heartbeat:
+            deadline = time.time() + 1.2
+            while time.time() < deadline:
+                stolen += second.claim('run-b-w0')
+                time.sleep(0.05)
+        assert stolen == [], stolen
+        assert heartbeat.renewals >= 3 and not heartbeat.lost
+        assert first.complete('doc1', 'run-a-w0', {"keywords": []})
+        assert second.get('doc1').state == DONE and second.get('doc1').attempts == 1
+        first.close()
+        second.close()
+
+
+def test_expired_lease_is_reclaimed_without_heartbeat():
+    with tempfile.TemporaryDirectory() as directory:
+        first, second = open_pair(directory, lease_seconds=0.2)
+        first.enqueue('doc1', '본문')
+        first.claim('run-a-w0')
+        time.sleep(0.3)
+        assert [job.job_id for job in second.claim('run-b-w0')] == ['doc1']
+        # 임대를 잃은 워커는 완료로 덮어쓰지 못함
+        assert not first.complete('doc1', 'run-a-w0', {"keywords": []})
+        assert first.get('doc1').state == INFLIGHT
+        first.close()
+        second.close()
+
+
+def test_requeue_orphans_keeps_live_leases():
+    with tempfile.TemporaryDirectory() as directory:
+        first, second = open_pair(directory, lease_seconds=0.3)
+        for doc_id in ('live', 'dead'):
+            first.enqueue(doc_id, doc_id)
+        first.claim('run-a-w0', limit=2)
+        first.renew('live', 'run-a-w0')
+        assert second.requeue_orphans() == 0
+        time.sleep(0.35)
+        first.renew('live', 'run-a-w0')
+        assert second.requeue_orphans() == 1
+        assert second.get('dead').state == QUEUED and second.get('live').state == INFLIGHT
+        first.close()
+        second.close()
+
+
+def test_resume_reuses_done_results():
+    with tempfile.TemporaryDirectory() as directory:
+        queue, _ = open_pair(directory, lease_seconds=60)
+        queue.enqueue('doc1', '본문1')
+        queue.enqueue('doc2', '본문2')
+        for job in queue.claim('run-a-w0', limit=2):
+            queue.complete(job.job_id, 'run-a-w0', {"summary": job.payload['text']})
+        queue.close()
+
+        resumed = LLMJobQueue(os.path.join(directory, 'jobs.sqlite3'))
+        assert resumed.enqueue('doc1', '본문1') == DONE
+        assert resumed.get('doc1').result == {"summary": '본문1'}
+        # 본문이 바뀐 작업만 다시 처리
+        assert resumed.enqueue('doc2', '수정된 본문2') == QUEUED and resumed.get('doc2').result is None
+        assert [job.job_id for job in resumed.claim('run-b-w0', limit=5)] == ['doc2']
+        resumed.close()
+
+
+def test_fail_and_release():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'jobs.sqlite3')
+        queue = LLMJobQueue(path, lease_seconds=60, max_attempts=2)
+        queue.enqueue('doc1', '본문')
+        queue.claim('w')
+        assert queue.fail('doc1', 'w', '오류') == QUEUED
+        queue.claim('w')
+        # 반납은 시도 횟수에 넣지 않고, 지연 동안 다시 임대되지 않음
+        assert queue.release('doc1', 'w', delay=0.3)
+        assert queue.claim('w') == []
+        time.sleep(0.35)
+        assert queue.claim('w')[0].attempts == 2
+        assert queue.fail('doc1', 'w', '오류') == FAILED
+        assert queue.pending() == 0
+        queue.close()
+
+
+TESTS = [
+    test_heartbeat_prevents_duplicate_claim,
+    test_expired_lease_is_reclaimed_without_heartbeat,
+    test_requeue_orphans_keeps_live_leases,
+    test_resume_reuses_done_results,
+    test_fail_and_release,
+]
+
+
+def main():
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+    print(f"=== {len(TESTS) - failed}/{len(TESTS)} 통과 ===")
+    return failed == 0
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+llm_json_parser.py
+- LLM 응답에서 JSON을 관대하게 복구하는 파서
+- ```json 코드 펜스 제거, 앞뒤 설명 문장 무시, 가장 바깥 JSON 객체/배열 탐색
+- 응답이 잘린 경우(열린 문자열/괄호, 끝의 쉼표) 복구
+- keywords/summary/entities 스키마 검증 및 정규화
+- 스트리밍 응답용 증분 파서: 최상위 필드 값이 닫히는 즉시 반환 (다음 쉼표를 기다리지 않음)
+"""
+
+import re
+import json
+from typing import Dict, Any, List, Optional, Tuple
+
+FENCE_PATTERN = re.compile(r'```(?:json|JSON)?\s*\n?(.*?)(?:```|$)', re.DOTALL)
+
+EXTRACTION_FIELDS = ('keywords', 'summary', 'entities')
+
+# LLM이 한글 필드명으로 답하는 경우
+FIELD_ALIASES = {
+    'keywords': ('keywords', 'keyword', '키워드', '핵심 키워드', '핵심키워드'),
+    'summary': ('summary', '요약'),
+    'entities': ('entities', 'entity', 'people', 'persons', '인물', '관련 인물', '관련인물'),
+}
+
+CLOSERS = {'{': '}', '[': ']'}
+
+
+class LLMResponseParseError(ValueError):
+    """응답에서 JSON을 복구할 수 없음"""
+
+
+class ParseResult:
+    """파싱 결과. status: clean(그대로 파싱) / recovered(복구 후 파싱)"""
+
+    def __init__(self, value: Any, status: str, repairs: List[str]):
+        self.value = value
+        self.status = status
+        self.repairs = repairs
+
+    @property
+    def recovered(self) -> bool:
+        return self.status == 'recovered'
+
+
+def strip_code_fences(text: str) -> Tuple[str, bool]:
+    """```json ... ``` 펜스 안쪽만 반환"""
+    match = FENCE_PATTERN.search(text)
+    if match and match.group(1).strip():
+        return match.group(1), True
+    return text, False
+
+
+def _scan(text: str, start: int) -> Tuple[Optional[int], List[str], bool, List[Tuple[int, List[str]]]]:
+    """
+    start 위치의 여는 괄호부터 문자열/이스케이프를 고려해 스캔
+
+    Returns:
+        (닫는 괄호 위치 또는 None, 끝난 시점의 괄호 스택, 문자열 내부 여부, 안전 절단 지점 목록)
+    """
+    stack: List[str] = []
+    in_string = False
+    escape = False
+    safe_points: List[Tuple[int, List[str]]] = []
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in CLOSERS:
+            stack.append(ch)
+        elif ch in '}]':
+            if stack:
+                stack.pop()
+            if not stack:
+                return i, stack, False, safe_points
+        elif ch == ',':
+            # 쉼표 직전까지는 완성된 값들로만 구성됨
+            safe_points.append((i, list(stack)))
+    return None, stack, in_string, safe_points
+
+
+def _close(fragment: str, stack: List[str]) -> str:
+    return fragment + ''.join(CLOSERS[opener] for opener in reversed(stack))
+
+
+def _repair_truncated(text: str, start: int, stack: List[str], in_string: bool,
+                      safe_points: List[Tuple[int, List[str]]]) -> Optional[Tuple[Any, str]]:
+    """잘린 JSON을 닫아서 파싱 시도. 성공하면 (값, 복구 방식)"""
+    # 배열 안에서 잘린 문자열(예: 인물명 일부)은 버리고, 객체 값(예: 요약)은 닫아서 살림
+    if not (in_string and stack and stack[-1] == '['):
+        fragment = text[start:]
+        if in_string:
+            fragment += '"'
+        fragment = fragment.rstrip()
+        while fragment and fragment[-1] in ',:':
+            fragment = fragment[:-1].rstrip()
+        try:
+            return json.loads(_close(fragment, stack)), 'close_truncated'
+        except json.JSONDecodeError:
+            pass
+
+    # 마지막으로 완성된 값 뒤에서 잘라내고 닫기
+    for cut, cut_stack in reversed(safe_points[-50:]):
+        try:
+            return json.loads(_close(text[start:cut], cut_stack)), 'cut_incomplete_tail'
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+# expect 별로 허용하는 JSON 값 형식 (문자열·숫자·null 같은 스칼라는 어느 쪽에도 맞지 않음)
+EXPECTED_TYPES = {'object': dict, 'array': list}
+
+
+def parse_llm_json(text: str, expect: Optional[str] = None) -> ParseResult:
+    """
+    LLM 응답 텍스트에서 JSON 값 복구
+
+    Args:
+        text (str): LLM 응답 원문
+        expect (Optional[str]): 'object' 또는 'array' (None이면 먼저 나오는 쪽)
+
+    Returns:
+        ParseResult: 파싱 결과
+
+    Raises:
+        LLMResponseParseError: 복구 불가, 또는 올바른 JSON이지만 expect 와 형식이 다름
+            (안쪽 괄호를 찾아 엉뚱한 값을 복구하지 않도록 재요청에 맡김)
+    """
+    if text is None:
+        raise LLMResponseParseError("빈 응답")
+    stripped = text.strip()
+    try:
+        value = json.loads(stripped)
+    except json.JSONDecodeError:
+        pass
+    else:
+        if expect is None or isinstance(value, EXPECTED_TYPES[expect]):
+            return ParseResult(value, 'clean', [])
+        if expect == 'object' and isinstance(value, list) and len(value) == 1 and isinstance(value[0], dict):
+            return ParseResult(value[0], 'recovered', ['unwrap_array'])
+        raise LLMResponseParseError(f"JSON 형식 불일치: {expect} 기대, {type(value).__name__} 응답")
+
+    repairs: List[str] = []
+    body, fenced = strip_code_fences(stripped)
+    if fenced:
+        repairs.append('strip_fences')
+
+    openers = {'object': '{', 'array': '['}.get(expect, '{[')
+    positions = [body.find(ch) for ch in openers if body.find(ch) >= 0]
+    if not positions:
+        raise LLMResponseParseError(f"JSON 시작 괄호 없음: {stripped[:80]}")
+    start = min(positions)
+    if start > 0 and body[:start].strip():
+        repairs.append('skip_leading_text')
+
+    end, stack, in_string, safe_points = _scan(body, start)
+    if end is not None:
+        if body[end + 1:].strip():
+            repairs.append('skip_trailing_text')
+        try:
+            return ParseResult(json.loads(body[start:end + 1]), 'recovered', repairs)
+        except json.JSONDecodeError:
+            # 끝의 쉼표 등 사소한 문법 오류
+            cleaned = re.sub(r',\s*([}\]])', r'\1', body[start:end + 1])
+            try:
+                return ParseResult(json.loads(cleaned), 'recovered', repairs + ['trailing_comma'])
+            except json.JSONDecodeError as e:
+                raise LLMResponseParseError(f"JSON 구문 오류: {e}") from e
+
+    repaired = _repair_truncated(body, start, stack, in_string, safe_points)
+    if repaired is None:
+        raise LLMResponseParseError(f"잘린 JSON 복구 실패: {body[start:start + 80]}")
+    value, how = repaired
+    return ParseResult(value, 'recovered', repairs + [how])
+
+
+def _as_str_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [part.strip() for part in re.split(r'[,\n]', value) if part.strip()]
+    if isinstance(value, list):
+        items = []
+        for item in value:
+            if isinstance(item, dict):
+                item = item.get('name') or item.get('이름') or next(iter(item.values()), '')
+            if item is not None and str(item).strip():
+                items.append(str(item).strip())
+        return items
+    return [str(value)]
+
+
+def normalize_field(name: str, value: Any) -> Optional[Tuple[str, Any]]:
+    """별칭 필드명을 표준 필드명으로 바꾸고 값을 정규화. 스키마 밖 필드는 None"""
+    for field in EXTRACTION_FIELDS:
+        if name in FIELD_ALIASES[field]:
+            if field == 'summary':
+                return field, ' '.join(str(s) for s in value) if isinstance(value, list) else str(value or '')
+            return field, _as_str_list(value)
+    return None
+
+
+def validate_extraction(value: Any) -> Dict[str, Any]:
+    """
+    keywords(list)/summary(str)/entities(list) 스키마 검증 및 정규화
+
+    Raises:
+        LLMResponseParseError: 필수 필드를 하나도 찾을 수 없음
+    """
+    if isinstance(value, list) and len(value) == 1 and isinstance(value[0], dict):
+        value = value[0]
+    if not isinstance(value, dict):
+        raise LLMResponseParseError(f"추출 결과가 객체가 아님: {type(value).__name__}")
+
+    found: Dict[str, Any] = {}
+    for field in EXTRACTION_FIELDS:
+        for alias in FIELD_ALIASES[field]:
+            if alias in value:
+                found[field] = value[alias]
+                break
+    if not found:
+        raise LLMResponseParseError(f"스키마 필드 없음: {list(value)[:5]}")
+
+    return {field: normalize_field(field, found.get(field))[1] for field in EXTRACTION_FIELDS}
+
+
+class IncrementalJSONParser:
+    """
+    스트리밍 토큰을 받아 최상위 JSON 객체의 필드가 완성되는 즉시 반환하는 증분 파서.
+    문자열/배열/객체 값은 닫는 따옴표·괄호에서, 숫자·true/false/null 은 다음 쉼표나 닫는 괄호에서 반환
+
+    사용 예:
+        parser = IncrementalJSONParser()
+        for chunk in stream:
+            for key, value in parser.feed(chunk):
+                ...
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self.fields: Dict[str, Any] = {}
+        self._pos = 0
+        self._started = False
+        self._done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key: Optional[str] = None
+        self._key_start: Optional[int] = None
+        self._value_start: Optional[int] = None
+
+    @property
+    def done(self) -> bool:
+        """최상위 객체가 닫혔는지 여부"""
+        return self._done
+
+    def _emit(self, end: int, completed: List[Tuple[str, Any]]):
+        if self._key is None or self._value_start is None:
+            return
+        raw = self.buffer[self._value_start:end].strip()
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            return
+        self.fields[self._key] = value
+        completed.append((self._key, value))
+        self._key = None
+        self._value_start = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        청크 추가
+
+        Returns:
+            List[Tuple[str, Any]]: 이번 청크로 새로 완성된 (필드명, 값) 목록
+        """
+        completed: List[Tuple[str, Any]] = []
+        self.buffer += chunk
+        text = self.buffer
+        i = self._pos
+        while i < len(text) and not self._done:
+            ch = text[i]
+            if not self._started:
+                if ch == '{':
+                    self._started = True
+                    self._depth = 1
+                i += 1
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._key_start is not None:
+                        self._key = json.loads(text[self._key_start:i + 1])
+                        self._key_start = None
+                    elif self._depth == 1 and self._value_start is not None:
+                        # 최상위 문자열 값이 닫힘
+                        self._emit(i + 1, completed)
+                i += 1
+                continue
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._key is None and self._value_start is None:
+                    self._key_start = i
+            elif ch == ':' and self._depth == 1 and self._key is not None and self._value_start is None:
+                self._value_start = i + 1
+            elif ch in '{[':
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit(i, completed)
+                    self._done = True
+                elif self._depth == 1:
+                    # 최상위 배열/객체 값이 닫힘
+                    self._emit(i + 1, completed)
+            elif ch == ',' and self._depth == 1:
+                self._emit(i, completed)
+            i += 1
+        self._pos = i
+        return completed
+
+
+def completeness_score(value: Dict[str, Any], min_summary_chars: int = 30,
+                       min_keywords: int = 3) -> Tuple[float, List[str]]:
+    """
+    추출 결과 완성도 점수 (0~1)와 감점 사유.
+    keywords 0.4, summary 0.4, entities 0.2 비중 (인물이 없는 문서도 있으므로 빈 목록은 절반만 감점)
+    """
+    reasons: List[str] = []
+    keywords = value.get('keywords') or []
+    summary = value.get('summary') or ''
+    entities = value.get('entities') or []
+    if not isinstance(keywords, list) or not isinstance(summary, str) or not isinstance(entities, list):
+        return 0.0, ['schema_violation']
+
+    score = 0.4 * min(len(keywords) / min_keywords, 1.0)
+    if len(keywords) < min_keywords:
+        reasons.append('few_keywords' if keywords else 'empty_keywords')
+    score += 0.4 * min(len(summary.strip()) / min_summary_chars, 1.0)
+    if len(summary.strip()) < min_summary_chars:
+        reasons.append('short_summary' if summary.strip() else 'empty_summary')
+    if entities:
+        score += 0.2
+    else:
+        score += 0.1
+        reasons.append('empty_entities')
+    return round(score, 3), reasons
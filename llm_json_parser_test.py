@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+llm_json_parser_test.py
+- 관대한 JSON 파서(parse_llm_json), 스키마 검증, 스트리밍 증분 파서 테스트
+- 외부 서비스 없이 실행
+
+사용법:
+    python llm_json_parser_test.py
+"""
+
+import sys
+
+from llm_json_parser import IncrementalJSONParser, LLMResponseParseError, parse_llm_json, validate_extraction
+
+
+def test_clean_json():
+    parsed = parse_llm_json('{"keywords": ["A"], "summary": "요약", "entities": []}', expect='object')
+    assert parsed.status == 'clean' and parsed.value['keywords'] == ['A']
+
+
+def test_fenced_and_wrapped():
+    text = '결과는 다음과 같습니다.\n```json\n{"keywords": ["계약"], "summary": "요약"}\n```\n감사합니다.'
+    parsed = parse_llm_json(text, expect='object')
+    assert parsed.recovered and 'strip_fences' in parsed.repairs
+    assert parsed.value == {"keywords": ["계약"], "summary": "요약"}
+
+
+def test_truncated_object():
+    parsed = parse_llm_json('{"keywords": ["A", "B"], "summary": "잘린 요약', expect='object')
+    assert parsed.recovered and parsed.value['summary'] == '잘린 요약'
+
+
+def test_truncated_array_drops_partial_item():
+    parsed = parse_llm_json('{"keywords": ["A", "B"], "entities": ["나실장", "노팀', expect='object')
+    assert parsed.value['entities'] == ['나실장']
+
+
+def test_wrong_type_is_not_recovered_from_inner_bracket():
+    # 올바른 객체 응답인데 배열을 기대하면 안쪽 keywords 목록을 배열로 복구하지 않아야 함
+    try:
+        parse_llm_json('{"keywords": ["A", "B"], "summary": "요약"}', expect='array')
+    except LLMResponseParseError:
+        pass
+    else:
+        raise AssertionError("형식이 다른 올바른 JSON을 복구함")
+
+
+def test_scalar_is_rejected_for_both_expects():
+    for text in ['"hi"', '42', 'null', 'true']:
+        for expect in ('object', 'array'):
+            try:
+                parsed = parse_llm_json(text, expect=expect)
+            except LLMResponseParseError:
+                continue
+            raise AssertionError(f"{expect} 기대에 스칼라 {text} 를 {parsed.status} 로 반환")
+    assert parse_llm_json('[]', expect='array').value == []
+
+
+def test_single_item_array_unwrapped_for_object():
+    parsed = parse_llm_json('[{"keywords": ["A"], "summary": "요약"}]', expect='object')
+    assert parsed.value == {"keywords": ["A"], "summary": "요약"} and parsed.repairs == ['unwrap_array']
+
+
+def test_validate_aliases():
+    value = validate_extraction({"키워드": "A, B", "요약": ["문장1", "문장2"], "인물": [{"name": "서대리"}]})
+    assert value == {"keywords": ["A", "B"], "summary": "문장1 문장2", "entities": ["서대리"]}
+
+
+def test_no_json():
+    try:
+        parse_llm_json('JSON이 없는 응답입니다')
+    except LLMResponseParseError:
+        return
+    raise AssertionError("JSON 없는 응답을 통과시킴")
+
+
+def test_incremental_emits_when_value_closes():
+    # 다음 쉼표나 닫는 괄호를 기다리지 않고 값이 닫히는 즉시 반환해야 함
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"keywords": ["A", "B"') == []
+    assert parser.feed(']') == [('keywords', ['A', 'B'])]
+    assert parser.feed(', "summary": "요약') == []
+    assert parser.feed('"') == [('summary', '요약')]
+    assert parser.feed(', "meta": {"n": 1}') == [('meta', {'n': 1})]
+    assert parser.feed(', "score": 0.5') == []
+    assert parser.feed('}') == [('score', 0.5)] and parser.done
+
+
+def test_incremental_char_by_char():
+    text = '설명 {"keywords": ["a,b", "}"], "summary": "따옴표 \\"포함\\"", "entities": []} 끝'
+    parser = IncrementalJSONParser()
+    fields = [field for ch in text for field in parser.feed(ch)]
+    assert fields == [('keywords', ['a,b', '}']), ('summary', '따옴표 "포함"'), ('entities', [])]
+
+
+TESTS = [
+    test_clean_json,
+    test_fenced_and_wrapped,
+    test_truncated_object,
+    test_truncated_array_drops_partial_item,
+    test_wrong_type_is_not_recovered_from_inner_bracket,
+    test_scalar_is_rejected_for_both_expects,
+    test_single_item_array_unwrapped_for_object,
+    test_validate_aliases,
+    test_no_json,
+    test_incremental_emits_when_value_closes,
+    test_incremental_char_by_char,
+]
+
+
+def main():
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+    print(f"=== {len(TESTS) - failed}/{len(TESTS)} 통과 ===")
+    return failed == 0
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+llm_replay.py
+- Gemini HTTP 트래픽 기록/재생 (회귀·성능 테스트용)
+- record: 실제 요청의 응답(상태 코드, 본문 또는 SSE 줄, 오류)과 지연을 JSONL에 기록
+- replay: 기록된 응답을 같은 요청(모델 + 엔드포인트 + 요청 본문 해시)에 결정적으로 돌려줌
+    · 본문이 완전히 같은 기록이 없으면 다른 문서의 응답을 돌려주지 않고 재생 실패(ReplayMissError)로 기록
+    · 같은 요청이 여러 번 기록되었으면 기록 순서대로, 다 쓰면 마지막 기록을 반복
+    · 지연 배율(0이면 즉시, 1이면 원래 지연)로 원래 타이밍 재현
+    · API 키 없이 재생: 기록된 키 라벨로 가짜 키 풀을 만들어 키별 분산/한도를 운영과 같게 재현
+- 프롬프트 원문은 저장하지 않음 (해시와 길이만)
+
+사용법:
+    GEMINI_TRAFFIC_MODE=record python notion_uploader_v2.py      # 기록
+    GEMINI_TRAFFIC_MODE=replay GEMINI_REPLAY_LATENCY_SCALE=1 python notion_uploader_v2.py
+    python llm_replay.py [llm_traffic.jsonl]                      # 기록 요약 출력
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+import logging
+from collections import defaultdict
+from typing import Dict, Any, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRAFFIC_PATH = 'llm_traffic.jsonl'
+
+OFF = 'off'
+RECORD = 'record'
+REPLAY = 'replay'
+
+REPLAY_KEY_LABEL = 'GEMINI_REPLAY_KEY'
+
+
+class ReplayMissError(Exception):
+    """재생할 기록이 없는 요청"""
+
+
+def request_key(kind: str, model: str, payload: Dict[str, Any]) -> str:
+    """요청 식별 해시 (종류 + 모델 + 요청 본문)"""
+    body = json.dumps({"kind": kind, "model": model, "payload": payload}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+class ReplayResponse:
+    """requests.Response 중 클라이언트가 쓰는 부분만 흉내 낸 재생 응답"""
+
+    def __init__(self, record: Dict[str, Any], latency_scale: float):
+        self.status_code = record['status']
+        self.headers = record.get('headers') or {}
+        self.text = record.get('body', '')
+        self._lines: List[List[Any]] = record.get('lines') or []
+        self._latency_scale = latency_scale
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+    def iter_lines(self) -> Iterator[bytes]:
+        started = time.perf_counter()
+        for offset, line in self._lines:
+            if self._latency_scale:
+                delay = offset * self._latency_scale - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            yield line.encode('utf-8')
+
+    def close(self):
+        pass
+
+
+class _RecordingStream:
+    """스트리밍 응답을 감싸 받은 줄과 도착 시각을 기록 (닫힐 때 한 번 저장)"""
+
+    def __init__(self, response, store: 'TrafficStore', record: Dict[str, Any], started: float):
+        self._response = response
+        self._store = store
+        self._record = record
+        self._started = started
+        self._saved = False
+        self.status_code = response.status_code
+        self.headers = response.headers
+
+    @property
+    def text(self) -> str:
+        return self._response.text
+
+    def iter_lines(self) -> Iterator[bytes]:
+        for raw_line in self._response.iter_lines():
+            line = raw_line.decode('utf-8') if raw_line else ''
+            self._record['lines'].append([round(time.perf_counter() - self._started, 4), line])
+            yield raw_line
+
+    def close(self):
+        self._response.close()
+        if not self._saved:
+            self._saved = True
+            self._record['latency'] = round(time.perf_counter() - self._started, 4)
+            self._store.append(self._record)
+
+
+class TrafficStore:
+    """기록/재생 저장소 (스레드 안전)"""
+
+    def __init__(self, mode: str, path: Optional[str] = None, latency_scale: float = 0.0):
+        """
+        Args:
+            mode (str): record / replay
+            path (Optional[str]): JSONL 경로 (기본: GEMINI_TRAFFIC_PATH 또는 llm_traffic.jsonl)
+            latency_scale (float): 재생 지연 배율 (0이면 지연 없이 즉시 응답)
+        """
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"지원하지 않는 트래픽 모드: {mode}")
+        self.mode = mode
+        self.path = path or os.getenv('GEMINI_TRAFFIC_PATH', DEFAULT_TRAFFIC_PATH)
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._records: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._cursor: Dict[str, int] = defaultdict(int)
+        self.stats = {'recorded': 0, 'replayed': 0, 'misses': 0}
+        if mode == REPLAY:
+            self._load()
+
+    @classmethod
+    def from_env(cls) -> Optional['TrafficStore']:
+        """GEMINI_TRAFFIC_MODE가 record/replay일 때만 생성"""
+        mode = os.getenv('GEMINI_TRAFFIC_MODE', OFF).lower()
+        if mode == OFF:
+            return None
+        return cls(mode, latency_scale=float(os.getenv('GEMINI_REPLAY_LATENCY_SCALE', 0)))
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"재생할 트래픽 기록 없음: {self.path}")
+        count = 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._records[record['key']].append(record)
+                count += 1
+        logger.info(f"트래픽 재생 준비: 기록 {count}건, 서로 다른 요청 {len(self._records)}건 ({self.path})")
+
+    def key_labels(self) -> List[str]:
+        """기록에 쓰인 키 라벨 (재생용 가짜 키 풀 구성, 라벨이 없는 기록뿐이면 하나)"""
+        labels = {record.get('key_label') for records in self._records.values() for record in records}
+        labels.discard(None)
+        return sorted(labels) or [REPLAY_KEY_LABEL]
+
+    def append(self, record: Dict[str, Any]):
+        with self._lock:
+            self.stats['recorded'] += 1
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def _new_record(self, kind: str, model: str, payload: Dict[str, Any], key: str,
+                    key_label: Optional[str]) -> Dict[str, Any]:
+        prompt = ''.join(part.get('text', '') for content in payload.get('contents', [])
+                         for part in content.get('parts', []))
+        return {"key": key, "key_label": key_label, "kind": kind, "model": model, "prompt_chars": len(prompt),
+                "status": None, "headers": {}, "body": '', "lines": [], "error": None, "latency": None,
+                "ts": time.time()}
+
+    def post(self, session, url: str, kind: str, model: str, payload: Dict[str, Any], timeout: float,
+             stream: bool = False, key_label: Optional[str] = None):
+        """
+        모드에 따라 기록하며 실제 요청을 보내거나 기록된 응답을 돌려줌
+
+        Args:
+            session: requests.Session (재생 모드에서는 쓰지 않음)
+            kind (str): generate / stream
+            key_label (Optional[str]): 요청에 쓴 키 라벨 (키 값은 저장하지 않음)
+        """
+        key = request_key(kind, model, payload)
+        if self.mode == REPLAY:
+            return self._replay(key, kind, model)
+
+        record = self._new_record(kind, model, payload, key, key_label)
+        started = time.perf_counter()
+        try:
+            response = session.post(url, json=payload, timeout=timeout, stream=stream)
+        except Exception as e:
+            record.update(error=f"{type(e).__name__}: {e}", latency=round(time.perf_counter() - started, 4))
+            self.append(record)
+            raise
+        record['status'] = response.status_code
+        retry_after = response.headers.get('Retry-After')
+        if retry_after:
+            record['headers'] = {'Retry-After': retry_after}
+        if stream and response.status_code == 200:
+            return _RecordingStream(response, self, record, started)
+        record.update(body=response.text, latency=round(time.perf_counter() - started, 4))
+        self.append(record)
+        return response
+
+    def _replay(self, key: str, kind: str, model: str) -> ReplayResponse:
+        with self._lock:
+            records = self._records.get(key)
+            if not records:
+                self.stats['misses'] += 1
+                logger.warning(f"재생 기록 없는 요청: {kind} / {model} / {key[:12]} (요청 본문이 기록 시점과 다름)")
+                raise ReplayMissError(f"재생 기록 없는 요청 {key[:12]}")
+            index = self._cursor[key]
+            self._cursor[key] = index + 1
+            record = records[min(index, len(records) - 1)]
+            self.stats['replayed'] += 1
+        if record.get('error'):
+            self._sleep(record.get('latency'))
+            raise ConnectionError(record['error'])
+        if not record.get('lines'):
+            self._sleep(record.get('latency'))
+        elif self.latency_scale:
+            # 스트림은 첫 줄 도착 시각까지만 미리 기다리고 나머지는 줄 단위로 재현
+            self._sleep(record['lines'][0][0])
+            record = dict(record, lines=[[offset - record['lines'][0][0], line] for offset, line in record['lines']])
+        return ReplayResponse(record, self.latency_scale)
+
+    def _sleep(self, latency: Optional[float]):
+        if self.latency_scale and latency:
+            time.sleep(latency * self.latency_scale)
+
+
+def summarize(path: str) -> Dict[str, Any]:
+    """기록 파일 요약: 종류/상태별 건수, 지연 백분위수"""
+    from llm_telemetry import percentile
+
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    by_status: Dict[str, int] = defaultdict(int)
+    for record in records:
+        by_status[f"{record['kind']}:{record['status'] if record['status'] is not None else 'error'}"] += 1
+    latencies = [record['latency'] for record in records if record.get('latency') is not None]
+    return {
+        "records": len(records),
+        "distinct_requests": len({record['key'] for record in records}),
+        "by_status": dict(by_status),
+        "latency_p50": percentile(latencies, 50) if latencies else None,
+        "latency_p99": percentile(latencies, 99) if latencies else None,
+    }
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else os.getenv('GEMINI_TRAFFIC_PATH', DEFAULT_TRAFFIC_PATH)
+    if not os.path.exists(path):
+        print(f"트래픽 기록 없음: {path}")
+        return False
+    print(json.dumps(summarize(path), ensure_ascii=False, indent=2))
+    return True
+
+
+if __name__ == '__main__':
+    main()
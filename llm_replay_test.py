@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+llm_replay_test.py
+- 트래픽 기록/재생(llm_replay.py) 검증: 가짜 Gemini 서버에 기록한 뒤 서버와 API 키 없이 재생
+- 실제 API 키/네트워크 없이 실행
+
+사용법:
+    python llm_replay_test.py
+"""
+
+import os
+import sys
+import tempfile
+
+from fake_gemini_server import FakeGeminiConfig, FakeGeminiServer
+from gemini_client import GeminiExtractionClient
+from gemini_key_pool import KEY_ENV_PATTERN, GeminiKeyPool
+from llm_replay import RECORD, REPLAY, TrafficStore
+from llm_telemetry import TelemetryLogger
+
+DOCUMENTS = {f"doc{i}": f"{i}차 회의록: 서대리는 파서 개발을, 나실장은 일정 {i + 3}건을 검토했다." for i in range(4)}
+
+
+def without_key_env():
+    """재생 테스트가 실행 환경의 실제 키를 쓰지 않도록 GEMINI_API_KEY_<n> 제거 (복원용 사본 반환)"""
+    removed = {name: value for name, value in os.environ.items() if KEY_ENV_PATTERN.match(name)}
+    for name in removed:
+        del os.environ[name]
+    return removed
+
+
+def record(path: str, keys: int = 1):
+    with FakeGeminiServer(FakeGeminiConfig(seed=7)) as server:
+        pool = GeminiKeyPool({f"GEMINI_API_KEY_{i + 1}": f"fake-key-{i + 1}" for i in range(keys)})
+        client = GeminiExtractionClient(key_pool=pool, base_url=server.base_url,
+                                        telemetry=TelemetryLogger(enabled=False),
+                                        traffic=TrafficStore(RECORD, path))
+        results = {doc_id: client.extract(text) for doc_id, text in DOCUMENTS.items()}
+        client.close()
+    return results
+
+
+def replay_client(path: str) -> GeminiExtractionClient:
+    # 서버는 이미 닫혔으므로 재생이 네트워크로 나가면 연결 오류가 남
+    return GeminiExtractionClient(base_url='http://127.0.0.1:9', telemetry=TelemetryLogger(enabled=False),
+                                  traffic=TrafficStore(REPLAY, path))
+
+
+def test_replay_without_keys_returns_recorded_results():
+    saved = without_key_env()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'traffic.jsonl')
+            recorded = record(path)
+            client = replay_client(path)
+            assert client.key_pool.labels == ['GEMINI_API_KEY_1'], client.key_pool.labels
+            replayed = {doc_id: client.extract(text) for doc_id, text in DOCUMENTS.items()}
+            client.close()
+    finally:
+        os.environ.update(saved)
+    assert replayed == recorded
+    assert client.traffic.stats['replayed'] == len(DOCUMENTS) and client.traffic.stats['misses'] == 0
+
+
+def test_digit_only_change_is_a_miss():
+    # 숫자만 다른 다른 문서의 응답을 돌려주지 않아야 함
+    saved = without_key_env()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'traffic.jsonl')
+            record(path)
+            client = replay_client(path)
+            try:
+                result = client.extract(DOCUMENTS['doc1'].replace('일정 4건', '일정 9건'))
+            except Exception:
+                result = None
+            client.close()
+    finally:
+        os.environ.update(saved)
+    assert result is None, result
+    assert client.traffic.stats['misses'] >= 1 and client.traffic.stats['replayed'] == 0, client.traffic.stats
+
+
+def test_batch_replay_through_key_pool():
+    # 운영과 같은 배치 경로(extract_batch)로 재생
+    saved = without_key_env()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'traffic.jsonl')
+            with FakeGeminiServer(FakeGeminiConfig(seed=8)) as server:
+                pool = GeminiKeyPool({"GEMINI_API_KEY_1": "fake-key-1"})
+                client = GeminiExtractionClient(key_pool=pool, base_url=server.base_url,
+                                                telemetry=TelemetryLogger(enabled=False),
+                                                traffic=TrafficStore(RECORD, path))
+                recorded = client.extract_batch(DOCUMENTS, token_budget=4000)
+                client.close()
+            client = replay_client(path)
+            replayed = client.extract_batch(DOCUMENTS, token_budget=4000)
+            client.close()
+    finally:
+        os.environ.update(saved)
+    assert replayed == recorded and client.traffic.stats['misses'] == 0
+
+
+TESTS = [
+    test_replay_without_keys_returns_recorded_results,
+    test_digit_only_change_is_a_miss,
+    test_batch_replay_through_key_pool,
+]
+
+
+def main():
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+    print(f"=== {len(TESTS) - failed}/{len(TESTS)} 통과 ===")
+    return failed == 0
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+llm_telemetry.py
+- LLM 호출별 실측 지표 기록: 지연 시간, 입력/출력 토큰, 사용 키, 캐시 적중, 시뮬레이션 폴백 여부
+- 추가 전용(append-only) JSONL 지표 로그에 기록
+- 백엔드별/일자별 p50/p95/p99 지연과 비용 요약 출력
+
+사용법:
+    python llm_telemetry.py [llm_metrics.jsonl] [--by backend|model|tier]
+"""
+
+import os
+import sys
+import json
+import math
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_METRICS_PATH = 'llm_metrics.jsonl'
+
+# 모델별 100만 토큰당 비용 (USD, 입력/출력). LLM_COST_TABLE 환경 변수(JSON)로 덮어쓰기 가능
+DEFAULT_COST_PER_MILLION: Dict[str, Tuple[float, float]] = {
+    'gemini-pro': (0.50, 1.50),
+    'gemini-1.0-pro': (0.50, 1.50),
+    'gemini-1.5-flash': (0.075, 0.30),
+    'gemini-1.5-pro': (1.25, 5.00),
+}
+
+
+def load_cost_table() -> Dict[str, Tuple[float, float]]:
+    table = dict(DEFAULT_COST_PER_MILLION)
+    override = os.getenv('LLM_COST_TABLE')
+    if override:
+        try:
+            table.update({model: tuple(costs) for model, costs in json.loads(override).items()})
+        except Exception as e:
+            logger.warning(f"LLM_COST_TABLE 파싱 실패, 기본 단가 사용: {e}")
+    return table
+
+
+def estimate_cost(model: Optional[str], input_tokens: int, output_tokens: int,
+                  cost_table: Optional[Dict[str, Tuple[float, float]]] = None) -> float:
+    """토큰 수로 비용(USD) 계산. 단가표에 없는 모델(로컬/시뮬레이션)은 0"""
+    table = cost_table if cost_table is not None else DEFAULT_COST_PER_MILLION
+    input_cost, output_cost = table.get(model or '', (0.0, 0.0))
+    return (input_tokens * input_cost + output_tokens * output_cost) / 1_000_000
+
+
+class TelemetryLogger:
+    """LLM 호출 지표를 JSONL 파일에 추가 기록 (스레드 안전)"""
+
+    def __init__(self, path: Optional[str] = None, enabled: bool = True):
+        self.path = path or os.getenv('LLM_METRICS_PATH', DEFAULT_METRICS_PATH)
+        self.enabled = enabled
+        self.cost_table = load_cost_table()
+        self._lock = threading.Lock()
+
+    def record(self, backend: str, model: Optional[str], latency: float, input_tokens: int = 0,
+               output_tokens: int = 0, key_label: Optional[str] = None, cache_hit: bool = False,
+               fallback: bool = False, ok: bool = True, error: Optional[str] = None,
+               **extra) -> Dict[str, Any]:
+        """
+        호출 한 건 기록
+
+        Args:
+            backend (str): gemini / notebooklm / hybrid / simulation 등
+            model (Optional[str]): 모델명
+            latency (float): 실측 지연 시간(초)
+            input_tokens (int): 입력 토큰
+            output_tokens (int): 출력 토큰
+            key_label (Optional[str]): 사용한 API 키 라벨
+            cache_hit (bool): 캐시 적중 여부
+            fallback (bool): 시뮬레이션 폴백 여부
+            ok (bool): 성공 여부
+            error (Optional[str]): 오류 요약
+
+        Returns:
+            Dict[str, Any]: 기록된 레코드
+        """
+        now = datetime.now()
+        entry = {
+            "ts": now.isoformat(),
+            "day": now.strftime('%Y-%m-%d'),
+            "backend": backend,
+            "model": model,
+            "key": key_label,
+            "latency": round(latency, 4),
+            "input_tokens": int(input_tokens),
+            "output_tokens": int(output_tokens),
+            "cost_usd": round(estimate_cost(model, input_tokens, output_tokens, self.cost_table), 8),
+            "cache_hit": cache_hit,
+            "fallback": fallback,
+            "ok": ok,
+        }
+        if error:
+            entry["error"] = error[:200]
+        entry.update(extra)
+        if self.enabled:
+            line = json.dumps(entry, ensure_ascii=False)
+            with self._lock:
+                try:
+                    with open(self.path, 'a', encoding='utf-8') as f:
+                        f.write(line + '\n')
+                except OSError as e:
+                    logger.warning(f"LLM 지표 기록 실패: {e}")
+        return entry
+
+
+def load_records(path: str) -> List[Dict[str, Any]]:
+    """지표 로그 읽기 (깨진 줄은 건너뜀)"""
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """nearest-rank 백분위수"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(records: Iterable[Dict[str, Any]], by: str = 'backend') -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    백엔드별(또는 by 필드별)/일자별 요약
+
+    Args:
+        records (Iterable[Dict[str, Any]]): 지표 레코드
+        by (str): 묶을 필드 (backend / model / tier 등, 해당 필드가 없는 레코드는 제외)
+
+    Returns:
+        Dict[str, Dict[str, Dict[str, Any]]]: 그룹 → day → 요약 (day 'ALL'은 전체 기간)
+    """
+    groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for record in records:
+        if by != 'backend' and record.get(by) is None:
+            continue
+        backend = str(record.get(by, 'unknown'))
+        groups.setdefault((backend, record.get('day', '?')), []).append(record)
+        groups.setdefault((backend, 'ALL'), []).append(record)
+
+    summary: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for (backend, day), items in sorted(groups.items()):
+        latencies = [r.get('latency', 0.0) for r in items if r.get('ok', True)]
+        summary.setdefault(backend, {})[day] = {
+            "calls": len(items),
+            "errors": sum(1 for r in items if not r.get('ok', True)),
+            "cache_hits": sum(1 for r in items if r.get('cache_hit')),
+            "fallbacks": sum(1 for r in items if r.get('fallback')),
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "input_tokens": sum(r.get('input_tokens', 0) for r in items),
+            "output_tokens": sum(r.get('output_tokens', 0) for r in items),
+            "cost_usd": round(sum(r.get('cost_usd', 0.0) for r in items), 6),
+        }
+    return summary
+
+
+def print_summary(path: str = DEFAULT_METRICS_PATH, by: str = 'backend'):
+    """요약 표 출력"""
+    summary = summarize(load_records(path), by)
+    print("=" * 100)
+    print(f"LLM 호출 지표 요약: {path}")
+    print("=" * 100)
+    if not summary:
+        print("기록 없음")
+        return
+    fmt = lambda v: f"{v:.3f}s" if v is not None else '-'
+    width = max([12] + [len(group) + 2 for group in summary])
+    print(f"{by:<{width}}{'day':<12}{'calls':>7}{'err':>6}{'cache':>7}{'fallbk':>8}"
+          f"{'p50':>10}{'p95':>10}{'p99':>10}{'in_tok':>10}{'out_tok':>10}{'cost($)':>11}")
+    for backend, days in summary.items():
+        for day, s in days.items():
+            print(f"{backend:<{width}}{day:<12}{s['calls']:>7}{s['errors']:>6}{s['cache_hits']:>7}{s['fallbacks']:>8}"
+                  f"{fmt(s['p50']):>10}{fmt(s['p95']):>10}{fmt(s['p99']):>10}"
+                  f"{s['input_tokens']:>10}{s['output_tokens']:>10}{s['cost_usd']:>11.4f}")
+
+
+_default_telemetry: Optional[TelemetryLogger] = None
+_default_telemetry_lock = threading.Lock()
+
+
+def metrics_enabled(default: bool = False) -> bool:
+    """LLM_METRICS_ENABLED 값 (비어 있으면 default)"""
+    value = os.getenv('LLM_METRICS_ENABLED', '').strip()
+    return default if not value else value.lower() == 'true'
+
+
+def get_default_telemetry() -> TelemetryLogger:
+    """
+    프로세스 전역 지표 기록기. LLM_METRICS_ENABLED=True 일 때만 파일에 기록
+    (라우터·시뮬레이터·테스트 스크립트가 작업 디렉터리에 지표 파일을 만들지 않도록 기본은 끔.
+    notion_uploader_v2 는 값이 비어 있으면 켬)
+    """
+    global _default_telemetry
+    if _default_telemetry is None:
+        with _default_telemetry_lock:
+            if _default_telemetry is None:
+                _default_telemetry = TelemetryLogger(enabled=metrics_enabled())
+    return _default_telemetry
+
+
+def main():
+    args = sys.argv[1:]
+    by = 'backend'
+    if '--by' in args:
+        index = args.index('--by')
+        by = args[index + 1] if index + 1 < len(args) else by
+        del args[index:index + 2]
+    path = args[0] if args else os.getenv('LLM_METRICS_PATH', DEFAULT_METRICS_PATH)
+    print_summary(path, by)
+    return True
+
+
+if __name__ == '__main__':
+    main()
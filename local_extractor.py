@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+local_extractor.py
+- API 없이 CPU에서 바로 돌리는 경량 의미 추출기 (LLM 폴백 및 저비용 1차 추출용)
+- 키워드: RAKE 방식 구(phrase) 점수(차수/빈도) × IDF (코퍼스로 fit 하지 않으면 RAKE 점수만 사용)
+- 개체: 개체 사전(entity_gazetteer, Aho-Corasick) + 패턴(직함, 법인 표기, 프로젝트 표기, 영문 식별자)
+- 요약: 앞 문장(lead) 기반
+- 출력 형식은 Gemini 추출과 동일 (keywords, summary, entities)
+
+사용법:
+    python local_extractor.py [파일 ...]    # 파일(없으면 예시 문장) 추출 결과와 처리 속도 출력
+"""
+
+import re
+import sys
+import math
+import time
+import logging
+import threading
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from salience_prefilter import JOSA_PATTERN, split_sentences
+
+logger = logging.getLogger(__name__)
+
+PERSON = '인물'
+COMPANY = '기업'
+PROJECT = '프로젝트'
+
+MAX_KEYWORDS = 8
+MAX_SUMMARY_CHARS = 300
+
+WORD_PATTERN = re.compile(r'[가-힣]{2,}|[A-Za-z][A-Za-z0-9_]*(?:\.[A-Za-z0-9]+)?|\d+')
+# 구 경계: 쉼표·괄호·따옴표 등 문장 안 구두점
+PHRASE_BREAK_PATTERN = re.compile(r'[,;:()\[\]{}"\'“”‘’·/|]+')
+
+# 키워드 후보에서 제외하는 기능어 (조사 제거 후 기준)
+STOPWORDS = frozenset("""
+그리고 그러나 하지만 또는 또한 그래서 따라서 및 등 등의 이 그 저 것 수 때 중 더 위해 위한 대한 대해 통해 통한
+있다 있는 있음 없다 없는 한다 하는 하고 하여 해서 했다 한 할 된다 되는 되어 됐다 이다 입니다 합니다 했습니다
+담당한다 담당 경우 관련 이번 지난 오늘 내일 모든 각 여러 같은 다른 가장 매우 정도 이후 이전 부분 내용
+the a an and or of to in on for with by from at is are was were be been this that these those it as
+""".split())
+
+# 하다/되다 동사·서술격 어미 (예: 생성하여 → 생성, 시스템이다 → 시스템). 어미가 붙은 단어에서 구가 끝남
+VERB_ENDING_PATTERN = re.compile(
+    r'(하여|하고|하며|하는|하면|해서|하게|하기|한다|했다|하였다|합니다|했습니다|하|한|할|'
+    r'된다|됐다|되어|되는|되며|되고|된|될|이다|이며|이고|였다|입니다)$')
+
+LINKING_JOSA = frozenset(['의', '와', '과'])
+
+# 직함이 붙은 인물 (예: 조대표, 노 팀장님)
+TITLES = ('대표이사', '대표', '실장', '팀장', '대리', '과장', '부장', '차장', '이사', '사장', '회장',
+          '주임', '사원', '교수', '박사', '원장', '본부장', '센터장', '국장', '매니저', '위원')
+_TITLE_ALTERNATION = '|'.join(sorted(TITLES, key=len, reverse=True))
+# 붙여 쓴 이름+직함(조대표, 노팀장님) 또는 성 한 글자 뒤 띄어 쓴 직함(조 대표)
+PERSON_PATTERN = re.compile(
+    r'(?<![가-힣])(?:([가-힣]{1,3})|([가-힣]) )(' + _TITLE_ALTERNATION + r')(?:님)?'
+    r'(?=[^가-힣]|$|' + JOSA_PATTERN.pattern.rstrip('$') + r')')
+COMPANY_PATTERN = re.compile(
+    r'(?:\(주\)|㈜|주식회사)\s?([가-힣A-Za-z0-9]+)'
+    r'|([가-힣A-Za-z0-9]+)(?:\(주\)|㈜)'
+    r'|([A-Z][A-Za-z0-9&]*(?: [A-Z][A-Za-z0-9&]*)*) (?:Inc|Corp|Co|Ltd|LLC)\.?'
+    r'|([가-힣]{2,}(?:전자|그룹|은행|증권|건설|물산|제약|통신|캐피탈|홀딩스))')
+PROJECT_PATTERN = re.compile(
+    r'([A-Za-z가-힣][A-Za-z0-9가-힣_]*(?: [A-Za-z0-9가-힣_]+)?) 프로젝트'
+    r'|(?<![A-Za-z0-9])([A-Z][A-Z0-9]*_[A-Z0-9_]+)(?![A-Za-z0-9])')
+# 프로젝트 앞 단어로 오는 흔한 수식어는 이름으로 보지 않음
+PROJECT_MODIFIERS = frozenset(['이', '그', '본', '해당', '신규', '전체', '기존', '다음', '이번', '모든'])
+
+
+def strip_josa(word: str) -> str:
+    if len(word) > 2 and '가' <= word[0] <= '힣':
+        return JOSA_PATTERN.sub('', word)
+    return word
+
+
+def _words(text: str) -> List[str]:
+    return [split_phrase_word(w)[0] for w in WORD_PATTERN.findall(text)]
+
+
+def split_phrase_word(word: str) -> Tuple[str, bool]:
+    """
+    (조사/어미를 뗀 단어, 구가 여기서 끝나는지).
+    격조사(은/는/이/가/을/를/에서 등)나 서술어 어미가 붙으면 명사구가 끝난 것으로 보고,
+    연결 조사(의/와/과)는 구를 잇는다
+    """
+    if len(word) > 2 and '가' <= word[0] <= '힣':
+        stem = JOSA_PATTERN.sub('', word)
+        if stem != word:
+            return stem, word[len(stem):] not in LINKING_JOSA
+        stem = VERB_ENDING_PATTERN.sub('', word)
+        if stem != word and len(stem) >= 2:
+            return stem, True
+    return word, False
+
+
+class LocalExtractor:
+    """RAKE/TF-IDF 키워드 + 사전/패턴 개체 + 앞 문장 요약 (스레드 안전, fit 이후 읽기 전용)"""
+
+    def __init__(self, max_keywords: int = MAX_KEYWORDS, summary_sentences: int = 2,
+                 gazetteer=None):
+        """
+        Args:
+            max_keywords (int): 키워드 최대 개수
+            summary_sentences (int): 요약에 쓰는 앞 문장 수
+            gazetteer (Optional[EntityGazetteer]): 알려진 개체 사전 (entity_gazetteer)
+        """
+        self.max_keywords = max_keywords
+        self.summary_sentences = summary_sentences
+        self.gazetteer = gazetteer
+        self.idf: Dict[str, float] = {}
+        self._default_idf = 1.0
+
+    # ---------- 키워드 ----------
+
+    def fit(self, corpus: Iterable[str]) -> 'LocalExtractor':
+        """코퍼스 문서 빈도로 단어 IDF 계산 (선택)"""
+        df: Dict[str, int] = {}
+        n_docs = 0
+        for text in corpus:
+            n_docs += 1
+            for word in set(w.lower() for w in _words(text)):
+                df[word] = df.get(word, 0) + 1
+        self.idf = {word: math.log((1 + n_docs) / (1 + count)) + 1.0 for word, count in df.items()}
+        self._default_idf = math.log(1 + n_docs) + 1.0 if n_docs else 1.0
+        logger.info(f"로컬 추출기 IDF 학습: 문서 {n_docs}건, 어휘 {len(self.idf)}개")
+        return self
+
+    @staticmethod
+    def candidate_phrases(text: str) -> List[Tuple[str, ...]]:
+        """문장/구두점/기능어로 끊은 내용어 구 (최대 3단어)"""
+        phrases: List[Tuple[str, ...]] = []
+        for sentence in split_sentences(text):
+            for chunk in PHRASE_BREAK_PATTERN.split(sentence):
+                run: List[str] = []
+                for word in WORD_PATTERN.findall(chunk):
+                    word, ends = split_phrase_word(word)
+                    if word.lower() in STOPWORDS or word.isdigit() or len(word) < 2:
+                        ends = True
+                    else:
+                        run.append(word)
+                    if (ends or len(run) == 3) and run:
+                        phrases.append(tuple(run))
+                        run = []
+                if run:
+                    phrases.append(tuple(run))
+        return phrases
+
+    def keywords(self, text: str) -> List[str]:
+        """RAKE 단어 점수(차수/빈도) × IDF로 구 점수를 매겨 상위 키워드 반환"""
+        phrases = self.candidate_phrases(text)
+        if not phrases:
+            return []
+        freq: Dict[str, int] = {}
+        degree: Dict[str, int] = {}
+        for phrase in phrases:
+            for word in phrase:
+                key = word.lower()
+                freq[key] = freq.get(key, 0) + 1
+                degree[key] = degree.get(key, 0) + len(phrase)
+        word_score = {w: degree[w] / freq[w] * self.idf.get(w, self._default_idf) * math.log(1 + freq[w])
+                      for w in freq}
+
+        scores: Dict[str, float] = {}
+        first_seen: Dict[str, int] = {}
+        for position, phrase in enumerate(phrases):
+            keyword = ' '.join(phrase)
+            if keyword not in scores:
+                # 구가 길수록 점수 합이 커지므로 단어 수의 제곱근으로 나눔
+                scores[keyword] = sum(word_score[w.lower()] for w in phrase) / math.sqrt(len(phrase))
+                first_seen[keyword] = position
+        ranked = sorted(scores, key=lambda k: (-scores[k], first_seen[k]))
+
+        selected: List[str] = []
+        covered = set()
+        for keyword in ranked:
+            lowered = keyword.lower()
+            # 이미 고른 구에 포함된 단어 하나짜리 키워드는 생략
+            if ' ' not in keyword and lowered in covered:
+                continue
+            selected.append(keyword)
+            covered.update(lowered.split())
+            if len(selected) >= self.max_keywords:
+                break
+        return selected
+
+    # ---------- 개체 ----------
+
+    def entities_with_types(self, text: str) -> List[Dict[str, Any]]:
+        """사전 일치(신뢰도 0.95) + 패턴 일치(0.6~0.8) 개체. 이름 기준 중복 제거, 등장 순"""
+        found: Dict[str, Dict[str, Any]] = {}
+
+        def add(name: str, kind: str, confidence: float, start: int):
+            name = name.strip()
+            if len(name) < 2:
+                return
+            if name not in found or found[name]['confidence'] < confidence:
+                found[name] = {"name": name, "type": kind, "confidence": confidence,
+                               "offset": min(start, found.get(name, {}).get('offset', start))}
+
+        if self.gazetteer is not None:
+            for entity in self.gazetteer.find(text):
+                add(entity['name'], entity['type'], entity['confidence'], entity['offset'])
+        for match in PERSON_PATTERN.finditer(text):
+            surname = match.group(1) or match.group(2)
+            title = match.group(3)
+            # 조대표님/조 대표 → 조대표 로 표기 통일 (사전에 있는 별칭이면 대표 이름으로)
+            name = surname + title
+            if self.gazetteer is not None:
+                name = self.gazetteer.resolve(name) or name
+            add(name, PERSON, 0.8, match.start())
+        for match in COMPANY_PATTERN.finditer(text):
+            add(strip_josa(next(g for g in match.groups() if g)), COMPANY, 0.7, match.start())
+        for match in PROJECT_PATTERN.finditer(text):
+            name = match.group(1) or match.group(2)
+            words = name.split()
+            if words and words[0] in PROJECT_MODIFIERS:
+                name = ' '.join(words[1:])
+            add(strip_josa(name) if ' ' not in name else name, PROJECT, 0.6, match.start())
+        return sorted(found.values(), key=lambda e: e['offset'])
+
+    def entities(self, text: str) -> List[str]:
+        return [entity['name'] for entity in self.entities_with_types(text)]
+
+    # ---------- 요약 ----------
+
+    def summary(self, text: str) -> str:
+        sentences = split_sentences(text)
+        summary = ' '.join(sentences[:self.summary_sentences]) if sentences else text.strip()
+        if len(summary) > MAX_SUMMARY_CHARS:
+            summary = summary[:MAX_SUMMARY_CHARS].rstrip() + '...'
+        return summary
+
+    def extract(self, text: str) -> Dict[str, Any]:
+        """Gemini 추출과 같은 형식의 결과"""
+        return {
+            'keywords': self.keywords(text),
+            'summary': self.summary(text),
+            'entities': self.entities(text),
+        }
+
+
+_DEFAULT_EXTRACTOR: Optional[LocalExtractor] = None
+_DEFAULT_EXTRACTOR_LOCK = threading.Lock()
+
+
+def get_default_extractor() -> LocalExtractor:
+    """프로세스 공용 로컬 추출기 (공용 개체 사전 사용, 최초 호출 시 생성)"""
+    global _DEFAULT_EXTRACTOR
+    if _DEFAULT_EXTRACTOR is None:
+        from entity_gazetteer import get_default_gazetteer
+        gazetteer = get_default_gazetteer()
+        with _DEFAULT_EXTRACTOR_LOCK:
+            if _DEFAULT_EXTRACTOR is None:
+                _DEFAULT_EXTRACTOR = LocalExtractor(gazetteer=gazetteer)
+    return _DEFAULT_EXTRACTOR
+
+
+def main():
+    extractor = get_default_extractor()
+    if len(sys.argv) > 1:
+        texts = []
+        for path in sys.argv[1:]:
+            with open(path, 'r', encoding='utf-8') as f:
+                texts.append(f.read())
+    else:
+        texts = [(
+            "GIA_INFOSYS 프로젝트는 DOCX, PPTX, PDF 문서에서 텍스트를 추출하고, 핵심 키워드와 요약을 생성하여 "
+            "Notion 데이터베이스에 저장하는 시스템이다. 나실장은 기획, 노팀장은 기술자문, 서대리는 개발을 담당한다. "
+            "조대표님은 (주)지아인포시스와 삼성전자 협업 일정을 검토했다."
+        )]
+    for text in texts:
+        print(extractor.extract(text))
+
+    started = time.perf_counter()
+    rounds = max(1, 2000 // len(texts))
+    for _ in range(rounds):
+        for text in texts:
+            extractor.extract(text)
+    elapsed = time.perf_counter() - started
+    print(f"처리 속도: {rounds * len(texts) / elapsed:,.0f}건/초 (문서 {rounds * len(texts)}건, {elapsed:.2f}초)")
+    return True
+
+
+if __name__ == '__main__':
+    main()
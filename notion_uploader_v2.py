@@ -3,14 +3,28 @@
 """
 notion_uploader_v2.py
 - 문서 파싱(document_parser_test or simulation) → LLM 의미 추출 → Notion 업로드까지 통합 실행
-- 실제 라이브러리/키가 없으면 안전하게 시뮬레이션으로 동작
+- 실제 라이브러리/키가 없으면 안전하게 시뮬레이션으로 동작 (의미 추출은 로컬 경량 추출기로 대체)
+- (선택) SQLite 작업 큐에 추출 요청을 기록하여 중단 후 재실행 시 완료된 호출을 반복하지 않음
+- (선택) 실행 토큰 예산(GEMINI_RUN_TOKEN_BUDGET)을 넘기기 전에 조기 중단하고 미처리 문서와 사용량 보고
 """
 
 import os
 import sys
-from typing import Dict, Any, Optional
+import time
+import threading
+from typing import Dict, Any, Callable, List, Optional
 from datetime import datetime
 
+from circuit_breaker import CircuitOpenError
+from entity_gazetteer import get_default_gazetteer
+from gemini_client import GeminiExtractionClient
+from llm_job_queue import QUEUED, LLMJobQueue
+from llm_telemetry import get_default_telemetry, metrics_enabled
+from local_extractor import get_default_extractor
+from prompt_templates import BATCH_EXTRACTION
+from semantic_cache import SemanticCache
+from token_budget import TokenBudgetExceeded, estimate_tokens
+
 # 로깅
 import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -29,11 +43,60 @@ except Exception as e:
 NOTION_TOKEN = os.getenv('NOTION_TOKEN')
 NOTION_DATABASE_ID = os.getenv('NOTION_DATABASE_ID')
 
-GEMINI_KEY = os.getenv('GEMINI_API_KEY_1') or os.getenv('GEMINI_API_KEY_2')
 MODEL = os.getenv('GEMINI_MODEL', 'gemini-pro')
 
+# 짧은 문서 배치 추출: 배치당 프롬프트 토큰 예산(0이면 비활성), 배치 대상 문서 최대 토큰
+BATCH_TOKEN_BUDGET = int(os.getenv('GEMINI_BATCH_TOKEN_BUDGET', 0))
+BATCH_MAX_DOC_TOKENS = int(os.getenv('GEMINI_BATCH_MAX_DOC_TOKENS', 1500))
+
+# 핵심 문장 전처리: 문서당 프롬프트 토큰 예산(0이면 비활성), 키워드 일치도 평가 표본 수
+PREFILTER_TOKENS = int(os.getenv('GEMINI_PREFILTER_TOKENS', 0))
+PREFILTER_EVAL_SAMPLE = int(os.getenv('GEMINI_PREFILTER_EVAL_SAMPLE', 0))
+
+# 스트리밍 추출: 필드가 완성되는 즉시 그래프 단계로 전달하고 필수 필드 수신 후 생성 중단
+STREAMING = os.getenv('GEMINI_STREAMING', 'False').lower() == 'true'
+
+# 서킷 차단 시 처리: defer(재시도 큐로 미룬 뒤 나머지 먼저 처리) / local(즉시 로컬 추출로 대체)
+OPEN_CIRCUIT_POLICY = os.getenv('GEMINI_OPEN_CIRCUIT_POLICY', 'defer').lower()
+# 재시도 큐 처리 전 서킷 복구를 기다리는 최대 시간(초)
+RETRY_QUEUE_MAX_WAIT = float(os.getenv('GEMINI_RETRY_QUEUE_MAX_WAIT', 60))
+
+# 내구성 작업 큐: 워커 수, 배치 모드에서 워커가 한 번에 가져갈 작업 수
+JOB_QUEUE_ENABLED = os.getenv('LLM_JOB_QUEUE_ENABLED', 'False').lower() == 'true'
+JOB_WORKERS = int(os.getenv('LLM_JOB_WORKERS', 4))
+JOB_CLAIM_SIZE = int(os.getenv('LLM_JOB_CLAIM_SIZE', 10))
+
 TEST_FILES_DIR = os.getenv('TEST_FILES_DIR', './test_files')
 
+# 공용 객체는 처음 쓸 때 생성 (모듈을 import 하는 것만으로 Notion 조회·파일 생성이 일어나지 않도록)
+# - LLM 호출 지표: get_default_telemetry() (LLM_METRICS_PATH)
+# - 개체 사전: get_default_gazetteer() (People_Network / Knowledge_Graph / Projects_Master 이름, Aho-Corasick 검색)
+# - 로컬 경량 추출기: get_default_extractor() (API 장애/키 미설정 시 RAKE/TF-IDF 키워드, 사전/패턴 개체, 앞 문장 요약)
+_client: Optional[GeminiExtractionClient] = None
+_cache: Optional[SemanticCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_client() -> GeminiExtractionClient:
+    """GEMINI_API_KEY_1, GEMINI_API_KEY_2, ... 모든 키를 풀로 쓰는 장기 실행 클라이언트 (키별 모델 핸들/HTTP 세션 재사용)"""
+    global _client
+    if _client is None:
+        with _shared_lock:
+            if _client is None:
+                # 키 풀은 클라이언트가 환경 변수에서 생성 (재생 모드면 키 없이 기록된 키 라벨로 구성)
+                _client = GeminiExtractionClient(model=MODEL, telemetry=get_default_telemetry())
+    return _client
+
+
+def get_cache() -> SemanticCache:
+    """수정본 등 거의 같은 문서의 추출 결과 재사용 (SEMANTIC_CACHE_ENABLED, 기본 비활성)"""
+    global _cache
+    if _cache is None:
+        with _shared_lock:
+            if _cache is None:
+                _cache = SemanticCache.from_env(telemetry=get_default_telemetry())
+    return _cache
+
 
 # ---------- 파싱 ----------
 
@@ -73,32 +136,243 @@ def parse_text_from_file(file_path: str) -> Optional[str]:
 
 # ---------- LLM 의미 추출 ----------
 
-def extract_semantics(text: str) -> Dict[str, Any]:
-    """Gemini 사용, 실패 시 시뮬레이션 반환."""
-    def simulate():
-        return {
-            'keywords': ['GIA_INFOSYS', '문서 파싱', 'Notion 연동'],
-            'summary': text[:300] + ('...' if len(text) > 300 else ''),
-            'entities': ['조대표', '나실장', '서대리']
-        }
+def local_with_telemetry(text: str, started: float, reason: Optional[str] = None) -> Dict[str, Any]:
+    """로컬 추출 폴백 결과를 반환하고 폴백 사실을 지표 로그에 기록."""
+    result = get_default_extractor().extract(text)
+    get_default_telemetry().record('local', None, time.perf_counter() - started,
+                                   input_tokens=estimate_tokens(text), fallback=True, error=reason)
+    return result
+
 
-    if not GEMINI_KEY:
-        return simulate()
+def extract_semantics(text: str, on_field: Optional[Callable[[str, Any], None]] = None,
+                      defer_on_open: bool = False, fallback: bool = True) -> Dict[str, Any]:
+    """
+    Gemini 사용, 실패 시 로컬 추출 결과 반환. 스트리밍 모드면 완성된 필드를 on_field로 즉시 전달.
+    defer_on_open이고 정책이 defer면 서킷 차단 시 CircuitOpenError를 그대로 올려 재시도 큐로 보낸다.
+    fallback=False면 로컬 추출 대신 예외를 올린다 (작업 큐가 재시도/실패를 기록).
+    실행 토큰 예산이 소진되면 로컬 추출로 대체하지 않고 TokenBudgetExceeded를 올려 실행을 멈춘다.
+    """
+    started = time.perf_counter()
+    client = get_client()
+    if not client.key_pool:
+        return local_with_telemetry(text, started, "Gemini 키 미설정")
 
+    cache = get_cache()
     try:
-        import google.generativeai as genai
-        genai.configure(api_key=GEMINI_KEY)
-        prompt = (
-            "다음 텍스트의 핵심 키워드(최대 8개), 2문장 요약, 관련 인물(있으면) 리스트를 JSON으로만 출력하세요.\n"
-            "필드: keywords(list), summary(str), entities(list). 텍스트:\n" + text
-        )
-        model = genai.GenerativeModel(MODEL)
-        resp = model.generate_content(prompt)
-        import json
-        return json.loads(resp.text.strip())
+        if STREAMING:
+            result, decision = cache.get_or_extract(
+                text, lambda t: client.stream_extract(t, on_field=on_field), patch_fn=client.extract,
+                namespace=client.cache_namespace())
+            if decision in ('exact', 'reuse', 'patch') and on_field:
+                # 캐시에서 가져온 결과도 스트리밍과 같은 경로로 그래프 단계에 전달 (miss/disabled 는 이미 전달됨)
+                for field, value in result.items():
+                    on_field(field, value)
+            return result
+        return cache.get_or_extract(text, client.extract, namespace=client.cache_namespace())[0]
+    except TokenBudgetExceeded:
+        raise
+    except CircuitOpenError as e:
+        if (defer_on_open and OPEN_CIRCUIT_POLICY == 'defer') or not fallback:
+            raise
+        logger.warning(f"Gemini 서킷 차단, 로컬 추출로 대체: {e}")
+        return local_with_telemetry(text, started, str(e))
     except Exception as e:
-        logger.warning(f"Gemini 호출 실패, 시뮬레이션으로 대체: {e}")
-        return simulate()
+        if not fallback:
+            raise
+        logger.warning(f"Gemini 호출 실패, 로컬 추출로 대체: {e}")
+        return local_with_telemetry(text, started, str(e))
+
+
+def extract_semantics_batch(texts: Dict[str, str], defer_on_open: bool = False, fallback: bool = True,
+                            errors: Optional[Dict[str, Exception]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    짧은 문서는 묶어서 한 번에 추출하고, 긴 문서와 끝까지 누락된 문서는 개별 추출.
+    서킷 차단으로 미뤄졌거나 (fallback=False에서) 실패한 문서는 결과에 포함되지 않고 errors에 기록된다.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    client = get_client()
+    if client.key_pool and BATCH_TOKEN_BUDGET:
+        cache = get_cache()
+        # 캐시에 없는 짧은 문서만 배치로 보냄 (증분 반영 대상은 아래 개별 추출에서 처리)
+        short_docs = {}
+        for doc_id, text in texts.items():
+            started = time.perf_counter()
+            found = cache.lookup(text, client.cache_namespace())
+            if found.decision not in ('exact', 'reuse'):
+                # 배치 템플릿으로 추출해 둔 결과 (배치 템플릿 버전이 바뀌면 무효)
+                batch_found = cache.lookup(text, client.cache_namespace(BATCH_EXTRACTION))
+                if batch_found.decision in ('exact', 'reuse'):
+                    found = batch_found
+            if found.decision in ('exact', 'reuse'):
+                cache.record_decision(found.decision, found.similarity, started, text)
+                results[doc_id] = cache.cached_result(text, found)
+            elif found.decision == 'miss' and estimate_tokens(text) <= BATCH_MAX_DOC_TOKENS:
+                short_docs[doc_id] = text
+        namespaces: Dict[str, str] = {}
+        batch_results = (client.extract_batch(short_docs, token_budget=BATCH_TOKEN_BUDGET, namespaces=namespaces)
+                         if short_docs else {})
+        for doc_id, result in batch_results.items():
+            # 결과를 만든 템플릿의 네임스페이스에 저장 (배치 템플릿 버전을 올리면 배치 결과만 무효화)
+            cache.store(texts[doc_id], result, namespaces.get(doc_id, client.cache_namespace()))
+        results.update(batch_results)
+        logger.info(f"배치 추출: {len(batch_results)}/{len(short_docs)}건 성공, 통계 {client.batch_stats}")
+
+    for doc_id, text in texts.items():
+        if doc_id in results:
+            continue
+        try:
+            results[doc_id] = extract_semantics(text, defer_on_open=defer_on_open, fallback=fallback)
+        except TokenBudgetExceeded as e:
+            logger.warning(f"실행 토큰 예산 소진, 남은 문서 추출 중단: {e}")
+            break
+        except CircuitOpenError as e:
+            logger.info(f"서킷 차단으로 재시도 큐에 추가: {doc_id}")
+            if errors is not None:
+                errors[doc_id] = e
+        except Exception as e:
+            if errors is None:
+                raise
+            errors[doc_id] = e
+    return results
+
+
+def drain_retry_queue(retry_queue: List[str], texts: Dict[str, str], graph=None) -> Dict[str, Dict[str, Any]]:
+    """
+    서킷 복구를 최대 RETRY_QUEUE_MAX_WAIT초 기다린 뒤 미뤄둔 문서 처리. 여전히 차단이면 로컬 추출.
+    실행 토큰 예산이 소진되면 남은 문서는 처리하지 않는다.
+    """
+    wait = min(get_client().breakers.retry_in('gemini'), RETRY_QUEUE_MAX_WAIT)
+    logger.info(f"재시도 큐 {len(retry_queue)}건: 서킷 복구 대기 {wait:.1f}초")
+    if wait > 0:
+        time.sleep(wait)
+    results = {}
+    for doc_id in retry_queue:
+        try:
+            results[doc_id] = extract_semantics(texts[doc_id], on_field=make_graph_writer(graph, doc_id))
+        except TokenBudgetExceeded as e:
+            logger.warning(f"실행 토큰 예산 소진, 재시도 큐 처리 중단: {e}")
+            break
+    return results
+
+
+def run_job_queue(queue: LLMJobQueue, texts: Dict[str, str], graph=None) -> Dict[str, Dict[str, Any]]:
+    """
+    작업 큐에 문서를 등록하고 워커 스레드로 처리. 이전 실행에서 완료된 작업은 저장된 결과를 사용.
+    서킷 차단 시 작업을 반납하여 나중에 다시 가져가고, 허용 횟수를 넘겨 실패한 문서는 로컬 추출로 대체.
+    실행 토큰 예산이 소진되면 남은 작업을 반납하고 워커를 멈춘다 (다음 실행에서 이어서 처리, 결과에서 제외).
+    """
+    run_id = f"run-{os.getpid()}-{int(time.time())}"
+    queue.requeue_orphans()
+    for doc_id, text in texts.items():
+        queue.enqueue(doc_id, text)
+    logger.info(f"LLM 작업 큐: {queue.counts()}")
+    claim_size = JOB_CLAIM_SIZE if BATCH_TOKEN_BUDGET else 1
+    run_budget = get_client().run_budget
+
+    def work(worker_id: str):
+        while not run_budget.exhausted:
+            jobs = queue.claim(worker_id, claim_size)
+            if not jobs:
+                if not queue.pending():
+                    return
+                time.sleep(min(max(queue.next_ready_in(), 0.05), 1.0))
+                continue
+            batch = {job.job_id: job.payload['text'] for job in jobs}
+            errors: Dict[str, Exception] = {}
+            # 재시도·헤지·429 쿨다운으로 추출이 임대 시간을 넘겨도 다른 워커가 같은 작업을 가져가지 않도록 임대 연장
+            with queue.heartbeat(worker_id, batch):
+                if claim_size > 1:
+                    results = extract_semantics_batch(batch, defer_on_open=True, fallback=False, errors=errors)
+                else:
+                    results = {}
+                    for doc_id, text in batch.items():
+                        try:
+                            results[doc_id] = extract_semantics(text, on_field=make_graph_writer(graph, doc_id),
+                                                                defer_on_open=True, fallback=False)
+                        except TokenBudgetExceeded:
+                            break
+                        except Exception as e:
+                            errors[doc_id] = e
+            for doc_id, result in results.items():
+                queue.complete(doc_id, worker_id, result)
+            budget_exhausted = run_budget.exhausted
+            for doc_id in batch:
+                if doc_id in results:
+                    continue
+                if budget_exhausted and doc_id not in errors:
+                    queue.release(doc_id, worker_id)
+                    continue
+                error = errors.get(doc_id)
+                if isinstance(error, CircuitOpenError) and OPEN_CIRCUIT_POLICY == 'defer':
+                    queue.release(doc_id, worker_id, delay=max(error.retry_in, 0.5))
+                    continue
+                state = queue.fail(doc_id, worker_id, str(error) if error else '추출 결과 없음')
+                logger.warning(f"작업 실패({state}): {doc_id} {error}")
+            if budget_exhausted:
+                return
+
+    workers = [threading.Thread(target=work, args=(f"{run_id}-w{i}",), daemon=True) for i in range(JOB_WORKERS)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    logger.info(f"LLM 작업 큐 처리 완료: {queue.counts()}")
+
+    extracted: Dict[str, Dict[str, Any]] = {}
+    for doc_id, text in texts.items():
+        job = queue.get(doc_id)
+        if job and job.result is not None:
+            extracted[doc_id] = job.result
+        elif run_budget.exhausted and job and job.state == QUEUED:
+            continue
+        else:
+            extracted[doc_id] = local_with_telemetry(text, time.perf_counter(), job.error if job else None)
+    return extracted
+
+
+def prefilter_texts(texts: Dict[str, str]) -> Dict[str, str]:
+    """코퍼스 TF-IDF로 핵심 문장만 남겨 프롬프트를 줄이고 축소율/키워드 일치도를 보고."""
+    from salience_prefilter import SaliencePrefilter, evaluate_prefilter
+
+    prefilter = SaliencePrefilter().fit(texts.values())
+    client = get_client()
+    extract_fn = client.extract if (client.key_pool and PREFILTER_EVAL_SAMPLE) else None
+    report = evaluate_prefilter(list(texts.values()), prefilter, PREFILTER_TOKENS,
+                                extract_fn=extract_fn, sample_size=PREFILTER_EVAL_SAMPLE)
+    logger.info(f"핵심 문장 전처리: 토큰 {report['original_tokens']} → {report['selected_tokens']} "
+                f"(축소율 {report['prompt_reduction']:.1%}), 키워드 일치도 {report.get('keyword_agreement')}")
+    return {doc_id: prefilter.select(text, PREFILTER_TOKENS).text for doc_id, text in texts.items()}
+
+
+# ---------- 지식 그래프 단계 ----------
+
+def load_graph_stage():
+    """지식 그래프 시뮬레이터 로드. 실패 시 None."""
+    try:
+        from knowledge_graph_simulator import KnowledgeGraphSimulator  # type: ignore
+        return KnowledgeGraphSimulator()
+    except Exception as e:
+        logger.warning(f"지식 그래프 단계 로드 실패: {e}")
+        return None
+
+
+def make_graph_writer(graph, doc_id: str) -> Optional[Callable[[str, Any], None]]:
+    """스트리밍으로 완성된 keywords/entities를 그래프에 바로 기록하는 콜백."""
+    if graph is None:
+        return None
+
+    gazetteer = get_default_gazetteer()
+
+    def on_field(field: str, value: Any):
+        if field == 'entities':
+            names = [graph.create_or_update_entity({"name": name, "type": gazetteer.kind_of(name)}, doc_id)
+                     for name in value]
+            graph.create_relationships(doc_id, names)
+        elif field == 'keywords':
+            graph.documents_db.setdefault(doc_id, {})['keywords'] = value
+        logger.info(f"그래프 단계 반영: {doc_id} {field} {len(value) if isinstance(value, list) else 1}건")
+
+    return on_field
 
 
 # ---------- Notion 업로드 ----------
@@ -134,6 +408,9 @@ def upload_to_notion(doc_title: str, doc_type: str, extracted: Dict[str, Any]) -
 
 
 def main():
+    # 업로더 실행은 LLM_METRICS_ENABLED 가 비어 있으면 지표를 기록 (명시적으로 False면 끔)
+    get_default_telemetry().enabled = metrics_enabled(default=True)
+
     # 테스트 파일 한 세트 처리
     samples = [
         (os.path.join(TEST_FILES_DIR, 'test.docx'), 'docx'),
@@ -141,14 +418,65 @@ def main():
         (os.path.join(TEST_FILES_DIR, 'test.pdf'), 'pdf'),
     ]
 
-    results = []
+    parsed = {}
     for path, dtype in samples:
         text = parse_text_from_file(path)
         if not text:
             logger.error(f"텍스트 추출 실패: {path}")
             continue
-        extracted = extract_semantics(text)
-        page_id = upload_to_notion(os.path.basename(path), dtype, extracted)
+        parsed[path] = (dtype, text)
+
+    texts = {path: text for path, (_, text) in parsed.items()}
+    if PREFILTER_TOKENS:
+        texts = prefilter_texts(texts)
+
+    client = get_client()
+    graph = load_graph_stage() if STREAMING else None
+    queue = LLMJobQueue.from_env() if (JOB_QUEUE_ENABLED and client.key_pool) else None
+    if queue:
+        extracted_all = run_job_queue(queue, texts, graph)
+    elif STREAMING:
+        extracted_all = {}
+        for path, text in texts.items():
+            try:
+                extracted_all[path] = extract_semantics(text, on_field=make_graph_writer(graph, path),
+                                                        defer_on_open=True)
+            except TokenBudgetExceeded as e:
+                logger.warning(f"실행 토큰 예산 소진, 남은 문서 추출 중단: {e}")
+                break
+            except CircuitOpenError:
+                logger.info(f"서킷 차단으로 재시도 큐에 추가: {path}")
+    else:
+        extracted_all = extract_semantics_batch(texts, defer_on_open=True)
+
+    # 서킷 차단으로 미뤄진 문서는 나머지를 모두 처리한 뒤 재시도
+    retry_queue = [path for path in texts if path not in extracted_all]
+    if retry_queue and not client.run_budget.exhausted:
+        extracted_all.update(drain_retry_queue(retry_queue, texts, graph))
+
+    # 예산 소진으로 조기 중단: 추출하지 못한 문서는 업로드하지 않고 보고
+    if client.run_budget.exhausted:
+        skipped = [path for path in texts if path not in extracted_all]
+        logger.warning(f"실행 토큰 예산 소진으로 조기 중단: 처리 {len(extracted_all)}건, 미처리 {len(skipped)}건 "
+                       f"{skipped}, 토큰 {client.token_report()}")
+
+    # 개체 사전에서 찾은 알려진 개체를 LLM 추출 개체와 병합 (별칭은 대표 이름으로 통일)
+    gazetteer = get_default_gazetteer()
+    for path, extracted in extracted_all.items():
+        extracted['entities'] = gazetteer.merge_names(parsed[path][1], extracted.get('entities'))
+
+    results = []
+    for path, (dtype, _) in parsed.items():
+        if path not in extracted_all:
+            continue
+        job = queue.get(path) if queue else None
+        if job and job.upload_ref:
+            page_id = job.upload_ref
+            logger.info(f"이전 실행에서 업로드됨: {path}")
+        else:
+            page_id = upload_to_notion(os.path.basename(path), dtype, extracted_all[path])
+            if queue:
+                queue.set_upload_ref(path, page_id)
         results.append({'file': path, 'type': dtype, 'page_id': page_id})
         logger.info(f"업로드 완료: {path} -> {page_id}")
 
@@ -156,6 +484,30 @@ def main():
     for r in results:
         print(f"{r['file']} -> {r['page_id']}")
 
+    if client.key_pool:
+        client.key_pool.log_utilization()
+        stats = client.parse_stats
+        logger.info(f"LLM 응답 파싱: 정상 {stats['clean']}건, 복구 {stats['recovered']}건, "
+                    f"복구 불가 {stats['failed']}건, 재요청 {stats['rerequested']}건")
+        if STREAMING:
+            logger.info(f"스트리밍 추출: {client.stream_stats}")
+        logger.info(f"서킷 상태: {client.breakers.snapshot()}, 현재 타임아웃 {client.current_timeout():.1f}초")
+        cache = get_cache()
+        if cache.enabled:
+            logger.info(f"유사도 캐시: {cache.stats} (저장 {len(cache)}건)")
+        if client.tier_models:
+            logger.info(f"모델 단계화: {client.tier_report()}")
+        if client.hedge_budget_percent:
+            logger.info(f"헤지 요청: {client.hedge_report()}")
+        if client.traffic is not None:
+            logger.info(f"트래픽 {client.traffic.mode}: {client.traffic.stats}")
+        if client.coalesce_stats['coalesced']:
+            logger.info(f"동일 요청 병합: {client.coalesce_report()}")
+        logger.info(f"토큰 예산: {client.token_report()}")
+    if queue:
+        queue.close()
+    client.close()
+
 
 if __name__ == '__main__':
     main()
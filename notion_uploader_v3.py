@@ -14,6 +14,8 @@ import sys
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 
+from entity_gazetteer import get_default_gazetteer
+
 # 환경 변수
 from dotenv import load_dotenv
 
@@ -54,6 +56,9 @@ class NotionUploaderV3:
         
         logger.info("Notion 업로더 v3 초기화 완료 (시뮬레이션 모드)")
 
+        # People_Network / Knowledge_Graph / Projects_Master 이름으로 만든 개체 사전
+        self.gazetteer = get_default_gazetteer()
+
         # 개체 정보 DB ID (시뮬레이션용)
         self.entity_database_id = "entity_db_sim_" + datetime.now().strftime('%Y%m%d_%H%M%S')
 
@@ -79,18 +84,11 @@ class NotionUploaderV3:
         logger.info(f"개체 정보 DB 생성 성공: {db_structure['database_name']}")
         return {"success": True, "database_id": self.entity_database_id, "database_name": db_structure['database_name']}
 
-    def extract_entities_from_text(self, text: str) -> List[Dict[str, Any]]:
-        """텍스트에서 개체 추출 (시뮬레이션)"""
+    def extract_entities_from_text(self, text: str, llm_entities: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+        """텍스트에서 개체 추출 (개체 사전 Aho-Corasick 검색 + LLM 추출 개체 병합)"""
         logger.info("텍스트에서 개체 추출 시작")
         
-        # 시뮬레이션된 개체 추출
-        extracted_entities = [
-            {"name": "조대표", "type": "인물", "confidence": 0.95},
-            {"name": "GIA_INFOSYS", "type": "프로젝트", "confidence": 0.90},
-            {"name": "Notion", "type": "기술", "confidence": 0.85},
-            {"name": "AI 기술", "type": "기술", "confidence": 0.80},
-            {"name": "개인정보시스템", "type": "프로젝트", "confidence": 0.75}
-        ]
+        extracted_entities = self.gazetteer.merge(text, llm_entities or [])
         
         logger.info(f"개체 추출 완료: {len(extracted_entities)}개 개체 발견")
         return extracted_entities
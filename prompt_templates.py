@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+prompt_templates.py
+- 모든 LLM 호출 지점의 프롬프트를 이름/버전으로 관리하는 템플릿 레지스트리
+- 템플릿은 등록 시 한 번만 컴파일 (고정 문자열 조각 + 치환 필드 목록)
+- 고정 부분의 토큰 수를 미리 계산하여 배치 예산 산정 등에 사용
+- cache_key(이름@버전:지문)를 캐시 키에 넣어 프롬프트가 바뀐 템플릿의 캐시만 무효화
+- DOCS/025 GitMind 연동 프롬프트 포함
+
+사용법:
+    python prompt_templates.py    # 등록된 템플릿 목록과 토큰 수 출력
+"""
+
+import re
+import hashlib
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# {field} 형태만 치환 필드로 인식 (JSON 예시의 중괄호는 그대로 둠)
+FIELD_PATTERN = re.compile(r'\{([a-z_][a-z0-9_]*)\}')
+
+
+class PromptTemplateError(ValueError):
+    """템플릿 등록/렌더링 오류"""
+
+
+class PromptTemplate:
+    """컴파일된 프롬프트 템플릿"""
+
+    def __init__(self, name: str, version: int, template: str, description: str = ''):
+        self.name = name
+        self.version = version
+        self.template = template
+        self.description = description
+        self.fingerprint = hashlib.sha256(template.encode('utf-8')).hexdigest()[:12]
+        self._segments, self.fields = self._compile(template)
+        self._static_tokens: Optional[int] = None
+
+    @staticmethod
+    def _compile(template: str) -> Tuple[List[Tuple[str, Optional[str]]], Tuple[str, ...]]:
+        """(고정 문자열, 뒤따르는 필드명) 조각 목록으로 분해"""
+        segments: List[Tuple[str, Optional[str]]] = []
+        fields: List[str] = []
+        pos = 0
+        for match in FIELD_PATTERN.finditer(template):
+            segments.append((template[pos:match.start()], match.group(1)))
+            if match.group(1) not in fields:
+                fields.append(match.group(1))
+            pos = match.end()
+        segments.append((template[pos:], None))
+        return segments, tuple(fields)
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@v{self.version}"
+
+    @property
+    def cache_key(self) -> str:
+        """캐시 키에 넣는 식별자. 버전을 올리지 않고 문구만 바꿔도 지문이 달라짐"""
+        return f"{self.key}:{self.fingerprint}"
+
+    @property
+    def static_tokens(self) -> int:
+        """치환 필드를 제외한 고정 부분의 토큰 수 (최초 1회 계산)"""
+        if self._static_tokens is None:
+            from token_budget import estimate_tokens
+            self._static_tokens = estimate_tokens(''.join(literal for literal, _ in self._segments))
+        return self._static_tokens
+
+    def render(self, **values) -> str:
+        missing = [field for field in self.fields if field not in values]
+        if missing:
+            raise PromptTemplateError(f"{self.key} 필드 누락: {', '.join(missing)}")
+        return ''.join(literal + (str(values[field]) if field else '') for literal, field in self._segments)
+
+    def estimate_tokens(self, **values) -> int:
+        """렌더링하지 않고 프롬프트 토큰 수 추정"""
+        from token_budget import estimate_tokens
+        return self.static_tokens + sum(estimate_tokens(str(values.get(field, ''))) for field in self.fields)
+
+    def __repr__(self) -> str:
+        return f"PromptTemplate({self.key}, fields={list(self.fields)}, tokens={self.static_tokens})"
+
+
+class PromptRegistry:
+    """이름별 버전 목록을 관리하는 템플릿 레지스트리 (스레드 안전)"""
+
+    def __init__(self):
+        self._templates: Dict[str, Dict[int, PromptTemplate]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, version: int, template: str, description: str = '') -> PromptTemplate:
+        compiled = PromptTemplate(name, version, template, description)
+        with self._lock:
+            versions = self._templates.setdefault(name, {})
+            if version in versions and versions[version].template != template:
+                raise PromptTemplateError(f"{compiled.key} 이미 다른 내용으로 등록됨 (버전을 올리세요)")
+            versions[version] = compiled
+        return compiled
+
+    def get(self, name: str, version: Optional[int] = None) -> PromptTemplate:
+        """템플릿 조회 (버전 미지정 시 최신 버전)"""
+        versions = self._templates.get(name)
+        if not versions:
+            raise PromptTemplateError(f"등록되지 않은 템플릿: {name}")
+        if version is None:
+            version = max(versions)
+        if version not in versions:
+            raise PromptTemplateError(f"등록되지 않은 버전: {name}@v{version}")
+        return versions[version]
+
+    def render(self, name: str, version: Optional[int] = None, **values) -> str:
+        return self.get(name, version).render(**values)
+
+    def templates(self) -> List[PromptTemplate]:
+        return [t for versions in self._templates.values() for _, t in sorted(versions.items())]
+
+
+REGISTRY = PromptRegistry()
+
+# ---------- 의미 추출 ----------
+
+EXTRACTION = REGISTRY.register('extraction', 1, (
+    "다음 텍스트의 핵심 키워드(최대 8개), 2문장 요약, 관련 인물(있으면) 리스트를 JSON으로만 출력하세요.\n"
+    "필드: keywords(list), summary(str), entities(list). 텍스트:\n"
+    "{text}"
+), "문서 한 건 키워드/요약/인물 추출")
+
+BATCH_EXTRACTION = REGISTRY.register('batch_extraction', 1, (
+    "아래 여러 문서 각각에 대해 핵심 키워드(최대 8개), 2문장 요약, 관련 인물(있으면) 리스트를 추출하세요.\n"
+    "문서마다 원소 하나씩, JSON 배열로만 출력하세요.\n"
+    "원소 필드: id(str, 문서 id 그대로), keywords(list), summary(str), entities(list).\n"
+    "{documents}"
+), "짧은 문서 여러 건 배치 추출 (documents는 batch_document 렌더링 결과를 이어 붙인 것)")
+
+BATCH_DOCUMENT = REGISTRY.register('batch_document', 1, (
+    "\n### 문서 id={doc_id}\n{text}"
+), "배치 프롬프트 안의 문서 한 건")
+
+# ---------- GitMind 연동 (DOCS/025) ----------
+
+GITMIND_TO_NOTION = REGISTRY.register('gitmind_to_notion', 1, """당신은 조대표의 GitMind 마인드맵을 노션 DB로 변환하는 전문가입니다.
+
+[마인드맵 URL/내용]
+{gitmind_content}
+
+다음 형식으로 노션 Projects_Master DB 입력 데이터를 생성하세요:
+
+{
+  "프로젝트명": "[중심 주제]",
+  "상태": "기획/진행중/완료 중 선택",
+  "우선순위": "최우선/높음/보통/낮음 중 선택",
+  "하위프로젝트": [
+    {
+      "제목": "[주요 가지 1]",
+      "세부내용": "[세부 항목들]"
+    }
+  ],
+  "예상_액션_아이템": ["구체적 실행 과제1", "과제2"],
+  "필요_문서": ["관련 문서 유형1", "유형2"],
+  "연결_인물": ["관련 인물명1", "인물명2"]
+}
+
+GitMind의 색상, 아이콘, 연결선도 우선순위와 상태로 변환하세요.""", "마인드맵 → Projects_Master 입력 데이터")
+
+NOTION_TO_GITMIND = REGISTRY.register('notion_to_gitmind', 1, """노션 Projects_Master의 진행 상황을 GitMind 마인드맵 업데이트 가이드로 변환하세요.
+
+[노션 프로젝트 현황]
+{notion_project_status}
+
+GitMind 마인드맵 업데이트 가이드:
+
+📍 노드 색상 변경:
+- 완료 항목: 초록색
+- 진행중: 파란색
+- 지연: 빨간색
+- 신규 추가: 노란색
+
+📝 노드 내용 업데이트:
+- [기존 노드명] → [새 내용 + 진행률]
+
+🔗 새로 추가할 연결선:
+- [노드A] ↔ [노드B]: [연결 이유]
+
+⚠️ 주의사항:
+- [위험 요소나 병목 지점]""", "Projects_Master 진행 상황 → 마인드맵 업데이트 가이드")
+
+MORNING_ROUTINE = REGISTRY.register('morning_routine', 1, """조대표의 마인드맵과 노션 프로젝트를 분석하여 오늘의 우선순위를 제안하세요.
+
+[진행중인 마인드맵]
+{active_mindmaps}
+
+[노션 프로젝트 현황]
+{notion_projects}
+
+오늘의 추천 일정:
+⏰ 09:00-10:00: [최우선 과제]
+⏰ 10:00-12:00: [집중 업무 시간]
+⏰ 14:00-16:00: [미팅/네트워킹]
+⏰ 16:00-18:00: [창의적 작업]
+
+🎯 핵심 목표 3개:
+1. [구체적 목표 + 완료 기준]
+2. [구체적 목표 + 완료 기준]
+3. [구체적 목표 + 완료 기준]
+
+⚠️ 오늘 주의사항:
+- [잠재적 장애물이나 주의점]""", "아침 루틴: 오늘 할 일 생성")
+
+EVENING_REVIEW = REGISTRY.register('evening_review', 1, """오늘의 성과를 분석하고 GitMind와 노션을 업데이트하세요.
+
+[오늘 완료된 작업]
+{completed_tasks}
+
+[새로 얻은 정보/인사이트]
+{new_insights}
+
+📊 오늘의 성과 분석:
+✅ 달성: [완료된 주요 성과]
+🔄 진행중: [부분 완료된 작업]
+❌ 미완료: [내일로 이월될 작업]
+
+💡 오늘의 핵심 인사이트:
+- [새로 발견한 중요한 깨달음]
+
+🎯 내일의 우선순위:
+1. [미완료 작업 마무리]
+2. [새로운 기회 활용]
+3. [장기 목표 진전]
+
+🔄 GitMind/노션 업데이트 필요:
+- [업데이트할 프로젝트 진행률]
+- [새로 추가할 아이디어/인물/문서]""", "저녁 정리: 성과 분석 및 내일 준비")
+
+KNOWLEDGE_GRAPH_LINK = REGISTRY.register('knowledge_graph_link', 1, """새로운 정보와 조대표의 기존 지식을 창의적으로 연결하세요.
+
+[새 정보]
+{new_information}
+
+[기존 지식 노드들]
+{existing_knowledge_nodes}
+
+창의적 연결 분석:
+
+🔗 직접 연결 (명확한 관련성):
+- [새 정보] ↔ [기존 지식A]: [연결 근거]
+
+🌟 간접 연결 (창의적 발견):
+- [새 정보] + [기존 지식B] = [새로운 아이디어]
+
+💡 혁신적 조합:
+- [지식A] × [지식B] × [새 정보] = [혁신적 비즈니스 아이디어]
+
+⚡ 즉시 실행 가능:
+- [오늘 당장 테스트할 수 있는 아이디어]
+
+Knowledge_Graph 노드 생성:
+{
+  "노드명": "[새 지식 노드 이름]",
+  "상위개념": "[연결될 상위 노드]",
+  "관련개념": ["연결될 기존 노드들"],
+  "창의연결": "[자동 생성된 아이디어]"
+}""", "Knowledge_Graph 창의적 연결")
+
+
+def main():
+    print(f"{'template':<28}{'fields':<48}{'tokens':>8}  cache_key")
+    for template in REGISTRY.templates():
+        print(f"{template.key:<28}{', '.join(template.fields):<48}{template.static_tokens:>8}  {template.cache_key}")
+    return True
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+salience_prefilter.py
+- LLM 추출 전에 문서에서 핵심 문장만 골라 프롬프트 크기를 줄이는 로컬 전처리기
+- 코퍼스 전체로 계산한 TF-IDF + 문장 위치 가중치로 문장 점수 산정
+- NumPy / scipy.sparse 로 벡터화하여 수천 건/분 처리
+- 축소율과 전체 텍스트 대비 키워드 일치도 평가 함수 제공
+"""
+
+import re
+import time
+import logging
+from typing import Dict, Any, Callable, Iterable, List, Optional
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # numpy/scipy 미설치 시 전처리 없이 원문 사용
+    np = None
+    sparse = None
+
+from token_budget import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+SENTENCE_PATTERN = re.compile(r'[^.!?。\n]+(?:[.!?。]+|$)')
+TOKEN_PATTERN = re.compile(r'[가-힣]{2,}|[A-Za-z][A-Za-z0-9_]+|\d+')
+# 한국어 조사 제거 (예: 조대표님과 → 조대표님, 프로젝트를 → 프로젝트)
+JOSA_PATTERN = re.compile(r'(에서|으로|와|과|은|는|이|가|을|를|의|에|로|도|만)$')
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in SENTENCE_PATTERN.findall(text) if s.strip()]
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text):
+        if len(token) > 2 and '가' <= token[0] <= '힣':
+            token = JOSA_PATTERN.sub('', token)
+        tokens.append(token.lower())
+    return tokens
+
+
+class PrefilterResult:
+    """전처리 결과"""
+
+    def __init__(self, text: str, original_tokens: int, selected_tokens: int,
+                 sentence_count: int, selected_count: int):
+        self.text = text
+        self.original_tokens = original_tokens
+        self.selected_tokens = selected_tokens
+        self.sentence_count = sentence_count
+        self.selected_count = selected_count
+
+    @property
+    def reduction(self) -> float:
+        """프롬프트 축소율 (0~1)"""
+        if not self.original_tokens:
+            return 0.0
+        return 1.0 - self.selected_tokens / self.original_tokens
+
+
+class SaliencePrefilter:
+    """TF-IDF + 위치 가중치 기반 핵심 문장 선택기"""
+
+    def __init__(self, position_weight: float = 0.3, lead_sentences: int = 2):
+        """
+        Args:
+            position_weight (float): 위치 가중치 비중 (0이면 TF-IDF만 사용)
+            lead_sentences (int): 점수와 무관하게 항상 포함할 앞 문장 수
+        """
+        self.position_weight = position_weight
+        self.lead_sentences = lead_sentences
+        self.vocabulary: Dict[str, int] = {}
+        self.idf = None
+        self._default_idf = 1.0
+
+    @property
+    def available(self) -> bool:
+        return np is not None
+
+    def fit(self, corpus: Iterable[str]) -> 'SaliencePrefilter':
+        """코퍼스 문서 빈도로 IDF 계산"""
+        if not self.available:
+            logger.warning("numpy/scipy 미설치: 핵심 문장 전처리 비활성")
+            return self
+        rows, cols = [], []
+        vocabulary: Dict[str, int] = {}
+        n_docs = 0
+        for doc_index, text in enumerate(corpus):
+            n_docs += 1
+            for token in set(tokenize(text)):
+                rows.append(doc_index)
+                cols.append(vocabulary.setdefault(token, len(vocabulary)))
+        self.vocabulary = vocabulary
+        if not vocabulary:
+            self.idf = np.zeros(0)
+            return self
+        presence = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n_docs, len(vocabulary)))
+        df = np.asarray(presence.sum(axis=0)).ravel()
+        self.idf = np.log((1 + n_docs) / (1 + df)) + 1.0
+        self._default_idf = float(np.log(1 + n_docs) + 1.0)
+        logger.info(f"핵심 문장 전처리 IDF 학습: 문서 {n_docs}건, 어휘 {len(vocabulary)}개")
+        return self
+
+    def _sentence_matrix(self, sentences: List[str]):
+        """문장 × 어휘 TF 행렬 (코퍼스에 없는 단어는 기본 IDF 열 하나로 합산)"""
+        oov_col = len(self.vocabulary)
+        rows, cols = [], []
+        for row, sentence in enumerate(sentences):
+            for token in tokenize(sentence):
+                rows.append(row)
+                cols.append(self.vocabulary.get(token, oov_col))
+        matrix = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(sentences), oov_col + 1))
+        matrix.sum_duplicates()
+        return matrix
+
+    def score_sentences(self, sentences: List[str]):
+        """문장별 중요도 점수 (numpy 배열)"""
+        if not sentences:
+            return np.zeros(0)
+        matrix = self._sentence_matrix(sentences)
+        idf = np.append(self.idf if self.idf is not None else np.zeros(len(self.vocabulary)), self._default_idf)
+        # 로그 TF × IDF 합을 문장 길이로 정규화하여 긴 문장 편향 완화
+        matrix.data = 1.0 + np.log(matrix.data)
+        salience = np.asarray(matrix.multiply(idf).sum(axis=1)).ravel()
+        lengths = np.asarray(matrix.getnnz(axis=1)).astype(float)
+        salience = salience / np.sqrt(np.maximum(lengths, 1.0))
+        if salience.max() > 0:
+            salience = salience / salience.max()
+        positions = np.arange(len(sentences), dtype=float)
+        position_score = 1.0 / (1.0 + positions)
+        return (1.0 - self.position_weight) * salience + self.position_weight * position_score
+
+    def select(self, text: str, token_budget: int) -> PrefilterResult:
+        """
+        토큰 예산 안에서 점수가 높은 문장을 골라 원래 순서대로 이어 붙임
+
+        Args:
+            text (str): 원문
+            token_budget (int): 선택 결과의 최대 토큰 수
+
+        Returns:
+            PrefilterResult: 선택 결과 (예산 이내 문서는 원문 그대로)
+        """
+        original_tokens = estimate_tokens(text)
+        sentences = split_sentences(text)
+        if not self.available or original_tokens <= token_budget or len(sentences) <= 1:
+            return PrefilterResult(text, original_tokens, original_tokens, len(sentences), len(sentences))
+
+        scores = self.score_sentences(sentences)
+        scores[:self.lead_sentences] = np.inf
+        costs = np.array([estimate_tokens(s) for s in sentences])
+        order = np.argsort(-scores, kind='stable')
+        # 점수순 누적 토큰이 예산 이내인 문장만 선택
+        within = np.cumsum(costs[order]) <= token_budget
+        chosen = np.sort(order[within]) if within.any() else order[:1]
+        selected = ' '.join(sentences[i] for i in chosen)
+        return PrefilterResult(selected, original_tokens, int(costs[chosen].sum()), len(sentences), len(chosen))
+
+
+def keyword_agreement(full_keywords: List[str], filtered_keywords: List[str]) -> float:
+    """두 키워드 목록의 Jaccard 일치도"""
+    a = {k.strip().lower() for k in full_keywords}
+    b = {k.strip().lower() for k in filtered_keywords}
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def evaluate_prefilter(texts: List[str], prefilter: SaliencePrefilter, token_budget: int,
+                       extract_fn: Optional[Callable[[str], Dict[str, Any]]] = None,
+                       sample_size: int = 20) -> Dict[str, Any]:
+    """
+    전처리 효과 평가: 프롬프트 축소율, 처리 속도, (extract_fn 지정 시) 표본의 키워드 일치도
+
+    Args:
+        texts (List[str]): 평가 대상 문서
+        prefilter (SaliencePrefilter): 학습된 전처리기
+        token_budget (int): 문서당 토큰 예산
+        extract_fn (Optional[Callable]): 추출 함수 (전체/축소 텍스트 각각 호출)
+        sample_size (int): 키워드 일치도를 잴 표본 수
+
+    Returns:
+        Dict[str, Any]: 평가 결과
+    """
+    started = time.perf_counter()
+    results = [prefilter.select(text, token_budget) for text in texts]
+    elapsed = time.perf_counter() - started
+    original = sum(r.original_tokens for r in results)
+    selected = sum(r.selected_tokens for r in results)
+    report: Dict[str, Any] = {
+        "documents": len(texts),
+        "original_tokens": original,
+        "selected_tokens": selected,
+        "prompt_reduction": round(1.0 - selected / original, 3) if original else 0.0,
+        "docs_per_minute": round(len(texts) / elapsed * 60) if elapsed > 0 else None,
+    }
+    if extract_fn:
+        agreements = []
+        for text, result in list(zip(texts, results))[:sample_size]:
+            if result.text == text:
+                continue
+            full = extract_fn(text).get('keywords', [])
+            filtered = extract_fn(result.text).get('keywords', [])
+            agreements.append(keyword_agreement(full, filtered))
+        report["agreement_samples"] = len(agreements)
+        report["keyword_agreement"] = round(sum(agreements) / len(agreements), 3) if agreements else None
+    return report
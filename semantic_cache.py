@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+semantic_cache.py
+- 거의 같은 문서(수정본 등)의 추출 결과를 재사용하는 로컬 유사도 캐시 (외부 서비스 없음)
+- 1단계: 정규화한 원문 해시 완전 일치 → 그대로 재사용
+- 2단계: 해싱 벡터(단어 + 단어 바이그램) 코사인 유사도 최근접 검색
+    · patch 임계치 이상이고 바뀐 문장이 없으면(또는 reuse 임계치 이상) → 이전 결과 재사용
+    · patch 임계치 이상이고 바뀐 문장이 있으면 → 바뀐 문장만 추출하여 이전 keywords/entities 에 증분 반영
+    · 그 외 → 전체 추출 후 저장
+- 결정(exact/reuse/patch/miss)과 유사도를 로그와 LLM 지표(cache_hit)에 기록
+- 캐시 항목은 추가 전용 JSONL 파일에 저장 (원문은 저장하지 않음, 인물별 등장 문장 해시는 저장)
+- 재사용/증분 반영 시 삭제된 문장에만 나왔던 인물만 제외 (조 대표님 ↔ 조대표 같은 표기 변형은 정규화 키로 비교)
+- 캐시를 끄면 조회/기록/저장 없이 바로 전체 추출
+- 네임스페이스(프롬프트 템플릿 버전 + 모델)별로 따로 색인하여 템플릿이 바뀐 항목만 무효화
+"""
+
+import os
+import re
+import json
+import time
+import zlib
+import hashlib
+import threading
+import logging
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # numpy/scipy 미설치 시 해시 완전 일치 캐시만 사용
+    np = None
+    sparse = None
+
+from entity_resolver import normalize_name
+from llm_telemetry import TelemetryLogger, get_default_telemetry
+from salience_prefilter import split_sentences, tokenize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = 'semantic_cache.jsonl'
+MAX_KEYWORDS = 8
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+def sentence_hash(sentence: str) -> int:
+    return zlib.crc32(normalize_text(sentence).encode('utf-8'))
+
+
+def sentence_hashes(text: str) -> List[int]:
+    return [sentence_hash(s) for s in split_sentences(text)]
+
+
+def entity_name(item: Any) -> str:
+    return item.get("name", '') if isinstance(item, dict) else str(item)
+
+
+def entity_mentions(text: str, entities: Optional[List[Any]]) -> Dict[str, List[int]]:
+    """
+    인물별로 그 인물이 나오는 문장 해시.
+    이름과 문장을 모두 정규화 키로 바꿔 비교하여 존칭·띄어쓰기·영문 표기 변형도 등장으로 셈 (조대표 ⊂ 조 대표님이)
+    """
+    sentences = [(sentence_hash(s), normalize_name(s)) for s in split_sentences(text)]
+    mentions: Dict[str, List[int]] = {}
+    for item in entities or []:
+        name = entity_name(item)
+        key = normalize_name(name)
+        if key:
+            mentions[name] = [digest for digest, sentence in sentences if key in sentence]
+    return mentions
+
+
+class HashingVectorizer:
+    """어휘 학습 없이 토큰을 고정 차원으로 해싱하는 벡터화기 (실행 간 동일 결과)"""
+
+    def __init__(self, n_features: int = 2 ** 18):
+        self.n_features = n_features
+
+    def features(self, text: str) -> Dict[int, float]:
+        tokens = tokenize(text)
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        counts: Dict[int, float] = {}
+        for gram in grams:
+            h = zlib.crc32(gram.encode('utf-8'))
+            # 최상위 비트로 부호를 정해 해시 충돌 편향 상쇄
+            sign = -1.0 if h & 0x80000000 else 1.0
+            index = h % self.n_features
+            counts[index] = counts.get(index, 0.0) + sign
+        # 로그 TF 후 L2 정규화
+        features = {i: (1.0 + np.log(abs(v))) * np.sign(v) for i, v in counts.items() if v}
+        norm = float(np.sqrt(sum(v * v for v in features.values()))) or 1.0
+        return {i: float(v / norm) for i, v in features.items()}
+
+    def transform(self, features_list: List[Dict[int, float]]):
+        rows, cols, vals = [], [], []
+        for row, features in enumerate(features_list):
+            for col, val in features.items():
+                rows.append(row)
+                cols.append(col)
+                vals.append(val)
+        return sparse.csr_matrix((vals, (rows, cols)), shape=(len(features_list), self.n_features))
+
+
+class CacheLookup:
+    """캐시 조회 결과. decision: exact / reuse / patch / miss"""
+
+    def __init__(self, decision: str, similarity: float = 0.0, entry: Optional[Dict[str, Any]] = None,
+                 changed: str = ''):
+        self.decision = decision
+        self.similarity = similarity
+        self.entry = entry
+        self.changed = changed
+
+
+class _NamespaceIndex:
+    """네임스페이스 하나의 항목/벡터 색인"""
+
+    def __init__(self):
+        self.entries: List[Dict[str, Any]] = []
+        self.by_hash: Dict[str, int] = {}
+        self.features: List[Dict[int, float]] = []
+        self.matrix = None
+
+
+class SemanticCache:
+    """해시 완전 일치 + 해싱 벡터 최근접 검색 기반 추출 결과 캐시 (스레드 안전)"""
+
+    def __init__(self, path: Optional[str] = None, reuse_threshold: float = 0.999,
+                 patch_threshold: float = 0.85, n_features: int = 2 ** 18,
+                 telemetry: Optional[TelemetryLogger] = None, enabled: bool = True):
+        """
+        Args:
+            path (Optional[str]): 캐시 파일 경로 (기본: SEMANTIC_CACHE_PATH 또는 semantic_cache.jsonl)
+            reuse_threshold (float): 이 유사도 이상이면 바뀐 문장이 있어도 이전 결과 재사용
+            patch_threshold (float): 이 유사도 이상이면 바뀐 문장만 추출하여 증분 반영 (바뀐 문장이 없으면 재사용)
+            n_features (int): 해싱 벡터 차원
+            telemetry (Optional[TelemetryLogger]): 캐시 결정 기록기
+            enabled (bool): False면 항상 전체 추출
+        """
+        self.path = path or os.getenv('SEMANTIC_CACHE_PATH', DEFAULT_CACHE_PATH)
+        self.reuse_threshold = reuse_threshold
+        self.patch_threshold = patch_threshold
+        self.enabled = enabled
+        self.telemetry = telemetry or get_default_telemetry()
+        self.vectorizer = HashingVectorizer(n_features) if np is not None else None
+        self._indexes: Dict[str, _NamespaceIndex] = {}
+        self._lock = threading.Lock()
+        self.stats = {'exact': 0, 'reuse': 0, 'patch': 0, 'miss': 0}
+        if self.enabled:
+            self._load()
+
+    @classmethod
+    def from_env(cls, telemetry: Optional[TelemetryLogger] = None) -> 'SemanticCache':
+        return cls(
+            reuse_threshold=float(os.getenv('SEMANTIC_CACHE_REUSE_THRESHOLD', 0.999)),
+            patch_threshold=float(os.getenv('SEMANTIC_CACHE_PATCH_THRESHOLD', 0.85)),
+            telemetry=telemetry,
+            enabled=os.getenv('SEMANTIC_CACHE_ENABLED', 'False').lower() == 'true',
+        )
+
+    def __len__(self) -> int:
+        return sum(len(index.entries) for index in self._indexes.values())
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._add(entry)
+        logger.info(f"유사도 캐시 로드: {len(self)}건, 네임스페이스 {len(self._indexes)}개 ({self.path})")
+
+    def _add(self, entry: Dict[str, Any]):
+        index = self._indexes.setdefault(entry.get('namespace', ''), _NamespaceIndex())
+        index.by_hash[entry['hash']] = len(index.entries)
+        index.entries.append(entry)
+        if self.vectorizer is not None:
+            index.features.append({int(i): v for i, v in zip(entry['vector'][0], entry['vector'][1])})
+            index.matrix = None
+
+    def lookup(self, text: str, namespace: str = '') -> CacheLookup:
+        """같은 네임스페이스에서 가장 가까운 이전 추출 문서 조회"""
+        if not self.enabled:
+            return CacheLookup('miss')
+        digest = text_hash(text)
+        with self._lock:
+            index = self._indexes.get(namespace)
+            if index is None:
+                return CacheLookup('miss')
+            position = index.by_hash.get(digest)
+            if position is not None:
+                return CacheLookup('exact', 1.0, index.entries[position])
+            if self.vectorizer is None:
+                return CacheLookup('miss')
+            if index.matrix is None:
+                index.matrix = self.vectorizer.transform(index.features)
+            query = self.vectorizer.transform([self.vectorizer.features(text)])
+            scores = (index.matrix @ query.T).toarray().ravel()
+            best = int(np.argmax(scores))
+            similarity = float(scores[best])
+            entry = index.entries[best]
+        if similarity < self.patch_threshold:
+            return CacheLookup('miss', similarity, entry)
+        changed = self.changed_text(text, entry)
+        if not changed or similarity >= self.reuse_threshold:
+            return CacheLookup('reuse', similarity, entry)
+        return CacheLookup('patch', similarity, entry, changed)
+
+    def store(self, text: str, result: Dict[str, Any], namespace: str = ''):
+        """추출 결과 저장 (메모리 색인 + JSONL 파일)"""
+        if not self.enabled:
+            return
+        features = self.vectorizer.features(text) if self.vectorizer is not None else {}
+        entry = {
+            "namespace": namespace,
+            "hash": text_hash(text),
+            "sentences": sentence_hashes(text),
+            "vector": [list(features), [round(v, 6) for v in features.values()]],
+            "result": {field: result.get(field) for field in ('keywords', 'summary', 'entities')},
+            "mentions": entity_mentions(text, result.get('entities')),
+            "ts": time.time(),
+        }
+        with self._lock:
+            self._add(entry)
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            except OSError as e:
+                logger.warning(f"유사도 캐시 저장 실패: {e}")
+
+    @staticmethod
+    def changed_text(text: str, entry: Dict[str, Any]) -> str:
+        """이전 문서에 없던 문장만 이어 붙인 텍스트"""
+        previous = set(entry.get('sentences', []))
+        return ' '.join(s for s in split_sentences(text) if sentence_hash(s) not in previous)
+
+    @staticmethod
+    def surviving_entities(text: str, entry: Dict[str, Any]) -> List[Any]:
+        """
+        이전 결과의 인물 중 삭제된 문장에만 나왔던 인물을 제외.
+        이전 문서에서 등장 문장을 찾지 못한 인물(LLM이 바꿔 쓴 이름 등)과 등장 기록이 없는 이전 항목은 유지
+        """
+        mentions = entry.get('mentions')
+        entities = entry['result'].get('entities') or []
+        if mentions is None:
+            return list(entities)
+        current = set(sentence_hashes(text))
+        return [item for item in entities
+                if not mentions.get(entity_name(item)) or current.intersection(mentions[entity_name(item)])]
+
+    @classmethod
+    def cached_result(cls, text: str, found: CacheLookup) -> Dict[str, Any]:
+        """exact/reuse 결정의 재사용 결과 (reuse 는 삭제된 문장에만 나왔던 인물 제외)"""
+        result = dict(found.entry['result'])
+        if found.decision == 'reuse':
+            result['entities'] = cls.surviving_entities(text, found.entry)
+        return result
+
+    @classmethod
+    def patch_result(cls, text: str, found: CacheLookup, delta: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        바뀐 문장에서 추출한 항목을 이전 결과에 추가.
+        인물은 삭제된 문장에만 나왔으면 제외 (키워드는 본문과 표현이 달라도 유지)
+        """
+        def merge(old: List[Any], new: List[Any]) -> List[Any]:
+            names = {entity_name(item) for item in old}
+            return old + [item for item in new if entity_name(item) not in names]
+
+        previous = found.entry['result']
+        return {
+            'keywords': merge(previous.get('keywords') or [], delta.get('keywords') or [])[:MAX_KEYWORDS],
+            'summary': previous.get('summary') or delta.get('summary') or '',
+            'entities': merge(cls.surviving_entities(text, found.entry), delta.get('entities') or []),
+        }
+
+    def record_decision(self, decision: str, similarity: float, started: float, text: str):
+        with self._lock:
+            self.stats[decision] += 1
+        logger.info(f"유사도 캐시 결정: {decision} (유사도 {similarity:.3f}, 문서 {len(text)}자)")
+        self.telemetry.record('cache', None, time.perf_counter() - started,
+                              cache_hit=decision != 'miss', decision=decision, similarity=round(similarity, 4))
+
+    def get_or_extract(self, text: str, extract_fn: Callable[[str], Dict[str, Any]],
+                       patch_fn: Optional[Callable[[str], Dict[str, Any]]] = None,
+                       namespace: str = '') -> Tuple[Dict[str, Any], str]:
+        """
+        캐시를 먼저 조회하고 필요한 만큼만 추출
+
+        Args:
+            text (str): 문서 텍스트
+            extract_fn (Callable): 전체 추출 함수
+            patch_fn (Optional[Callable]): 바뀐 문장 추출 함수 (기본: extract_fn)
+            namespace (str): 캐시 네임스페이스 (예: GeminiExtractionClient.cache_namespace())
+
+        Returns:
+            Tuple[Dict[str, Any], str]: (추출 결과, 결정). 캐시를 끄면 결정은 'disabled'
+        """
+        if not self.enabled:
+            return extract_fn(text), 'disabled'
+        started = time.perf_counter()
+        found = self.lookup(text, namespace)
+        decision = found.decision
+        if decision in ('exact', 'reuse'):
+            self.record_decision(decision, found.similarity, started, text)
+            return self.cached_result(text, found), decision
+
+        if decision == 'patch':
+            delta = (patch_fn or extract_fn)(found.changed)
+            result = self.patch_result(text, found, delta)
+            self.record_decision('patch', found.similarity, started, text)
+            self.store(text, result, namespace)
+            return result, 'patch'
+
+        result = extract_fn(text)
+        self.record_decision('miss', found.similarity, started, text)
+        self.store(text, result, namespace)
+        return result, 'miss'
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+semantic_cache_test.py
+- 유사도 캐시(semantic_cache.py)의 exact/reuse/patch/miss 결정과 결과 재사용 검증
+- 외부 서비스 없이 실행 (임시 디렉터리에 캐시 파일 생성)
+
+사용법:
+    python semantic_cache_test.py
+"""
+
+import os
+import sys
+import tempfile
+
+from llm_telemetry import TelemetryLogger
+from semantic_cache import SemanticCache
+
+BASE_SENTENCES = [
+    "GIA_INFOSYS 프로젝트는 문서에서 핵심 키워드와 요약을 추출하여 Notion 데이터베이스에 저장한다.",
+    "나실장은 전체 기획과 일정 관리를 담당한다.",
+    "노팀장은 기술 자문과 아키텍처 검토를 맡는다.",
+    "서대리는 문서 파싱과 Notion 연동 개발을 담당한다.",
+    "1단계에서는 DOCX, PPTX, PDF 문서를 지원하고 이후 이미지 문서로 확장한다.",
+    "추출 결과는 지식 그래프와 인물 네트워크 데이터베이스에 함께 반영된다.",
+]
+BASE_TEXT = ' '.join(BASE_SENTENCES)
+BASE_RESULT = {"keywords": ["GIA_INFOSYS", "Notion", "지식 그래프"], "summary": "문서 추출 시스템",
+               "entities": ["나실장", "노팀장", "서대리"]}
+
+
+class CountingExtractor:
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+
+    def __call__(self, text):
+        self.calls.append(text)
+        return dict(self.result)
+
+
+def make_cache(directory: str) -> SemanticCache:
+    return SemanticCache(path=os.path.join(directory, 'cache.jsonl'), telemetry=TelemetryLogger(enabled=False))
+
+
+def test_exact_and_miss():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = make_cache(directory)
+        extract = CountingExtractor(BASE_RESULT)
+        assert cache.get_or_extract(BASE_TEXT, extract)[1] == 'miss'
+        result, decision = cache.get_or_extract(BASE_TEXT + '  ', extract)
+        assert decision == 'exact' and result == BASE_RESULT and len(extract.calls) == 1
+        assert cache.get_or_extract("전혀 다른 회의록 내용입니다.", extract)[1] == 'miss'
+        # 네임스페이스가 다르면 재사용하지 않음
+        assert cache.get_or_extract(BASE_TEXT, extract, namespace='v2')[1] == 'miss'
+
+
+def test_reuse_drops_entities_of_deleted_sentences():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = make_cache(directory)
+        extract = CountingExtractor(BASE_RESULT)
+        cache.get_or_extract(BASE_TEXT, extract)
+        # 노팀장 문장만 삭제: 새 문장이 없으므로 reuse
+        edited = ' '.join(s for s in BASE_SENTENCES if '노팀장' not in s)
+        result, decision = cache.get_or_extract(edited, extract)
+        assert decision == 'reuse', decision
+        assert len(extract.calls) == 1
+        assert result['entities'] == ['나실장', '서대리'], result['entities']
+        assert result['keywords'] == BASE_RESULT['keywords']
+
+
+def test_patch_extracts_only_changed_sentences():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = make_cache(directory)
+        cache.get_or_extract(BASE_TEXT, CountingExtractor(BASE_RESULT))
+        added = "조대표는 최종 승인을 담당한다."
+        edited = ' '.join(s for s in BASE_SENTENCES if '노팀장' not in s) + ' ' + added
+        patch = CountingExtractor({"keywords": ["최종 승인"], "summary": "", "entities": ["조대표"]})
+        result, decision = cache.get_or_extract(edited, CountingExtractor(BASE_RESULT), patch_fn=patch)
+        assert decision == 'patch', decision
+        assert patch.calls == [added]
+        assert result['entities'] == ['나실장', '서대리', '조대표']
+        assert result['keywords'][-1] == '최종 승인'
+
+
+def test_normalized_entity_names_survive_unrelated_edits():
+    # LLM이 정규화한 이름(조대표)은 본문 표기(조 대표님, Cho CEO)와 글자가 달라도 유지
+    sentences = ["조 대표님이 회의를 주재했다.", "Cho CEO 는 예산안을 승인했다.", "회의는 오후 세 시에 끝났다.",
+                 "다음 회의는 다음 주 월요일에 열린다.", "참석자는 모두 여덟 명이었다."] + BASE_SENTENCES
+    stored = {"keywords": ["회의"], "summary": "회의 기록", "entities": ["조대표", "조상현"]}
+    with tempfile.TemporaryDirectory() as directory:
+        cache = make_cache(directory)
+        cache.get_or_extract(' '.join(sentences), CountingExtractor(stored))
+        edited = [s for s in sentences if '오후' not in s]
+        result, decision = cache.get_or_extract(' '.join(edited), CountingExtractor(stored))
+        assert decision == 'reuse' and result['entities'] == ['조대표', '조상현'], (decision, result)
+        # 조대표가 나온 두 문장을 모두 지우면 제외 (본문에서 찾지 못한 이름은 유지)
+        edited = [s for s in sentences if '대표' not in s and 'CEO' not in s]
+        patch = CountingExtractor({"keywords": [], "summary": "", "entities": []})
+        result, decision = cache.get_or_extract(' '.join(edited) + " 서 대리님이 회의록을 정리했다.",
+                                                CountingExtractor(stored), patch_fn=patch)
+        assert decision == 'patch' and result['entities'] == ['조상현'], (decision, result)
+
+
+def test_disabled_cache_extracts_without_lookup_or_telemetry():
+    class RecordingTelemetry(TelemetryLogger):
+        def __init__(self):
+            super().__init__(enabled=False)
+            self.records = []
+
+        def record(self, *args, **kwargs):
+            self.records.append(args)
+
+    with tempfile.TemporaryDirectory() as directory:
+        telemetry = RecordingTelemetry()
+        cache = SemanticCache(path=os.path.join(directory, 'cache.jsonl'), telemetry=telemetry, enabled=False)
+        extract = CountingExtractor(BASE_RESULT)
+        for _ in range(2):
+            assert cache.get_or_extract(BASE_TEXT, extract) == (BASE_RESULT, 'disabled')
+        assert len(extract.calls) == 2 and telemetry.records == []
+        assert cache.stats == {'exact': 0, 'reuse': 0, 'patch': 0, 'miss': 0}
+        assert len(cache) == 0 and not os.path.exists(cache.path)
+
+
+def test_reload_from_file():
+    with tempfile.TemporaryDirectory() as directory:
+        make_cache(directory).get_or_extract(BASE_TEXT, CountingExtractor(BASE_RESULT))
+        reloaded = make_cache(directory)
+        assert len(reloaded) == 1 and reloaded.lookup(BASE_TEXT).decision == 'exact'
+
+
+TESTS = [
+    test_exact_and_miss,
+    test_reuse_drops_entities_of_deleted_sentences,
+    test_patch_extracts_only_changed_sentences,
+    test_normalized_entity_names_survive_unrelated_edits,
+    test_disabled_cache_extracts_without_lookup_or_telemetry,
+    test_reload_from_file,
+]
+
+
+def main():
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+    print(f"=== {len(TESTS) - failed}/{len(TESTS)} 통과 ===")
+    return failed == 0
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
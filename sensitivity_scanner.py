@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+sensitivity_scanner.py
+- 민감도 키워드 사전(레벨 → 키워드 목록)을 Aho-Corasick 오토마톤 하나로 컴파일
+- 본문을 한 번만 순회하여 레벨별로 등장한 서로 다른 키워드 수 계산
+  (레벨마다 `keyword in text` 를 반복한 결과와 같음. 여러 레벨에 있거나 목록에 중복된 키워드는 그만큼 셈)
+- 사전 내용의 서명이 바뀔 때만 다시 컴파일 (SensitivityMatcherCache)
+- count_matrix: 문서 여러 건의 레벨별 키워드 수를 (문서 수 × 레벨 수) NumPy 배열로 반환
+- count_pages: 페이지/청크 이터레이터를 상태를 이어 가며 순회하고, 중단 조건을 만족하면 나머지를 읽지 않음
+- page_counts: 상태를 이어 가며 페이지별 키워드 수 (경계에 걸친 키워드는 끝나는 페이지에서 셈)
+
+사용법:
+    python sensitivity_scanner.py [키워드 수] [본문 MB]    # 기존 방식 대비 벤치마크 (기본 5000개, 1MB)
+"""
+
+import sys
+import time
+import random
+import threading
+import logging
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy 미설치 시 문서별 count 만 사용
+    np = None
+
+from aho_corasick import AhoCorasick
+
+logger = logging.getLogger(__name__)
+
+# count_pages 가 중단 조건을 확인하는 단위 (결정 위치의 정밀도)
+DEFAULT_SCAN_BLOCK_CHARS = 8192
+
+
+def keywords_signature(keywords: Dict[str, Iterable[str]]) -> int:
+    """사전 내용 서명 (레벨 순서와 키워드 목록이 같으면 같은 값)"""
+    return hash(tuple((level, tuple(words)) for level, words in keywords.items()))
+
+
+class SensitivityMatcher:
+    """레벨별 키워드를 한 번의 순회로 세는 컴파일된 매처"""
+
+    def __init__(self, keywords: Dict[str, Iterable[str]]):
+        """
+        Args:
+            keywords (Dict[str, Iterable[str]]): 레벨 → 키워드 목록 (예: {"high": [...], "medium": [...]})
+        """
+        self.levels: Tuple[str, ...] = tuple(keywords)
+        self.signature = keywords_signature(keywords)
+        level_index = {level: i for i, level in enumerate(self.levels)}
+        # 키워드 → 포함된 레벨 번호 (목록에 있는 횟수만큼)
+        owners: Dict[str, List[int]] = {}
+        for level, words in keywords.items():
+            for word in words:
+                owners.setdefault(word, []).append(level_index[level])
+        # 빈 문자열은 항상 포함된 것으로 봄 ('' in text == True)
+        self.always = [0] * len(self.levels)
+        for level_id in owners.pop('', ()):
+            self.always[level_id] += 1
+        self.automaton = AhoCorasick((word, tuple(levels)) for word, levels in owners.items())
+        self._pattern_levels: List[Tuple[int, ...]] = [self.automaton.pattern(i)[1]
+                                                       for i in range(len(self.automaton))]
+
+    def __len__(self) -> int:
+        return len(self.automaton)
+
+    def level_counts(self, found: Iterable[int]) -> List[int]:
+        """등장한 패턴 번호 → 레벨 순서의 서로 다른 키워드 수"""
+        counts = list(self.always)
+        pattern_levels = self._pattern_levels
+        for pattern_id in found:
+            for level_id in pattern_levels[pattern_id]:
+                counts[level_id] += 1
+        return counts
+
+    def count_vector(self, text: str) -> List[int]:
+        return self.level_counts(self.automaton.scan_distinct(text)[0])
+
+    def count(self, text: str) -> Dict[str, int]:
+        """레벨 → 본문에 등장한 서로 다른 키워드 수"""
+        return dict(zip(self.levels, self.count_vector(text)))
+
+    def count_pages(self, pages: Iterable[str], stop: Optional[Callable[[List[int]], bool]] = None,
+                    block_chars: int = DEFAULT_SCAN_BLOCK_CHARS) -> Tuple[List[int], Dict[str, Any]]:
+        """
+        페이지를 차례로 읽으며 레벨별 키워드 수 계산. 페이지 경계에 걸친 키워드도 찾음 (오토마톤 상태를 이어 감)
+
+        Args:
+            pages (Iterable[str]): 페이지/청크 본문 (이어 붙이면 문서 전체)
+            stop (Optional[Callable[[List[int]], bool]]): 레벨 순서의 키워드 수를 받아 True면 읽기 중단
+            block_chars (int): 중단 조건을 확인하는 글자 단위
+
+        Returns:
+            Tuple[List[int], Dict[str, Any]]: 읽은 부분까지의 레벨별 키워드 수,
+                {"decision_offset": 결정 시점까지 읽은 글자 수, "pages_read": 읽은 페이지 수, "early_exit": 중단 여부}
+        """
+        scan = self.automaton.scan_distinct
+        found: set = set()
+        state = 0
+        offset = 0
+        pages_read = 0
+        counts = list(self.always)
+        if stop is not None and stop(counts):
+            return counts, {"decision_offset": 0, "pages_read": 0, "early_exit": True}
+        for page in pages:
+            pages_read += 1
+            for start in range(0, len(page), block_chars):
+                block = page[start:start + block_chars]
+                before = len(found)
+                state = scan(block, state, found)[1]
+                offset += len(block)
+                if len(found) != before:
+                    counts = self.level_counts(found)
+                    if stop is not None and stop(counts):
+                        return counts, {"decision_offset": offset, "pages_read": pages_read, "early_exit": True}
+        return counts, {"decision_offset": offset, "pages_read": pages_read, "early_exit": False}
+
+    def page_counts(self, pages: Iterable[str]) -> List[List[int]]:
+        """
+        페이지별 레벨별 키워드 수. 오토마톤 상태를 이어 가므로 페이지 경계에 걸친 키워드는
+        끝나는 페이지에서 셈 (페이지를 따로 세면 놓치는 키워드)
+
+        Returns:
+            List[List[int]]: 페이지 순서의 레벨별 키워드 수 (열 순서는 self.levels)
+        """
+        scan = self.automaton.scan_distinct
+        state = 0
+        result = []
+        for page in pages:
+            found, state = scan(page, state)
+            result.append(self.level_counts(found))
+        return result
+
+    def count_matrix(self, texts: Iterable[str]):
+        """
+        문서별 레벨별 키워드 수
+
+        Returns:
+            np.ndarray: (문서 수, 레벨 수) int32 배열, 열 순서는 self.levels
+        """
+        if np is None:
+            raise ImportError("count_matrix 에는 numpy 가 필요합니다")
+        scan = self.automaton.scan_distinct
+        pattern_levels = self._pattern_levels
+        rows: List[int] = []
+        cols: List[int] = []
+        n_docs = 0
+        for row, text in enumerate(texts):
+            n_docs += 1
+            for pattern_id in scan(text)[0]:
+                for level_id in pattern_levels[pattern_id]:
+                    rows.append(row)
+                    cols.append(level_id)
+        counts = np.zeros((n_docs, len(self.levels)), dtype=np.int32)
+        np.add.at(counts, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), 1)
+        counts += np.asarray(self.always, dtype=np.int32)
+        return counts
+
+
+class SensitivityMatcherCache:
+    """사전 서명이 바뀔 때만 매처를 다시 만드는 캐시 (스레드 안전)"""
+
+    def __init__(self):
+        self._matcher: Optional[SensitivityMatcher] = None
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def get(self, keywords: Dict[str, Iterable[str]]) -> SensitivityMatcher:
+        signature = keywords_signature(keywords)
+        matcher = self._matcher
+        if matcher is not None and matcher.signature == signature:
+            return matcher
+        with self._lock:
+            if self._matcher is None or self._matcher.signature != signature:
+                started = time.perf_counter()
+                self._matcher = SensitivityMatcher(keywords)
+                self.builds += 1
+                logger.info(f"민감도 키워드 매처 컴파일: 키워드 {len(self._matcher)}개, "
+                            f"상태 {self._matcher.automaton.state_count}개, {time.perf_counter() - started:.3f}초")
+            return self._matcher
+
+
+def naive_counts(keywords: Dict[str, Iterable[str]], text: str) -> Dict[str, int]:
+    """기존 방식: 레벨·키워드마다 `keyword in text` (비교 기준)"""
+    return {level: sum(1 for keyword in words if keyword in text) for level, words in keywords.items()}
+
+
+def benchmark(keyword_count: int = 5000, text_mb: float = 1.0, seed: int = 7) -> Dict[str, Any]:
+    """
+    합성 키워드 사전과 본문으로 기존 방식과 컴파일된 매처를 비교
+
+    Returns:
+        Dict[str, Any]: 컴파일/검색 시간, 속도 향상 배수, 결과 일치 여부
+    """
+    rng = random.Random(seed)
+    syllables = [chr(code) for code in range(0xAC00, 0xAC00 + 400)]
+    vocabulary = [''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(keyword_count * 2)]
+    levels = ('high', 'medium', 'low')
+    keywords = {level: vocabulary[i * keyword_count // 3:(i + 1) * keyword_count // 3]
+                for i, level in enumerate(levels)}
+    # 본문: 어휘(사전 안팎 절반씩)와 무작위 음절로 채운 문장
+    words = []
+    size = 0
+    while size < text_mb * 1_000_000:
+        word = rng.choice(vocabulary) if rng.random() < 0.05 else ''.join(
+            rng.choice(syllables) for _ in range(rng.randint(1, 3)))
+        words.append(word)
+        size += len(word.encode('utf-8')) + 1
+    text = ' '.join(words)
+
+    started = time.perf_counter()
+    expected = naive_counts(keywords, text)
+    naive_seconds = time.perf_counter() - started
+
+    cache = SensitivityMatcherCache()
+    started = time.perf_counter()
+    matcher = cache.get(keywords)
+    compile_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    counts = matcher.count(text)
+    scan_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    cache.get(keywords)
+    cached_seconds = time.perf_counter() - started
+    return {
+        "keywords": sum(len(w) for w in keywords.values()),
+        "text_chars": len(text),
+        "naive_seconds": round(naive_seconds, 3),
+        "compile_seconds": round(compile_seconds, 3),
+        "scan_seconds": round(scan_seconds, 3),
+        "cached_lookup_seconds": round(cached_seconds, 5),
+        "speedup": round(naive_seconds / scan_seconds, 1) if scan_seconds else None,
+        "counts": counts,
+        "identical": counts == expected,
+    }
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    keyword_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    text_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    result = benchmark(keyword_count, text_mb)
+    print(f"키워드 {result['keywords']}개, 본문 {result['text_chars']:,}자")
+    print(f"  기존(keyword in text): {result['naive_seconds']:.3f}초")
+    print(f"  오토마톤: 컴파일 {result['compile_seconds']:.3f}초(사전 변경 시 1회), 검색 {result['scan_seconds']:.3f}초 "
+          f"→ {result['speedup']}배, 캐시 조회 {result['cached_lookup_seconds']:.5f}초")
+    print(f"  레벨별 키워드 수 {result['counts']}, 기존 결과와 일치: {result['identical']}")
+    return result['identical']
+
+
+if __name__ == '__main__':
+    main()
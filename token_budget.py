@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+token_budget.py
+- 요청을 보내기 전에 로컬에서 프롬프트 토큰 수를 추정하고 모델 한도/실행 예산을 확인
+- 모델별 보정표: 문자 기반 추정치에 곱하는 계수. 응답의 usageMetadata(promptTokenCount)로 계속 보정
+- 모델 입력 한도를 넘는 문서는 문장 경계에서 청크로 나누거나(chunk) 앞부분만 남김(trim)
+- 실행 전체 토큰 예산: 다음 요청이 예산을 넘기면 보내지 않고 TokenBudgetExceeded로 조기 중단 (보고서 포함)
+
+사용법:
+    python token_budget.py [파일]    # 모델별 추정 토큰 수와 한도 대비 비율 출력
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import threading
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 모델별 (입력 토큰 한도, 출력 토큰 한도). GEMINI_MODEL_LIMITS 환경 변수(JSON)로 덮어쓰기 가능
+DEFAULT_MODEL_LIMITS: Dict[str, Tuple[int, int]] = {
+    'gemini-pro': (30720, 2048),
+    'gemini-1.0-pro': (30720, 2048),
+    'gemini-1.5-flash': (1048576, 8192),
+    'gemini-1.5-pro': (2097152, 8192),
+}
+UNKNOWN_MODEL_LIMITS = (30720, 2048)
+
+# 모델별 보정 계수 (실제 토큰 수 / 문자 기반 추정치). GEMINI_TOKEN_CALIBRATION 환경 변수(JSON)로 덮어쓰기 가능
+DEFAULT_CALIBRATION: Dict[str, float] = {
+    'gemini-pro': 1.0,
+    'gemini-1.0-pro': 1.0,
+    'gemini-1.5-flash': 1.0,
+    'gemini-1.5-pro': 1.0,
+}
+
+# 한도를 넘는 프롬프트 처리: chunk(나눠서 추출 후 병합) / trim(앞부분만) / error(예외)
+CHUNK = 'chunk'
+TRIM = 'trim'
+ERROR = 'error'
+
+SENTENCE_PATTERN = re.compile(r'[^.!?。\n]*[.!?。]*[ \t]*\n*')
+
+# 문자 종류별 토큰당 글자 수 (ASCII / 그 밖의 문자). 일괄 추정(hybrid_llm_router)도 같은 값을 사용
+ASCII_CHARS_PER_TOKEN = 4
+OTHER_CHARS_PER_TOKEN = 1.5
+
+
+def count_ascii(text: str) -> int:
+    """ASCII 글자 수 (비ASCII 문자를 버린 인코딩 길이)"""
+    return len(text.encode('ascii', 'ignore'))
+
+
+def estimate_tokens(text: str) -> int:
+    """대략적인 토큰 수 추정 (영문 약 4자, 한글 약 1.5자당 1토큰)"""
+    ascii_chars = count_ascii(text)
+    return int(ascii_chars / ASCII_CHARS_PER_TOKEN + (len(text) - ascii_chars) / OTHER_CHARS_PER_TOKEN) + 1
+
+
+def _load_json_table(env_name: str, defaults: Dict[str, Any], convert) -> Dict[str, Any]:
+    table = dict(defaults)
+    override = os.getenv(env_name)
+    if override:
+        try:
+            table.update({model: convert(value) for model, value in json.loads(override).items()})
+        except Exception as e:
+            logger.warning(f"{env_name} 파싱 실패, 기본값 사용: {e}")
+    return table
+
+
+class PromptTooLargeError(Exception):
+    """모델 입력 한도를 넘는 프롬프트 (요청을 보내지 않음)"""
+
+    def __init__(self, message: str, tokens: int, limit: int):
+        super().__init__(message)
+        self.tokens = tokens
+        self.limit = limit
+
+
+class TokenBudgetExceeded(Exception):
+    """실행 토큰 예산 초과로 요청을 보내지 않음"""
+
+    def __init__(self, message: str, report: Dict[str, Any]):
+        super().__init__(message)
+        self.report = report
+
+
+class TokenEstimator:
+    """모델별 보정 계수를 적용한 토큰 추정기 (관측값으로 계수를 지수 이동 평균 보정, 스레드 안전)"""
+
+    def __init__(self, calibration: Optional[Dict[str, float]] = None,
+                 limits: Optional[Dict[str, Tuple[int, int]]] = None,
+                 safety_margin: float = 0.05, learning_rate: float = 0.2):
+        """
+        Args:
+            calibration (Optional[Dict[str, float]]): 모델별 초기 보정 계수
+            limits (Optional[Dict[str, Tuple[int, int]]]): 모델별 (입력, 출력) 토큰 한도
+            safety_margin (float): 한도 확인 시 추정 오차를 감안해 비워 둘 비율
+            learning_rate (float): 관측값 반영 비율 (0이면 보정하지 않음)
+        """
+        self.calibration = dict(DEFAULT_CALIBRATION if calibration is None else calibration)
+        self.limits = dict(DEFAULT_MODEL_LIMITS if limits is None else limits)
+        self.safety_margin = safety_margin
+        self.learning_rate = learning_rate
+        # 모델별 관측 통계: 표본 수, 추정/실제 토큰 합계
+        self.observed: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'TokenEstimator':
+        return cls(
+            calibration=_load_json_table('GEMINI_TOKEN_CALIBRATION', DEFAULT_CALIBRATION, float),
+            limits=_load_json_table('GEMINI_MODEL_LIMITS', DEFAULT_MODEL_LIMITS, lambda v: tuple(int(x) for x in v)),
+            safety_margin=float(os.getenv('GEMINI_TOKEN_SAFETY_MARGIN', 0.05)),
+        )
+
+    def factor(self, model: Optional[str]) -> float:
+        return self.calibration.get(model or '', 1.0)
+
+    def count(self, text: str, model: Optional[str] = None) -> int:
+        """보정 계수를 적용한 토큰 수"""
+        return int(math.ceil(estimate_tokens(text) * self.factor(model)))
+
+    def input_limit(self, model: Optional[str]) -> int:
+        """추정 오차 여유를 뺀 입력 토큰 한도"""
+        return int(self.limits.get(model or '', UNKNOWN_MODEL_LIMITS)[0] * (1 - self.safety_margin))
+
+    def output_limit(self, model: Optional[str]) -> int:
+        return self.limits.get(model or '', UNKNOWN_MODEL_LIMITS)[1]
+
+    def observe(self, model: str, text: str, actual_tokens: int):
+        """실제 토큰 수(usageMetadata.promptTokenCount)로 보정 계수 갱신"""
+        if actual_tokens <= 0:
+            return
+        raw = estimate_tokens(text)
+        with self._lock:
+            stats = self.observed.setdefault(model, {'samples': 0, 'estimated': 0, 'actual': 0})
+            stats['samples'] += 1
+            stats['estimated'] += raw
+            stats['actual'] += actual_tokens
+            if self.learning_rate:
+                current = self.calibration.get(model, 1.0)
+                self.calibration[model] = current + self.learning_rate * (actual_tokens / raw - current)
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """모델별 현재 보정 계수와 관측 오차"""
+        with self._lock:
+            observed = {model: dict(stats) for model, stats in self.observed.items()}
+            calibration = dict(self.calibration)
+        return {model: {"factor": round(calibration.get(model, 1.0), 4), "samples": stats['samples'],
+                        "raw_error": round(stats['actual'] / stats['estimated'] - 1, 4) if stats['estimated'] else 0.0}
+                for model, stats in observed.items()}
+
+
+class RunTokenBudget:
+    """실행 전체 토큰 예산 (요청 전 예약, 응답 후 실제 사용량으로 정산, 스레드 안전)"""
+
+    def __init__(self, max_tokens: int = 0):
+        """
+        Args:
+            max_tokens (int): 입력+출력 토큰 합계 한도 (0이면 무제한)
+        """
+        self.max_tokens = max_tokens
+        self.used = 0
+        self.reserved = 0
+        self.requests = 0
+        self.rejected = 0
+        self.exhausted = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'RunTokenBudget':
+        return cls(int(os.getenv('GEMINI_RUN_TOKEN_BUDGET', 0)))
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_tokens > 0
+
+    def reserve(self, tokens: int) -> int:
+        """
+        요청 한 건의 예상 토큰을 예약
+
+        Raises:
+            TokenBudgetExceeded: 예약하면 예산을 넘음 (이후 요청도 모두 거절)
+        """
+        with self._lock:
+            if self.enabled and (self.exhausted or self.used + self.reserved + tokens > self.max_tokens):
+                self.exhausted = True
+                self.rejected += 1
+                report = self._report()
+            else:
+                self.reserved += tokens
+                self.requests += 1
+                return tokens
+        raise TokenBudgetExceeded(
+            f"실행 토큰 예산 초과: 사용 {report['used']} + 예약 {report['reserved']} + 요청 {tokens} "
+            f"> 예산 {self.max_tokens}", report)
+
+    def settle(self, reserved: int, actual: int):
+        """예약분을 실제 사용량으로 정산 (요청 실패면 actual=0)"""
+        with self._lock:
+            self.reserved -= reserved
+            self.used += actual
+
+    def _report(self) -> Dict[str, Any]:
+        return {
+            "max_tokens": self.max_tokens,
+            "used": self.used,
+            "reserved": self.reserved,
+            "remaining": max(self.max_tokens - self.used - self.reserved, 0) if self.enabled else None,
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "exhausted": self.exhausted,
+        }
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._report()
+
+
+def split_sentences(text: str) -> List[str]:
+    """문장/줄 단위로 나눔 (구분자와 공백 보존: 이어 붙이면 원문)"""
+    return [m.group(0) for m in SENTENCE_PATTERN.finditer(text) if m.group(0)]
+
+
+def _hard_split(sentence: str, max_tokens: int, count) -> List[str]:
+    """한 문장이 한도를 넘으면 추정 토큰 비율로 글자 수를 나눠 자름"""
+    pieces = []
+    while sentence:
+        size = max(int(len(sentence) * max_tokens / max(count(sentence), 1)), 1)
+        while size > 1 and count(sentence[:size]) > max_tokens:
+            size = size * 9 // 10
+        pieces.append(sentence[:size])
+        sentence = sentence[size:]
+    return pieces
+
+
+def split_to_fit(text: str, max_tokens: int, estimator: Optional[TokenEstimator] = None,
+                 model: Optional[str] = None) -> List[str]:
+    """
+    문장 경계에서 나눠 각 청크가 max_tokens 이하가 되도록 묶음 (문장 하나가 넘으면 글자 단위로 자름)
+
+    Returns:
+        List[str]: 원문 순서의 청크 목록 (이어 붙이면 원문)
+    """
+    count = (lambda s: estimator.count(s, model)) if estimator else estimate_tokens
+    if count(text) <= max_tokens:
+        return [text]
+    chunks: List[str] = []
+    current, used = '', 0
+    for sentence in split_sentences(text):
+        cost = count(sentence)
+        if cost > max_tokens:
+            pieces = _hard_split(sentence, max_tokens, count)
+        else:
+            pieces = [sentence]
+        for piece in pieces:
+            cost = count(piece)
+            if current and used + cost > max_tokens:
+                chunks.append(current)
+                current, used = '', 0
+            current += piece
+            used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def trim_to_fit(text: str, max_tokens: int, estimator: Optional[TokenEstimator] = None,
+                model: Optional[str] = None) -> str:
+    """한도 안에 들어가는 앞부분(첫 청크)만 남김"""
+    return split_to_fit(text, max_tokens, estimator, model)[0]
+
+
+def merge_extractions(results: List[Dict[str, Any]], max_keywords: int = 8,
+                      max_summary_chars: int = 300) -> Dict[str, Any]:
+    """
+    청크별 추출 결과 병합: 키워드/개체는 등장 순 합집합(키워드는 청크마다 고르게),
+    요약은 청크 요약을 순서대로 이어 길이 제한
+    """
+    keywords: List[str] = []
+    rank = 0
+    while len(keywords) < max_keywords and any(rank < len(r.get('keywords', [])) for r in results):
+        for result in results:
+            items = result.get('keywords', [])
+            if rank < len(items) and items[rank] not in keywords and len(keywords) < max_keywords:
+                keywords.append(items[rank])
+        rank += 1
+    entities = list(dict.fromkeys(e for r in results for e in r.get('entities', [])))
+    summary = ' '.join(r.get('summary', '').strip() for r in results if r.get('summary'))
+    if len(summary) > max_summary_chars:
+        summary = summary[:max_summary_chars].rstrip() + '…'
+    return {"keywords": keywords, "summary": summary, "entities": entities}
+
+
+def main():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'r', encoding='utf-8') as f:
+            text = f.read()
+    else:
+        text = "조대표님과 노팀장은 GIA_INFOSYS 프로젝트 일정을 검토했다. The Notion sync runs nightly. " * 500
+    estimator = TokenEstimator.from_env()
+    print(f"문자 {len(text)}자, 기본 추정 {estimate_tokens(text)}토큰")
+    for model in estimator.limits:
+        tokens = estimator.count(text, model)
+        limit = estimator.input_limit(model)
+        chunks = split_to_fit(text, limit, estimator, model)
+        print(f"  {model:<18} 추정 {tokens:>8}토큰 / 한도 {limit:>8} ({tokens / limit:6.1%}), 청크 {len(chunks)}개")
+    return True
+
+
+if __name__ == '__main__':
+    main()
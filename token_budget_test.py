@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+token_budget_test.py
+- 전송 전 토큰 확인(token_budget.py): 실행 예산 예약/정산, 모델 한도, 보정 계수, 청크 분할 검증
+- 가짜 Gemini 서버(fake_gemini_server.py)로 한도 초과 요청이 나가지 않는지 확인 (API 키/네트워크 불필요)
+
+사용법:
+    python token_budget_test.py
+"""
+
+import sys
+import threading
+
+from fake_gemini_server import FakeGeminiConfig, FakeGeminiServer
+from gemini_client import GeminiExtractionClient
+from gemini_key_pool import GeminiKeyPool
+from llm_telemetry import TelemetryLogger
+from token_budget import (PromptTooLargeError, RunTokenBudget, TokenBudgetExceeded, TokenEstimator,
+                          estimate_tokens, merge_extractions, split_to_fit)
+
+
+def test_reserve_and_settle():
+    budget = RunTokenBudget(1000)
+    first = budget.reserve(400)
+    second = budget.reserve(400)
+    # 예약만으로도 한도를 채우면 다음 요청은 거절
+    try:
+        budget.reserve(300)
+    except TokenBudgetExceeded as e:
+        assert e.report['reserved'] == 800
+    else:
+        raise AssertionError("예산을 넘는 예약을 허용함")
+    budget.settle(first, 150)
+    budget.settle(second, 0)
+    report = budget.report()
+    assert report['used'] == 150 and report['reserved'] == 0 and report['rejected'] == 1
+    # 한 번 소진되면 이후 요청도 모두 거절 (실행 중단 신호)
+    assert budget.exhausted
+    try:
+        budget.reserve(1)
+    except TokenBudgetExceeded:
+        pass
+    else:
+        raise AssertionError("소진된 예산이 예약을 허용함")
+
+
+def test_unlimited_budget():
+    budget = RunTokenBudget(0)
+    budget.settle(budget.reserve(10 ** 9), 10 ** 9)
+    assert not budget.exhausted and budget.report()['remaining'] is None
+
+
+def test_concurrent_reservations_never_exceed_budget():
+    budget = RunTokenBudget(1000)
+    granted = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(50):
+            try:
+                tokens = budget.reserve(7)
+            except TokenBudgetExceeded:
+                return
+            with lock:
+                granted.append(tokens)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(granted) <= 1000 and budget.reserved == sum(granted)
+
+
+def test_estimator_limits_and_calibration():
+    estimator = TokenEstimator(calibration={}, limits={'m': (1000, 100)}, safety_margin=0.1, learning_rate=0.5)
+    assert estimator.input_limit('m') == 900 and estimator.output_limit('m') == 100
+    text = '한글 문장입니다 ' * 20
+    raw = estimate_tokens(text)
+    estimator.observe('m', text, raw * 2)
+    assert estimator.factor('m') == 1.5
+    assert estimator.count(text, 'm') == -(-raw * 3 // 2)
+
+
+def test_split_to_fit_preserves_text():
+    text = ("첫 문장입니다. 두 번째 문장은 조금 더 깁니다! " * 30) + ("끊을 곳이 없는아주긴문장" * 40)
+    chunks = split_to_fit(text, 50)
+    assert ''.join(chunks) == text
+    assert len(chunks) > 1 and all(estimate_tokens(chunk) <= 50 for chunk in chunks)
+
+
+def test_merge_extractions():
+    merged = merge_extractions([
+        {"keywords": ["A", "B", "C"], "summary": "앞부분", "entities": ["서대리"]},
+        {"keywords": ["D", "A"], "summary": "뒷부분", "entities": ["서대리", "나실장"]},
+    ], max_keywords=4)
+    assert merged == {"keywords": ["A", "D", "B", "C"], "summary": "앞부분 뒷부분", "entities": ["서대리", "나실장"]}
+
+
+def test_client_rejects_oversized_prompt_before_sending():
+    with FakeGeminiServer(FakeGeminiConfig(seed=9)) as server:
+        client = GeminiExtractionClient(key_pool=GeminiKeyPool({"GEMINI_API_KEY_1": "fake-key-1"}),
+                                        base_url=server.base_url, telemetry=TelemetryLogger(enabled=False),
+                                        estimator=TokenEstimator(limits={'gemini-pro': (100, 50)}),
+                                        run_budget=RunTokenBudget(10 ** 6))
+        try:
+            client.generate("긴 프롬프트 " * 200)
+        except PromptTooLargeError as e:
+            assert e.limit == 95
+        else:
+            raise AssertionError("한도를 넘는 프롬프트를 보냄")
+        sent = server.stats.to_dict()['requests']
+        client.close()
+    assert sent == 0 and client.run_budget.reserved == 0
+
+
+def test_client_settles_actual_usage():
+    with FakeGeminiServer(FakeGeminiConfig(seed=10)) as server:
+        client = GeminiExtractionClient(key_pool=GeminiKeyPool({"GEMINI_API_KEY_1": "fake-key-1"}),
+                                        base_url=server.base_url, telemetry=TelemetryLogger(enabled=False),
+                                        run_budget=RunTokenBudget(10 ** 6))
+        result = client.generate("짧은 요청")
+        client.close()
+    assert client.run_budget.reserved == 0
+    assert client.run_budget.used == result.total_tokens > 0
+
+
+TESTS = [
+    test_reserve_and_settle,
+    test_unlimited_budget,
+    test_concurrent_reservations_never_exceed_budget,
+    test_estimator_limits_and_calibration,
+    test_split_to_fit_preserves_text,
+    test_merge_extractions,
+    test_client_rejects_oversized_prompt_before_sending,
+    test_client_settles_actual_usage,
+]
+
+
+def main():
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+    print(f"=== {len(TESTS) - failed}/{len(TESTS)} 통과 ===")
+    return failed == 0
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)